@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Capture Protocol Throughput Benchmark
+
+Runs complete capture sessions against the simulated firmware under a set of
+link conditions and reports, for each:
+    samples/s      samples delivered to the output file per wall-clock second
+    host us/sample CPU time of the capture side (the simulator thread's own
+                   CPU time is subtracted) per delivered sample
+    NACK / RESEND  retransmission requests the host sent
+    retry %        extra samples the device had to send, relative to the
+                   samples delivered
+    malformed      garbled lines that reached the output file
+The boards-4 scenario captures four simulated boards at once through the
+concurrent engine. Gestures are started by a zero-length countdown trigger
+instead of the ENTER prompt.
+
+Use it to catch capture regressions without a board: re-run after touching
+LineReader, the retry logic or the writers and compare the tables.
+tests/test_capture_benchmark.py runs the same scenarios under pytest-benchmark,
+which can save runs and compare them (--benchmark-autosave, --benchmark-compare).
+
+Usage:
+    uv run python benchmarks/bench_capture_protocol.py [--repetitions N] [--only NAME,...] [--replay data/TDATA.csv]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import capture_serial_data  # noqa: E402
+from capture_async import run_capture_many  # noqa: E402
+from capture_schedule import CountdownTrigger  # noqa: E402
+from firmware_simulator import SimulatedFirmware, load_recording  # noqa: E402
+
+# name: (SimulatedFirmware options, run_capture options; 'boards' > 1 uses run_capture_many)
+SCENARIOS = {
+    'clean': ({}, {}),
+    'clean-binary': ({'encoding': 'binary'}, {}),
+    'line-writes': ({'burst': 1}, {}),
+    'baud-921600': ({'baud': 921600}, {}),
+    'drop-1%-nack': ({'drop_rate': 0.01}, {}),
+    'drop-1%-resend': ({'drop_rate': 0.01}, {'gap_policy': 'resend'}),
+    'corrupt-1%': ({'corrupt_rate': 0.01}, {}),
+    'corrupt-1%-binary': ({'encoding': 'binary', 'corrupt_rate': 0.01}, {}),
+    'pipelined': ({}, {'pipeline': True}),
+    'replay': ({'recording': None}, {}),
+    'boards-4': ({}, {'boards': 4}),
+}
+
+
+def run_scenario(device_options, capture_options, output_path, repetitions=30, samples=100):
+    """Capture one simulated session and return a dict of its measurements."""
+    capture_options = dict(capture_options)
+    boards = capture_options.pop('boards', 1)
+    devices = [SimulatedFirmware(repetitions=repetitions, samples=samples, seed=i,
+                                 **device_options).start()
+               for i in range(boards)]
+    stats = capture_serial_data.PipelineStats()
+    trigger = CountdownTrigger(0)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    # The capture prints per repetition; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        if boards > 1:
+            ok = run_capture_many([device.port for device in devices], str(output_path), trigger=trigger,
+                                  **capture_options)
+        else:
+            ok = capture_serial_data.run_capture(devices[0].port, str(output_path), stats=stats, trigger=trigger,
+                                                 **capture_options)
+    for device in devices:
+        device.join(timeout=5)
+    cpu = time.process_time() - cpu_start - sum(device.cpu_time for device in devices)
+    wall = time.perf_counter() - wall_start
+    for device in devices:
+        device.close()
+    if not ok:
+        raise RuntimeError("capture failed")
+
+    delivered = sum(len(device.gestures) * device.repetitions * device.samples for device in devices)
+    return {
+        'samples': delivered,
+        'rate': delivered / wall,
+        'cpu_per_sample': cpu / delivered,
+        'nacks': sum(device.nacks for device in devices),
+        'resends': sum(device.resends for device in devices),
+        'retry': sum(device.samples_sent for device in devices) / delivered - 1,
+        'malformed': stats.malformed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture throughput under simulated link conditions")
+    parser.add_argument('--repetitions', '-r', type=int, default=30, help='Repetitions per gesture (default: 30)')
+    parser.add_argument('--samples', '-s', type=int, default=100, help='Samples per repetition (default: 100)')
+    parser.add_argument('--only', help=f"Comma-separated scenarios to run (from: {', '.join(SCENARIOS)})")
+    parser.add_argument('--replay', default=str(ROOT / 'data' / 'TDATA.csv'),
+                        help='Capture replayed by the replay scenario (default: data/TDATA.csv)')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario {', '.join(unknown)}")
+
+    print(f"  {'scenario':18} {'samples':>8} {'samples/s':>10} {'host us/sample':>15} "
+          f"{'NACK':>5} {'RESEND':>6} {'retry %':>8} {'malformed':>9}")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name in names:
+            device_options, capture_options = SCENARIOS[name]
+            if 'recording' in device_options:
+                if not Path(args.replay).exists():
+                    print(f"  {name:18} skipped: {args.replay} not found")
+                    continue
+                device_options = {'recording': load_recording(args.replay, args.samples)}
+            result = run_scenario(device_options, capture_options, Path(output_dir) / f"{name}.csv",
+                                  args.repetitions, args.samples)
+            print(f"  {name:18} {result['samples']:8d} {result['rate']:10.0f} "
+                  f"{result['cpu_per_sample'] * 1e6:15.2f} {result['nacks']:5d} {result['resends']:6d} "
+                  f"{result['retry'] * 100:8.2f} {result['malformed']:9d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+CSV Loading Benchmark
+
+Writes synthetic captures in the data/TDATA.csv format at several sizes and
+times four ways of loading each one:
+    inferred   pd.read_csv(path, sep=';') as the notebook does it
+    c          gesture_data.read_csv_capture with the C engine, no cache
+    pyarrow    gesture_data.read_csv_capture with the pyarrow engine, no cache
+    cached     gesture_data.read_csv_capture from a warm sidecar cache
+For each it reports the best wall time and the memory held by the DataFrame.
+
+Usage:
+    uv run python benchmarks/bench_csv_loading.py [--rows 30000 3000000 30000000] [--repeat N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import gesture_data  # noqa: E402
+
+GESTURES = ['idle', 'waving', 'sliding']
+
+
+def write_synthetic_csv(path, rows, seed=0, block_rows=1_000_000):
+    """Write rows of random int16 samples with one label per 100-row gesture."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('X-acc;Y-acc;Z-acc;label\n')
+        for start in range(0, rows, block_rows):
+            count = min(block_rows, rows - start)
+            values = rng.integers(-4200, 4200, size=(count, 3))
+            labels = np.array(GESTURES)[(np.arange(start, start + count) // 100) % len(GESTURES)]
+            frame = pd.DataFrame(values, columns=gesture_data.AXIS_COLUMNS)
+            frame['label'] = labels
+            frame.to_csv(f, sep=';', header=False, index=False)
+
+
+def best_of(repeat, load):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = load()
+        times.append(time.perf_counter() - start)
+    return min(times), data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CSV loading strategies")
+    parser.add_argument('--rows', type=int, nargs='+', default=[30_000, 3_000_000, 30_000_000],
+                        help='Dataset sizes in rows (default: 30000 3000000 30000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per method, best is reported (default: 3)')
+    args = parser.parse_args()
+
+    methods = {
+        'inferred': lambda path: pd.read_csv(path, sep=';'),
+        'c': lambda path: gesture_data.read_csv_capture(path, engine='c', cache=False),
+        'pyarrow': lambda path: gesture_data.read_csv_capture(path, engine='pyarrow', cache=False),
+        'cached': lambda path: gesture_data.read_csv_capture(path),
+    }
+    if gesture_data.default_csv_engine() != 'pyarrow':
+        print("pyarrow is not installed; skipping the pyarrow engine")
+        del methods['pyarrow']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"synthetic_{rows}.csv"
+            write_synthetic_csv(path, rows)
+            # Warm the sidecar so 'cached' measures only cache hits
+            gesture_data.read_csv_capture(path)
+
+            print(f"\n=== {rows:,} rows ({path.stat().st_size / 1e6:.1f} MB) ===")
+            print(f"  {'method':10} {'seconds':>9} {'rows/s':>12} {'memory MB':>10}")
+            baseline = None
+            for name, load in methods.items():
+                seconds, data = best_of(args.repeat, lambda: load(path))
+                memory = data.memory_usage(deep=True).sum() / 1e6
+                baseline = baseline or seconds
+                print(f"  {name:10} {seconds:9.3f} {rows / seconds:12,.0f} {memory:10.1f}"
+                      f"  ({baseline / seconds:.1f}x)")
+                del data
+            path.unlink()
+            gesture_data.cache_path_for(path).unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Single-Window Inference Benchmark
+
+Compares the ways gesture_inference can classify one (100, 3) window:
+    keras    the saved Keras model, called directly
+    numpy    the .npz export evaluated by NumpyClassifier
+    tflite   the int8 TFLite export (with --tflite)
+For each it reports the cold start (a fresh interpreter importing the code,
+loading the model and classifying one window) and the per-window latency.
+Without MODEL the notebook architecture is built with random weights, which
+is enough for timing.
+
+Usage:
+    uv run python benchmarks/bench_inference.py [MODEL.keras] [--tflite] [--windows N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from gesture_inference import load_classifier  # noqa: E402
+
+COLD_START = """
+import sys, numpy as np
+from gesture_inference import load_classifier
+load_classifier(sys.argv[1]).predict(np.zeros((100, 3), dtype=np.float32))
+print('tensorflow' in sys.modules)
+"""
+
+
+def notebook_model():
+    from tensorflow import keras
+
+    return keras.Sequential([
+        keras.layers.Input(shape=(100, 3)),
+        keras.layers.Flatten(),
+        keras.layers.Dense(128, activation='relu'),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(64, activation='relu'),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(3, activation='softmax'),
+    ])
+
+
+def cold_start(path):
+    """Seconds for a new Python process to import, load and classify one window."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', COLD_START, str(path)], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return time.perf_counter() - start, result.stdout.strip().splitlines()[-1] == 'True'
+
+
+def per_window(path, windows):
+    classifier = load_classifier(path)
+    classifier.predict(windows[0])
+    start = time.perf_counter()
+    for window in windows:
+        classifier.predict(window)
+    return (time.perf_counter() - start) / len(windows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-window inference backends")
+    parser.add_argument('model', nargs='?', help='Saved Keras model (default: untrained notebook model)')
+    parser.add_argument('--tflite', action='store_true', help='Include an int8 TFLite export')
+    parser.add_argument('--windows', type=int, default=2000, help='Windows to classify per backend (default: 2000)')
+    args = parser.parse_args()
+
+    from tensorflow import keras
+
+    from gesture_export import export_tflite, export_weights
+
+    windows = np.random.default_rng(0).standard_normal((args.windows, 100, 3)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        keras_path = Path(args.model) if args.model else Path(tmp) / 'model.keras'
+        model = keras.models.load_model(keras_path) if args.model else notebook_model()
+        if not args.model:
+            model.save(keras_path)
+        paths = {'keras': keras_path, 'numpy': Path(tmp) / 'model.npz'}
+        export_weights(model, paths['numpy'])
+        if args.tflite:
+            paths['tflite'] = Path(tmp) / 'model.tflite'
+            export_tflite(model, paths['tflite'], calibration=windows)
+
+        print(f"  {'backend':8} {'cold start s':>13} {'imports TF':>11} {'per window us':>14}")
+        for name, path in paths.items():
+            startup, imports_tf = cold_start(path)
+            latency = per_window(path, windows)
+            print(f"  {name:8} {startup:13.2f} {'yes' if imports_tf else 'no':>11} {latency * 1e6:14.1f}")
+
+
+if __name__ == '__main__':
+    main()
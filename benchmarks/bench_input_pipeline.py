@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Training Input Pipeline Benchmark
+
+Trains the notebook's model twice on the same data and reports training
+steps per second:
+    numpy    the notebook's path: StandardScaler, vstack of reversed copies,
+             model.fit(X, y, batch_size=32)
+    tf.data  gesture_dataset.make_dataset with cache, shuffle, parallel map,
+             batch and prefetch, reversal applied on the fly
+The first epoch is excluded from the rate (graph tracing, cache warm-up).
+TDATA.csv is tiled --copies times with a little noise to get a dataset
+large enough to measure.
+
+Usage:
+    uv run python benchmarks/bench_input_pipeline.py [--copies N] [--epochs N] [--batch-size N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from tensorflow import keras  # noqa: E402
+
+from gesture_data import load_gesture_windows  # noqa: E402
+from gesture_dataset import make_dataset, stratified_split  # noqa: E402
+from gesture_scaler import AxisScaler  # noqa: E402
+
+DATA_FILE = Path(__file__).resolve().parent.parent / 'data' / 'TDATA.csv'
+
+
+class StepTimer(keras.callbacks.Callback):
+    """Records steps and wall time of every epoch."""
+
+    def __init__(self):
+        super().__init__()
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.steps = 0
+        self.started = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.steps += 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epochs.append((self.steps, time.perf_counter() - self.started))
+
+    def steps_per_second(self):
+        timed = self.epochs[1:] or self.epochs
+        return sum(steps for steps, _ in timed) / sum(seconds for _, seconds in timed)
+
+
+def build_model(num_classes):
+    """The notebook's Step 11 architecture."""
+    model = keras.Sequential([
+        keras.layers.Input(shape=(100, 3)),
+        keras.layers.Flatten(),
+        keras.layers.Dense(128, activation='relu'),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(64, activation='relu'),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(num_classes, activation='softmax'),
+    ])
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def run_numpy(X, y, train_idx, args, num_classes):
+    from sklearn.preprocessing import StandardScaler
+
+    X_train = X[train_idx]
+    scaled = StandardScaler().fit_transform(X_train.reshape(-1, 3)).reshape(X_train.shape)
+    X_combined = np.vstack([scaled, scaled[:, ::-1, :]])
+    y_combined = np.concatenate([y[train_idx], y[train_idx]])
+
+    timer = StepTimer()
+    build_model(num_classes).fit(X_combined, y_combined, epochs=args.epochs, batch_size=args.batch_size,
+                                 shuffle=True, verbose=0, callbacks=[timer])
+    return timer
+
+
+def run_tf_data(X, y, train_idx, args, num_classes):
+    scaler = AxisScaler().fit(X[train_idx])
+    train = make_dataset(X[train_idx], y[train_idx], batch_size=args.batch_size, training=True,
+                         scaler=scaler, time_reversal='both', seed=0)
+    timer = StepTimer()
+    # The dataset reshuffles itself every epoch
+    build_model(num_classes).fit(train, epochs=args.epochs, shuffle=False, verbose=0, callbacks=[timer])
+    return timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare numpy and tf.data training input")
+    parser.add_argument('--copies', type=int, default=20, help='Times to tile TDATA.csv (default: 20)')
+    parser.add_argument('--epochs', type=int, default=4, help='Epochs per run (default: 4)')
+    parser.add_argument('--batch-size', type=int, default=32, help='Batch size (default: 32)')
+    args = parser.parse_args()
+
+    X, y, classes = load_gesture_windows(DATA_FILE)
+    rng = np.random.default_rng(0)
+    X = np.concatenate([X + rng.normal(0, 5, X.shape).astype(np.float32) for _ in range(args.copies)])
+    y = np.tile(y, args.copies)
+    train_idx, _ = stratified_split(y, test_size=0.2, random_state=42)
+    print(f"{len(train_idx)} training gestures ({2 * len(train_idx)} with reversed copies), "
+          f"batch size {args.batch_size}, {args.epochs} epochs")
+
+    results = {}
+    for name, run in (('numpy', run_numpy), ('tf.data', run_tf_data)):
+        timer = run(X, y, train_idx, args, len(classes))
+        results[name] = timer.steps_per_second()
+        print(f"  {name:8} {results[name]:8.1f} steps/s")
+    print(f"  speedup  {results['tf.data'] / results['numpy']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+End-to-End Lab Pipeline Benchmark
+
+Runs the notebook's pipeline headless, stage by stage, on data/TDATA.csv
+and on synthetic copies of it scaled up by --scales (10x, 100x, ...: the
+capture tiled with a little noise on the samples):
+
+    load      pd.read_csv(path, sep=';')
+    dropna    data.dropna()
+    truncate  keep only complete 100-row gestures
+    reshape   the (gestures, 100, 3) array and every 100th label
+    encode    LabelEncoder().fit_transform
+    scale     StandardScaler on the (gestures * 100, 3) view, back to 3-D
+    augment   time-reversed copies, np.vstack / np.concatenate
+    split     train_test_split(test_size=0.2, stratify=y)
+    fit       the notebook model, model.fit(batch_size=32, validation_split=0.2)
+    predict   model.predict on the test set, argmax
+
+Each stage records wall and CPU time, resident memory (before, after and
+the peak while it ran, sampled every few milliseconds) and, through
+tracemalloc, the peak and net Python-visible allocations (NumPy and pandas
+buffers included, TensorFlow's own allocator not). Every scale runs in a
+fresh interpreter so memory figures do not carry over between sizes.
+tracemalloc slows allocation-heavy stages down; --no-tracemalloc gives
+cleaner timings.
+
+--output writes the results as JSON; --baseline compares against such a
+file and exits with status 1 if a stage got slower (or allocates more) than
+--tolerance times the baseline, so a regression is caught before a long
+training run. --profile DIR dumps a cProfile file per stage and --py-spy DIR
+records a flame graph per scale (py-spy must be installed).
+
+Usage:
+    uv run python benchmarks/bench_lab_pipeline.py [--scales 1 10 100] [--epochs 3] [--output results.json]
+    uv run python benchmarks/bench_lab_pipeline.py --baseline results.json --tolerance 1.5
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from importlib import metadata
+from pathlib import Path
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+STAGES = ('load', 'dropna', 'truncate', 'reshape', 'encode', 'scale', 'augment', 'split', 'fit', 'predict')
+MIB = 1024 * 1024
+
+
+def current_rss():
+    """Resident set size in bytes, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss():
+    """The process's resident high-water mark in bytes, or None (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler:
+    """Tracks the peak resident size since the last reset() from a background thread."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = current_rss()
+        self.enabled = self.peak is not None
+        if self.enabled:
+            threading.Thread(target=self._run, name="rss sampler", daemon=True).start()
+
+    def _run(self):
+        while True:
+            rss = current_rss()
+            if rss > self.peak:
+                self.peak = rss
+            time.sleep(self.interval)
+
+    def reset(self):
+        self.peak = current_rss()
+
+
+class StageRecorder:
+    """Times stages and records their memory use; stage(name) is a context manager."""
+
+    def __init__(self, tracemalloc_enabled=True, profile_dir=None, prefix=''):
+        self.tracemalloc = tracemalloc_enabled
+        self.profile_dir = profile_dir
+        self.prefix = prefix
+        self.sampler = RssSampler()
+        self.records = []
+        if self.tracemalloc:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name, **extra):
+        gc.collect()
+        profiler = None
+        if self.profile_dir:
+            import cProfile
+
+            profiler = cProfile.Profile()
+        if self.tracemalloc:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        rss_before = current_rss()
+        self.sampler.reset()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            record = {'stage': name, 'wall_s': wall, 'cpu_s': cpu, 'rss_before': rss_before,
+                      'rss_after': current_rss(),
+                      'rss_peak': max(self.sampler.peak, current_rss()) if self.sampler.enabled else max_rss(),
+                      **extra}
+            if self.tracemalloc:
+                traced, traced_peak = tracemalloc.get_traced_memory()
+                record['alloc_peak'] = traced_peak - traced_before
+                record['alloc_net'] = traced - traced_before
+            if profiler:
+                profiler.dump_stats(Path(self.profile_dir) / f"{self.prefix}{name}.prof")
+            self.records.append(record)
+
+
+def notebook_model(num_classes, input_shape):
+    from gesture_models import dense_model
+
+    model = dense_model(num_classes, input_shape)
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def run_pipeline(path, recorder, epochs=3, seed=42):
+    """Run the notebook's steps on one capture, recording each stage. Returns (test accuracy, gestures, rows)."""
+    import numpy as np
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    from gesture_data import AXIS_COLUMNS, LABEL_COLUMN, SAMPLES_PER_GESTURE
+
+    with recorder.stage('load'):
+        data = pd.read_csv(path, sep=';')
+    with recorder.stage('dropna'):
+        data = data.dropna()
+    with recorder.stage('truncate'):
+        num_gestures = len(data) // SAMPLES_PER_GESTURE
+        data = data.iloc[:num_gestures * SAMPLES_PER_GESTURE]
+    with recorder.stage('reshape'):
+        X = data[AXIS_COLUMNS].values.reshape(num_gestures, SAMPLES_PER_GESTURE, len(AXIS_COLUMNS))
+        y = data[LABEL_COLUMN].iloc[::SAMPLES_PER_GESTURE]
+    with recorder.stage('encode'):
+        label_encoder = LabelEncoder()
+        y_encoded = label_encoder.fit_transform(y)
+    with recorder.stage('scale'):
+        scaler = StandardScaler()
+        X_normalized = scaler.fit_transform(X.reshape(-1, len(AXIS_COLUMNS))).reshape(X.shape)
+    with recorder.stage('augment'):
+        X_augmented = X_normalized[:, ::-1, :]
+        X_combined = np.vstack([X_normalized, X_augmented])
+        y_combined = np.concatenate([y_encoded, y_encoded])
+    with recorder.stage('split'):
+        X_train, X_test, y_train, y_test = train_test_split(X_combined, y_combined, test_size=0.2,
+                                                            random_state=seed, stratify=y_combined)
+
+    from tensorflow import keras
+
+    keras.utils.set_random_seed(seed)
+    model = notebook_model(len(label_encoder.classes_), X_train.shape[1:])
+    with recorder.stage('fit', epochs=epochs):
+        model.fit(X_train, y_train, epochs=epochs, batch_size=32, validation_split=0.2, verbose=0)
+    with recorder.stage('predict'):
+        predicted = np.argmax(model.predict(X_test, verbose=0), axis=1)
+    return float(np.mean(predicted == y_test)), num_gestures, len(data)
+
+
+def write_scaled_csv(source, path, factor, seed=0, block_rows=1_000_000):
+    """Write `factor` copies of a capture, each with +-2% noise on the samples, in the same CSV format."""
+    import numpy as np
+    import pandas as pd
+
+    from gesture_data import AXIS_COLUMNS
+
+    original = pd.read_csv(source, sep=';')
+    rng = np.random.default_rng(seed)
+    spread = np.maximum(original[AXIS_COLUMNS].std().to_numpy() * 0.02, 1)
+    copies_per_block = max(1, block_rows // len(original))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(';'.join(original.columns) + '\n')
+        for start in range(0, factor, copies_per_block):
+            block = pd.concat([original] * min(copies_per_block, factor - start), ignore_index=True)
+            noise = rng.normal(0, spread, size=(len(block), len(AXIS_COLUMNS)))
+            block[AXIS_COLUMNS] = (block[AXIS_COLUMNS].to_numpy() + noise).round().astype(np.int64)
+            block.to_csv(f, sep=';', header=False, index=False)
+
+
+def dataset_for(source, factor, directory):
+    """The capture for a scale factor, generated into directory unless it is already there."""
+    if factor == 1:
+        return Path(source)
+    path = Path(directory) / f"{Path(source).stem}.x{factor}.csv"
+    if not path.exists():
+        started = time.perf_counter()
+        write_scaled_csv(source, path, factor)
+        print(f"Generated {path} ({path.stat().st_size / 1e6:.0f} MB) in {time.perf_counter() - started:.1f} s")
+    return path
+
+
+def run_scale(args, factor, path, records_path):
+    """Run the pipeline for one scale in a fresh interpreter. Returns its records."""
+    command = [sys.executable, __file__, '--single', str(path), '--scale-factor', str(factor),
+               '--records', str(records_path), '--epochs', str(args.epochs), '--seed', str(args.seed)]
+    if not args.tracemalloc:
+        command.append('--no-tracemalloc')
+    if args.profile:
+        command += ['--profile', args.profile]
+    if args.py_spy:
+        command = ['py-spy', 'record', '--output', str(Path(args.py_spy) / f"x{factor}.svg"), '--'] + command
+    result = subprocess.run(command, cwd=ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(f"the {factor}x run failed with exit status {result.returncode}")
+    with open(records_path) as f:
+        return json.load(f)
+
+
+def environment():
+    versions = {}
+    for package in ('numpy', 'pandas', 'scikit-learn', 'tensorflow', 'keras'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'packages': versions}
+
+
+def _mib(value):
+    return f"{value / MIB:9.1f}" if value is not None else f"{'-':>9}"
+
+
+def print_table(records):
+    print(f"  {'scale':>5} {'stage':9} {'wall s':>8} {'cpu s':>8} {'RSS MiB':>9} {'peak MiB':>9} "
+          f"{'alloc pk':>9} {'alloc net':>9}")
+    for r in records:
+        print(f"  {r['scale']:>4}x {r['stage']:9} {r['wall_s']:8.3f} {r['cpu_s']:8.3f} {_mib(r['rss_after'])} "
+              f"{_mib(r['rss_peak'])} {_mib(r.get('alloc_peak'))} {_mib(r.get('alloc_net'))}")
+
+
+def compare(records, baseline, tolerance, min_seconds=0.05, min_bytes=MIB):
+    """Return regressions against a baseline's records: stages slower or allocating more than tolerance x."""
+    previous = {(r['scale'], r['stage']): r for r in baseline}
+    regressions = []
+    for r in records:
+        base = previous.get((r['scale'], r['stage']))
+        if base is None:
+            continue
+        # Stages too short or too small to measure reliably are not compared
+        if base['wall_s'] >= min_seconds and r['wall_s'] > tolerance * base['wall_s']:
+            regressions.append(f"{r['scale']}x {r['stage']}: {r['wall_s']:.3f} s vs {base['wall_s']:.3f} s")
+        if (base.get('alloc_peak') or 0) >= min_bytes and r.get('alloc_peak') is not None \
+                and r['alloc_peak'] > tolerance * base['alloc_peak']:
+            regressions.append(f"{r['scale']}x {r['stage']}: peak allocation {r['alloc_peak'] / MIB:.1f} MiB "
+                               f"vs {base['alloc_peak'] / MIB:.1f} MiB")
+    return regressions
+
+
+def run_single(args):
+    """The per-scale child process: run every stage and write the records to args.records."""
+    if args.profile:
+        Path(args.profile).mkdir(parents=True, exist_ok=True)
+    recorder = StageRecorder(args.tracemalloc, args.profile, prefix=f"x{args.scale_factor}-")
+    accuracy, gestures, rows = run_pipeline(args.single, recorder, epochs=args.epochs, seed=args.seed)
+    for record in recorder.records:
+        record.update(scale=args.scale_factor, rows=rows, gestures=gestures)
+    recorder.records[-1]['accuracy'] = accuracy
+    with open(args.records, 'w') as f:
+        json.dump(recorder.records, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and measure every stage of the lab pipeline")
+    parser.add_argument('--data', default=str(ROOT / 'data' / 'TDATA.csv'),
+                        help='Capture to run on and scale up (default: data/TDATA.csv)')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help='Dataset sizes as multiples of the capture (default: 1 10 100)')
+    parser.add_argument('--epochs', type=int, default=3, help='Training epochs (default: 3)')
+    parser.add_argument('--seed', type=int, default=42, help='Split and training seed (default: 42)')
+    parser.add_argument('--data-dir', metavar='DIR',
+                        help='Keep the generated datasets in DIR and reuse them (default: a temporary directory)')
+    parser.add_argument('--tracemalloc', action=argparse.BooleanOptionalAction, default=True,
+                        help='Trace Python allocations per stage (default: on)')
+    parser.add_argument('--profile', metavar='DIR', help='Write a cProfile .prof file per scale and stage to DIR')
+    parser.add_argument('--py-spy', metavar='DIR', help='Record a py-spy flame graph per scale into DIR')
+    parser.add_argument('--output', '-o', metavar='FILE', help='Write the results as JSON to FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='Earlier --output to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='Slowdown/allocation factor over the baseline that fails (default: 1.5)')
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    parser.add_argument('--scale-factor', type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument('--records', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args)
+        return
+
+    if args.py_spy:
+        if shutil.which('py-spy') is None:
+            print("Error: --py-spy needs py-spy on the PATH (pip install py-spy)")
+            sys.exit(1)
+        Path(args.py_spy).mkdir(parents=True, exist_ok=True)
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading {args.baseline}: {e}")
+            sys.exit(1)
+
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.data_dir or tmp
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        for factor in args.scales:
+            path = dataset_for(args.data, factor, directory)
+            try:
+                results = run_scale(args, factor, path, Path(tmp) / f"records.x{factor}.json")
+            except RuntimeError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            records.extend(results)
+            print(f"\n=== {factor}x: {results[0]['rows']:,} rows, {results[0]['gestures']:,} gestures, "
+                  f"test accuracy {results[-1]['accuracy']:.3f} ===")
+            print_table(results)
+
+    if args.output:
+        report = {'environment': environment(), 'options': {'epochs': args.epochs, 'seed': args.seed,
+                                                             'tracemalloc': args.tracemalloc},
+                  'results': records}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if baseline is not None:
+        regressions = compare(records, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.tolerance:g}x the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo stage regressed beyond {args.tolerance:g}x the baseline")
+
+
+if __name__ == '__main__':
+    main()
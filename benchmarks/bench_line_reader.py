@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+LineReader Latency Benchmark
+
+Compares the sleep-poll and event-driven LineReader modes over a
+pseudo-terminal pair. A device thread writes a marker on the pty master at
+irregular intervals and times how long it takes the host to answer with ACK;
+the host side reports the CPU time it spent doing so.
+
+Usage:
+    uv run python benchmarks/bench_line_reader.py [--markers N] [--gap SECONDS]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import serial
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from capture_serial_data import LineReader  # noqa: E402
+
+
+def run_device(master_fd, markers, gap, latencies):
+    """Send markers on the pty master and time the host's ACK replies."""
+    for _ in range(markers):
+        time.sleep(random.uniform(0, gap))
+        sent = time.perf_counter()
+        os.write(master_fd, b'<<<DATA>>>\n')
+        reply = b''
+        while not reply.endswith(b'ACK\n'):
+            reply += os.read(master_fd, 64)
+        latencies.append(time.perf_counter() - sent)
+    os.write(master_fd, b'<<<DONE>>>\n')
+
+
+def run_mode(blocking, markers, gap):
+    """Run one benchmark pass and return (latencies, host CPU seconds)."""
+    master_fd, slave_fd = os.openpty()
+    ser = serial.Serial(os.ttyname(slave_fd), baudrate=115200, timeout=0)
+    reader = LineReader(ser, blocking=blocking)
+    latencies = []
+    device = threading.Thread(target=run_device, args=(master_fd, markers, gap, latencies))
+
+    cpu_start = time.thread_time()
+    device.start()
+    try:
+        while True:
+            line = reader.read_line(timeout=10)
+            if line is None or line == '<<<DONE>>>':
+                break
+            ser.write(b'ACK\n')
+            ser.flush()
+        cpu = time.thread_time() - cpu_start
+    finally:
+        device.join()
+        ser.close()
+        os.close(slave_fd)
+        os.close(master_fd)
+
+    return latencies, cpu
+
+
+def report(name, latencies, cpu):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:10} marker->ACK p50 {statistics.median(latencies) * 1e6:8.1f} us"
+          f"  p99 {p99 * 1e6:8.1f} us  host CPU {cpu * 1e3:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LineReader polling vs blocking reads")
+    parser.add_argument('--markers', '-n', type=int, default=500, help='Markers per mode (default: 500)')
+    parser.add_argument('--gap', '-g', type=float, default=0.01,
+                        help='Maximum idle gap between markers in seconds (default: 0.01)')
+    args = parser.parse_args()
+
+    for name, blocking in (('poll', False), ('blocking', True)):
+        latencies, cpu = run_mode(blocking, args.markers, args.gap)
+        report(name, latencies, cpu)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Model Family Benchmark
+
+Trains the notebook's dense model and the gesture_models convolutional
+model (float, and quantization-aware) on the notebook's 80/20 stratified
+split of a capture, then reports for each way of running them:
+    params          trainable parameters
+    size KiB        the file the backend loads
+    accuracy        on the held-out 20%
+    single us       latency of one predict(window) call
+    batched us      latency per window of predict_batch() on --batch windows
+Backends are the saved Keras model, the NumPy export (dense model only) and
+the int8 TFLite export calibrated on the training windows, which is plain
+post-training quantization for the float models.
+
+Usage:
+    uv run python benchmarks/bench_models.py [data/TDATA.csv] [--epochs 50] [--windows 1000] [--batch 256]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from gesture_data import load_gesture_windows  # noqa: E402
+from gesture_dataset import stratified_split  # noqa: E402
+from gesture_inference import load_classifier  # noqa: E402
+from gesture_models import build_model, parameter_count  # noqa: E402
+from gesture_scaler import AxisScaler  # noqa: E402
+
+# name: (family, build options)
+MODELS = {
+    'dense': ('dense', {}),
+    'conv': ('conv', {}),
+    'conv-qat': ('conv', {'quantize': True}),
+}
+
+
+def time_single(classifier, windows):
+    classifier.predict(windows[0])
+    start = time.perf_counter()
+    for window in windows:
+        classifier.predict(window)
+    return (time.perf_counter() - start) / len(windows)
+
+
+def time_batched(classifier, windows, batch, repeats=5):
+    batch = windows[:batch]
+    classifier.predict_batch(batch)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        classifier.predict_batch(batch)
+    return (time.perf_counter() - start) / (repeats * len(batch))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the dense and convolutional model families")
+    parser.add_argument('data', nargs='?', default=str(ROOT / 'data' / 'TDATA.csv'),
+                        help='Capture to train and test on (default: data/TDATA.csv)')
+    parser.add_argument('--epochs', type=int, default=50, help='Training epochs per model (default: 50)')
+    parser.add_argument('--windows', type=int, default=1000, help='Windows timed one at a time (default: 1000)')
+    parser.add_argument('--batch', type=int, default=256, help='Batch size for batched latency (default: 256)')
+    parser.add_argument('--seed', type=int, default=42, help='Split and training seed (default: 42)')
+    args = parser.parse_args()
+
+    from tensorflow import keras
+
+    from gesture_export import export_tflite, export_weights
+
+    X, y, classes = load_gesture_windows(args.data)
+    train_idx, test_idx = stratified_split(y, test_size=0.2, random_state=args.seed)
+    scaler = AxisScaler()
+    scaler.partial_fit(X[train_idx])
+    X_train, X_test = scaler.transform(X[train_idx]), scaler.transform(X[test_idx])
+    y_train, y_test = y[train_idx], y[test_idx]
+    # Timing inputs: the test windows repeated up to the largest count needed
+    timing = np.resize(X_test, (max(args.windows, args.batch), *X_test.shape[1:]))
+    print(f"{len(X_train)} training / {len(X_test)} test windows, classes: {', '.join(map(str, classes))}, "
+          f"{args.epochs} epochs")
+
+    print(f"  {'model':9} {'backend':12} {'params':>7} {'size KiB':>9} {'accuracy':>9} "
+          f"{'single us':>10} {'batched us':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (family, options) in MODELS.items():
+            keras.utils.set_random_seed(args.seed)
+            model = build_model(family, len(classes), X.shape[1:], **options)
+            started = time.perf_counter()
+            model.fit(X_train, y_train, batch_size=32, epochs=args.epochs, shuffle=True, verbose=0)
+            trained = time.perf_counter() - started
+
+            paths = {'keras': Path(tmp) / f'{name}.keras'}
+            model.save(paths['keras'])
+            if family == 'dense':
+                paths['numpy'] = Path(tmp) / f'{name}.npz'
+                export_weights(model, paths['numpy'])
+            paths['tflite-int8'] = Path(tmp) / f'{name}.tflite'
+            # The converter prints the traced signature; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                export_tflite(model, paths['tflite-int8'], calibration=X_train)
+
+            for backend, path in paths.items():
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')  # tf.lite.Interpreter's deprecation notice
+                    classifier = load_classifier(path)
+                accuracy = float(np.mean(classifier.predict_batch(X_test).argmax(axis=1) == y_test))
+                single = time_single(classifier, timing[:args.windows])
+                batched = time_batched(classifier, timing, args.batch)
+                print(f"  {name:9} {backend:12} {parameter_count(model):7d} {path.stat().st_size / 1024:9.1f} "
+                      f"{accuracy:9.3f} {single * 1e6:10.1f} {batched * 1e6:11.1f}")
+            print(f"  {name:9} trained in {trained:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
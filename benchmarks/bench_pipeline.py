@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Pipelined Capture Benchmark
+
+Captures the same simulated session twice, once with the sequential capture
+loop and once with --pipeline, and prints the per-stage statistics of each
+run: how long the serial link sat idle before every ACK, how long the serial
+thread was busy after it, and the throughput of the parse and write stages.
+
+Usage:
+    uv run python benchmarks/bench_pipeline.py [--repetitions N] [--samples N]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import capture_serial_data  # noqa: E402
+from firmware_simulator import SimulatedFirmware  # noqa: E402
+
+
+def run_mode(pipeline, args, output_dir):
+    """Capture one simulated session and return (wall seconds, PipelineStats)."""
+    device = SimulatedFirmware(repetitions=args.repetitions, samples=args.samples, seed=0).start()
+    stats = capture_serial_data.PipelineStats()
+
+    start = time.perf_counter()
+    # The capture prompts before every gesture and prints per repetition; silence both
+    with mock.patch('builtins.input', return_value=''), contextlib.redirect_stdout(io.StringIO()):
+        ok = capture_serial_data.run_capture(device.port, str(Path(output_dir) / f"pipeline_{pipeline}.csv"),
+                                             pipeline=pipeline, stats=stats)
+    wall = time.perf_counter() - start
+    device.close()
+    if not ok:
+        raise RuntimeError("capture failed")
+    return wall, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and pipelined capture")
+    parser.add_argument('--repetitions', '-r', type=int, default=50, help='Repetitions per gesture (default: 50)')
+    parser.add_argument('--samples', '-s', type=int, default=100, help='Samples per repetition (default: 100)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, pipeline in (('sequential', False), ('pipelined', True)):
+            wall, stats = run_mode(pipeline, args, output_dir)
+            samples = stats.stages['receive'].samples
+            print(f"\n=== {name}: {samples} samples in {wall:.2f} s ({samples / wall:.0f} samples/s) ===")
+            stats.report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Startup Time Regression Check
+
+Imports each command-line tool and lab module in a fresh interpreter with
+`python -X importtime` and fails (exit status 1) if
+    - its cumulative import time exceeds the module's budget, or
+    - it pulls in a heavy dependency that it should only load lazily.
+The median of several runs is compared, to ride out disk-cache noise.
+
+Run it after touching imports; operators start capture_serial_data.py many
+times per session and TensorFlow alone takes seconds to import.
+
+The test suite runs the same check (tests/test_startup.py); set
+STARTUP_BUDGET_SCALE there in place of --scale.
+
+Usage:
+    uv run python benchmarks/check_startup.py [--runs N] [--scale FACTOR]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = {'numpy', 'pandas', 'pyarrow', 'tensorflow', 'keras', 'sklearn', 'matplotlib', 'seaborn'}
+ML = {'pandas', 'pyarrow', 'tensorflow', 'keras', 'sklearn', 'matplotlib', 'seaborn'}
+
+# module: (budget in milliseconds, packages it must not import at load)
+BUDGETS = {
+    'capture_serial_data': (60, HEAVY | {'asyncio'}),
+    'capture_metrics': (20, HEAVY),
+    'capture_schedule': (20, HEAVY),
+    'answers': (20, HEAVY),
+    'grade_answers': (60, HEAVY),
+    'firmware_simulator': (40, HEAVY),
+    'gesture_inference': (250, ML),
+    'gesture_scaler': (250, ML),
+    'gesture_data': (250, ML),
+    'gesture_augment': (250, ML),
+    'gesture_segment': (250, ML),
+    'gesture_dataset': (250, ML),
+    'gesture_export': (250, ML),
+    'gesture_models': (250, ML),
+    'gesture_sweep': (250, ML),
+    'inference_server': (300, ML),
+}
+
+
+def measure(module):
+    """Return (cumulative import time in ms, set of top-level packages imported)."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+
+    cumulative = None
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, micros, name = line[len('import time:'):].split('|')
+        packages.add(name.strip().split('.')[0])
+        if name.rstrip() == f' {module}':
+            cumulative = int(micros) / 1000
+    return cumulative, packages
+
+
+def check(module, runs=5, scale=1.0):
+    """Measure a module against its budget. Returns (median ms, limit ms, list of problems)."""
+    budget, forbidden = BUDGETS[module]
+    times = []
+    packages = set()
+    for _ in range(runs):
+        milliseconds, packages = measure(module)
+        times.append(milliseconds)
+    median = statistics.median(times)
+    limit = budget * scale
+    problems = []
+    if median > limit:
+        problems.append("over budget")
+    eager = sorted(forbidden & packages)
+    if eager:
+        problems.append(f"imports {', '.join(eager)} at load")
+    return median, limit, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import-time budgets of the project's modules")
+    parser.add_argument('--runs', type=int, default=5, help='Runs per module; the median is used (default: 5)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply every budget, e.g. 2 on a slow machine (default: 1)')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"  {'module':22} {'import ms':>10} {'budget ms':>10}  status")
+    for module in BUDGETS:
+        median, limit, problems = check(module, args.runs, args.scale)
+        print(f"  {module:22} {median:10.1f} {limit:10.0f}  {'; '.join(problems) or 'ok'}")
+        if problems:
+            failures.append(module)
+
+    if failures:
+        print(f"\nFAILED: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll modules within budget.")
+
+
+if __name__ == '__main__':
+    main()
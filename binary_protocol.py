@@ -0,0 +1,83 @@
+"""
+Binary Framed Data Protocol for Gesture Recognition Lab
+
+Optional replacement for the ASCII 'seq;x;y;z;label' data lines. A device
+that puts `encoding:binary` in its CONFIG block sends each repetition as
+
+    <<<DATA>>>
+    <<<BIN:N>>>
+    N packed frames, FRAME_SIZE bytes each
+    <<<CRC:xxxxxxxx>>>
+
+where a frame is little-endian uint16 seq, int16 x, y, z and a uint8 label
+id (the gesture's index in the CONFIG gestures list), and the CRC is the
+CRC-32 of the frame bytes in hex. The host answers ACK or NACK as usual.
+A frame is 9 bytes against roughly 20 for the same sample as text, and the
+CRC catches corruption that a line count cannot.
+"""
+
+import struct
+import zlib
+
+FRAME = struct.Struct('<HhhhB')
+FRAME_SIZE = FRAME.size
+
+BIN_MARKER = "<<<BIN:"
+CRC_MARKER = "<<<CRC:"
+
+
+def frame_dtype():
+    """NumPy structured dtype matching FRAME."""
+    import numpy as np
+
+    return np.dtype([('seq', '<u2'), ('x', '<i2'), ('y', '<i2'), ('z', '<i2'), ('label', 'u1')])
+
+
+def encode_frames(samples, label_id):
+    """Pack (seq, x, y, z) tuples with one label id into frame bytes."""
+    return b''.join(FRAME.pack(seq, x, y, z, label_id) for seq, x, y, z in samples)
+
+
+def frame_checksum(payload):
+    return zlib.crc32(payload) & 0xFFFFFFFF
+
+
+def format_crc_marker(payload):
+    return f"{CRC_MARKER}{frame_checksum(payload):08x}>>>"
+
+
+def parse_bin_marker(line):
+    """Return N from a '<<<BIN:N>>>' line, or -1 if the line is something else."""
+    if line and line.startswith(BIN_MARKER) and line.endswith(">>>"):
+        try:
+            return int(line[len(BIN_MARKER):-3])
+        except ValueError:
+            pass
+    return -1
+
+
+def parse_crc_marker(line):
+    """Return the CRC from a '<<<CRC:xxxxxxxx>>>' line, or None if the line is something else."""
+    if line and line.startswith(CRC_MARKER) and line.endswith(">>>"):
+        try:
+            return int(line[len(CRC_MARKER):-3], 16)
+        except ValueError:
+            pass
+    return None
+
+
+def decode_frames(payload):
+    """Decode frame bytes into a structured array in one pass (no copy)."""
+    import numpy as np
+
+    return np.frombuffer(payload, dtype=frame_dtype(), count=len(payload) // FRAME_SIZE)
+
+
+def frames_to_samples(frames, gestures):
+    """Split decoded frames into an int16 (n, 3) array and per-row label names."""
+    import numpy as np
+
+    values = np.stack([frames['x'], frames['y'], frames['z']], axis=1)
+    names = np.array(gestures + ['unknown'])
+    ids = np.minimum(frames['label'], len(gestures))
+    return values, names[ids]
@@ -0,0 +1,276 @@
+"""
+Concurrent Capture Engine for Gesture Recognition Lab
+
+Drives several capture devices from one process with asyncio. Each port runs
+the same CONFIG -> READY -> REP -> DATA -> COUNT -> ACK protocol as
+capture_serial_data.run_capture, as one coroutine per device, so a recording
+station no longer needs a terminal per board. The protocol itself is not
+repeated here: DeviceSession.run_steps() feeds the protocol steps of
+capture_serial_data from the asyncio reader.
+
+Used by capture_serial_data.py when more than one --port is given or with
+--all-ports.
+"""
+
+import asyncio
+from collections import deque
+from pathlib import Path
+
+import serial
+
+from binary_protocol import frames_to_samples
+from capture_output import CaptureWriter
+from capture_serial_data import (
+    LineReader,
+    ProtocolContext,
+    _port_fileno,
+    binary_repetition_steps,
+    config_steps,
+    marker_steps,
+    output_for_port,
+    repetition_steps,
+    strip_sequence_field,
+)
+
+
+class AsyncLineReader:
+    """asyncio front end for LineReader.
+
+    Wakes when the event loop reports the port's descriptor readable and
+    reuses LineReader's buffer for the actual line splitting. Ports without a
+    descriptor fall back to short blocking reads in a worker thread.
+    """
+
+    def __init__(self, ser, loop):
+        self.reader = LineReader(ser, blocking=False)
+        self.loop = loop
+        self.fileno = _port_fileno(ser)
+        self.readable = asyncio.Event()
+        self.pending = deque()
+        if self.fileno is not None:
+            loop.add_reader(self.fileno, self.readable.set)
+
+    def close(self):
+        if self.fileno is not None:
+            self.loop.remove_reader(self.fileno)
+
+    async def read_line(self, timeout=None):
+        """Read a line, returning None if none arrives within timeout."""
+        deadline = None if not timeout else self.loop.time() + timeout
+        while not self.pending:
+            self.readable.clear()
+            self.pending.extend(self.reader.read_available())
+            if self.pending:
+                break
+
+            remaining = None if deadline is None else deadline - self.loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+
+            if self.fileno is None:
+                wait = 0.1 if remaining is None else min(remaining, 0.1)
+                self.pending.extend(await asyncio.to_thread(self.reader.read_lines, wait))
+                continue
+
+            try:
+                await asyncio.wait_for(self.readable.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return self.pending.popleft()
+
+    async def read_exact(self, size, timeout=None):
+        """Read exactly size raw bytes, returning None if they do not arrive within timeout."""
+        deadline = None if not timeout else self.loop.time() + timeout
+        self.pending.clear()
+        while True:
+            self.readable.clear()
+            data = self.reader.take_bytes(size)
+            if data is not None:
+                return data
+
+            remaining = None if deadline is None else deadline - self.loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+
+            if self.fileno is None:
+                wait = 0.1 if remaining is None else min(remaining, 0.1)
+                await asyncio.to_thread(self.reader._wait_for_data, wait)
+                continue
+
+            try:
+                await asyncio.wait_for(self.readable.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+
+class DeviceSession:
+    """State for one device being captured concurrently with others."""
+
+    def __init__(self, port, output_file, console_lock, debug=False, fsync_every=0, fmt='csv',
+                 gap_policy='nack', trigger=None):
+        self.port = port
+        self.trigger = trigger
+        self.gap_policy = gap_policy
+        self.output_file = output_file
+        self.fsync_every = fsync_every
+        self.fmt = fmt
+        self.writer = None
+        self.console_lock = console_lock
+        self.debug = debug
+        self.name = Path(port).name
+        self.protocol = ProtocolContext(debug, log=self.log)
+        self.ser = None
+        self.reader = None
+        self.total_samples = 0
+
+    def log(self, message):
+        print(f"[{self.name}] {message}")
+
+    def send(self, data):
+        self.ser.write(data)
+        self.ser.flush()
+
+    async def run_steps(self, steps):
+        """Async counterpart of capture_serial_data.run_steps: drive protocol steps from this device."""
+        result = None
+        while True:
+            try:
+                request = steps.send(result)
+            except StopIteration as done:
+                return done.value
+            if request[0] == 'line':
+                result = await self.reader.read_line(timeout=request[1])
+            elif request[0] == 'bytes':
+                result = await self.reader.read_exact(request[1], timeout=request[2])
+            else:
+                self.send(request[1])
+                result = None
+
+    async def wait_for_marker(self, marker, timeout=30):
+        """Wait for a specific marker from the device."""
+        return await self.run_steps(marker_steps(self.protocol, marker, timeout))
+
+    async def collect_repetition_data(self, rep_num, expected_samples, max_retries=3, labels=None):
+        """Collect data for one repetition with ACK/NACK retry."""
+        return await self.run_steps(repetition_steps(self.protocol, rep_num, expected_samples, max_retries,
+                                                     self.gap_policy, labels=labels))
+
+    async def collect_gesture_data(self, gesture_name, gesture_index, config):
+        """Collect all repetitions of one gesture, queueing each for the writer thread."""
+        repetitions = config['repetitions']
+        total_gestures = len(config['gestures'])
+
+        await self.wait_for_marker("<<<READY>>>")
+
+        # Prompts from several devices must not interleave on the terminal
+        async with self.console_lock:
+            print()
+            self.log(f"=== Prepare for gesture: {gesture_name} ({gesture_index + 1}/{total_gestures}) ===")
+            self.log(f"    {repetitions} repetitions, {config['samples']} samples each")
+            if self.trigger is None:
+                await asyncio.to_thread(input, f"[{self.name}] Press ENTER when ready...")
+            elif self.trigger.interactive:
+                await asyncio.to_thread(self.trigger.wait, gesture_name, f"[{self.name}] ")
+        # Unattended starts run outside the lock, so the boards count down or wait side by side
+        if self.trigger is not None and not self.trigger.interactive:
+            await asyncio.to_thread(self.trigger.wait, gesture_name, f"[{self.name}] ")
+
+        self.send(b'\n')
+
+        total_samples = 0
+        for rep in range(1, repetitions + 1):
+            await self.wait_for_marker(f"<<<REP:{rep}>>>")
+            # The writer's queue blocks when full; wait for it off the event loop so the other boards keep going
+            if config['encoding'] == 'binary':
+                rep_data = await self.run_steps(binary_repetition_steps(self.protocol, rep, config['samples']))
+                await asyncio.to_thread(self.writer.write_samples, *frames_to_samples(rep_data, config['gestures']))
+            else:
+                rep_data = await self.collect_repetition_data(rep, config['samples'], labels=config['gestures'])
+                await asyncio.to_thread(self.writer.write_rows, rep_data)
+
+            total_samples += len(rep_data)
+            self.log(f"  {gesture_name}: repetition {rep}/{repetitions} complete ({len(rep_data)} samples)")
+
+        await self.wait_for_marker("<<<GESTURE_DONE>>>")
+        await asyncio.to_thread(self.writer.checkpoint)
+        self.log(f"Completed gesture: {gesture_name} ({total_samples} samples)")
+        return total_samples
+
+    async def run(self):
+        """Run a full capture session on this device. Returns True on success."""
+        try:
+            self.ser = serial.Serial(
+                port=self.port,
+                baudrate=115200,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=0  # Non-blocking
+            )
+        except serial.SerialException as e:
+            self.log(f"Error opening port: {e}")
+            return False
+
+        self.reader = AsyncLineReader(self.ser, asyncio.get_running_loop())
+        try:
+            self.log("Waiting for device...")
+            await self.wait_for_marker("<<<CONFIG>>>", timeout=60)
+            config = await self.run_steps(config_steps())
+            Path(self.output_file).parent.mkdir(parents=True, exist_ok=True)
+            self.writer = CaptureWriter(self.output_file, strip_sequence_field(config['header']),
+                                        fsync_every=self.fsync_every, fmt=self.fmt)
+            self.output_file = self.writer.output_file
+            self.log(f"Gestures: {', '.join(config['gestures'])}, "
+                     f"{config['repetitions']} x {config['samples']} samples, writing to {self.output_file}")
+
+            for i, gesture in enumerate(config['gestures']):
+                self.total_samples += await self.collect_gesture_data(gesture, i, config)
+
+            await self.wait_for_marker("<<<DONE>>>")
+            await asyncio.to_thread(self.writer.close)
+            self.log(f"Collection complete! Saved {self.total_samples} samples to {self.output_file}")
+            return True
+
+        except (TimeoutError, OSError, ImportError) as e:
+            self.log(f"Error: {e}")
+            return False
+
+        finally:
+            self.reader.close()
+            self.ser.close()
+            if self.writer is not None:
+                try:
+                    await asyncio.to_thread(self.writer.close)
+                except OSError:
+                    pass
+
+
+async def capture_many(ports, output_file, debug=False, fsync_every=0, fmt='csv', gap_policy='nack', trigger=None):
+    """Capture from every port concurrently. Returns a {port: success} dict.
+
+    trigger (see capture_schedule) starts each gesture instead of the ENTER prompt.
+    """
+    console_lock = asyncio.Lock()
+    sessions = [DeviceSession(port, output_for_port(output_file, port), console_lock, debug=debug,
+                              fsync_every=fsync_every, fmt=fmt, gap_policy=gap_policy, trigger=trigger)
+                for port in ports]
+    results = await asyncio.gather(*(session.run() for session in sessions))
+    return dict(zip(ports, results))
+
+
+def run_capture_many(ports, output_file, debug=False, fsync_every=0, fmt='csv', gap_policy='nack', trigger=None):
+    """Synchronous entry point for capture_many. Returns True if every device succeeded."""
+    print(f"Capturing from {len(ports)} devices: {', '.join(ports)}")
+    try:
+        results = asyncio.run(capture_many(ports, output_file, debug=debug, fsync_every=fsync_every,
+                                              fmt=fmt, gap_policy=gap_policy, trigger=trigger))
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+        return False
+
+    print()
+    print("=" * 60)
+    for port, ok in results.items():
+        print(f"  {port}: {'complete' if ok else 'FAILED'}")
+    print("=" * 60)
+    return all(results.values())
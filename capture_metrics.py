@@ -0,0 +1,195 @@
+"""
+Capture Metrics for Gesture Recognition Lab
+
+Counters and histograms for the capture hot path: bytes and lines per read,
+receive buffer fill, marker wait time, ACK round-trip (reply sent until the
+device's next line arrives), ACK/NACK/RESEND counts and output write
+latency. The capture code only touches them through `if metrics is not
+None` checks, so a capture without --metrics pays nothing beyond that.
+
+Each metric is updated from a single thread (the serial thread, or the
+writer thread for write latency), so no locking is needed; exporters read
+them from their own thread and may see a slightly stale value.
+
+Usage:
+    uv run python capture_serial_data.py --auto --metrics capture-metrics.jsonl
+    uv run python capture_serial_data.py --auto --metrics-port 9464   # http://127.0.0.1:9464/metrics
+"""
+
+import bisect
+import json
+import threading
+import time
+
+
+class Counter:
+    """A monotonically increasing count."""
+
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.help = description
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+    def prometheus(self):
+        return [f"{self.name} {self.value}"]
+
+
+class Histogram:
+    """Observation counts in fixed buckets, plus their count and sum (Prometheus style)."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, description, bounds):
+        self.name = name
+        self.help = description
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        buckets = {f"{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+    def prometheus(self):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+SECONDS = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30]
+
+
+class CaptureMetrics:
+    """The capture session's metrics, handed to LineReader, CaptureWriter and run_capture()."""
+
+    def __init__(self):
+        self.bytes_read = Counter('capture_bytes_read_total', 'Bytes read from the serial port')
+        self.reads = Counter('capture_reads_total', 'Reads that returned data')
+        self.lines_per_read = Histogram('capture_lines_per_read', 'Complete lines split off per read',
+                                        [0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.buffer_bytes = Histogram('capture_buffer_bytes', 'Unconsumed bytes in the receive buffer after a read',
+                                      [0, 64, 256, 1024, 4096, 16384, 65536])
+        self.marker_wait = Histogram('capture_marker_wait_seconds', 'Time spent waiting for a protocol marker',
+                                     SECONDS)
+        self.ack_round_trip = Histogram('capture_ack_round_trip_seconds',
+                                        'Reply sent until the next line from the device', SECONDS)
+        self.acks = Counter('capture_acks_total', 'Repetitions acknowledged')
+        self.nacks = Counter('capture_nacks_total', 'Full repetition resends requested')
+        self.resends = Counter('capture_resends_total', 'Partial (sequence range) resends requested')
+        self.write_latency = Histogram('capture_write_seconds', 'Output writer batch write and flush time', SECONDS)
+        self.reply_sent = None
+
+    def metrics(self):
+        return [value for value in vars(self).values() if isinstance(value, (Counter, Histogram))]
+
+    def replied(self, reply):
+        """Count an ACK/NACK/RESEND and start timing its round trip."""
+        if reply == b'ACK\n':
+            self.acks.inc()
+        elif reply == b'NACK\n':
+            self.nacks.inc()
+        else:
+            self.resends.inc()
+        self.reply_sent = time.perf_counter()
+
+    def read(self, lines, buffered, now):
+        """Record one read that completed `lines` lines and left `buffered` bytes unconsumed."""
+        self.reads.inc()
+        self.lines_per_read.observe(lines)
+        self.buffer_bytes.observe(buffered)
+        if lines and self.reply_sent is not None:
+            self.ack_round_trip.observe(now - self.reply_sent)
+            self.reply_sent = None
+
+    def snapshot(self):
+        """Return {'time': unix time, metric name: value or histogram dict}."""
+        snapshot = {'time': time.time()}
+        for metric in self.metrics():
+            snapshot[metric.name] = metric.snapshot()
+        return snapshot
+
+    def prometheus_text(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus())
+        return '\n'.join(lines) + '\n'
+
+
+class JsonLinesExporter:
+    """Appends a snapshot of the metrics to a file every `interval` seconds, and once more on close()."""
+
+    def __init__(self, metrics, path, interval=1.0):
+        self.metrics = metrics
+        self.interval = interval
+        self.file = open(path, 'a')
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics exporter", daemon=True)
+        self.thread.start()
+
+    def _write(self):
+        self.file.write(json.dumps(self.metrics.snapshot()) + '\n')
+        self.file.flush()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self._write()
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self._write()
+        self.file.close()
+
+
+class PrometheusExporter:
+    """Serves the metrics at http://host:port/metrics from a background thread."""
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics endpoint", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
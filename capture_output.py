@@ -0,0 +1,378 @@
+"""
+Capture Output Writers for Gesture Recognition Lab
+
+Persists captured repetitions off the serial thread. The capture loop hands
+each repetition to a writer and goes straight back to the device; a
+background thread owns the open output file(s), writes whatever has queued
+up in one batch and fsyncs at configurable checkpoints.
+
+Three output formats are supported:
+    csv      semicolon-separated text, the format described in data/sample_data_format.md
+    npy      a directory with one int16 (n, 3) .npy file per gesture, loadable memory-mapped,
+             and a labels.json mapping each file to its gesture label
+    parquet  one Parquet file with int16 axis columns and a dictionary-encoded label (needs pyarrow)
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+
+OUTPUT_FORMATS = ('csv', 'npy', 'parquet')
+
+AXIS_COLUMNS = ['X-acc', 'Y-acc', 'Z-acc']
+
+# Fixed .npy header size, so the row count can be rewritten in place as the file grows
+NPY_HEADER_SIZE = 128
+# {file name: label} of an npy capture; file names cannot carry every label
+NPY_LABELS_FILE = 'labels.json'
+
+_CHECKPOINT = object()
+_CLOSE = object()
+
+
+def output_path_for_format(output_file, fmt):
+    """Map the --output path onto a format: data/x.csv -> data/x/ (npy) or data/x.parquet."""
+    path = Path(output_file)
+    if fmt == 'npy':
+        return path.with_suffix('')
+    if fmt == 'parquet':
+        return path.with_suffix('.parquet')
+    return path
+
+
+def _is_int16(text):
+    digits = text[1:] if text[:1] == '-' else text
+    return digits.isdigit() and -32768 <= int(text) <= 32767
+
+
+def split_rows(lines):
+    """Split 'x;y;z;label' lines into an int16 (n, 3) array and a list of labels.
+
+    Lines that do not have exactly four fields, or whose axis values are not
+    int16 integers, are dropped.
+    """
+    import numpy as np
+
+    fields = [line.split(';') for line in lines]
+    fields = [f for f in fields if len(f) == 4 and all(_is_int16(v) for v in f[:3])]
+    values = np.array([f[:3] for f in fields], dtype=np.int16).reshape(-1, 3)
+    labels = [f[3] for f in fields]
+    return values, labels
+
+
+class CsvSink:
+    """Semicolon-separated text output."""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8', buffering=1 << 16)
+        self.file.write(header + '\n')
+
+    def write(self, lines):
+        self.file.write('\n'.join(lines) + '\n')
+        return len(lines)
+
+    def write_samples(self, values, labels):
+        if len(values):
+            self.write([f"{x};{y};{z};{label}" for (x, y, z), label in zip(values.tolist(), labels)])
+        return len(values)
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def _npy_header(rows):
+    """Return a NPY_HEADER_SIZE-byte .npy v1.0 header for an int16 (rows, 3) array."""
+    import numpy as np
+
+    header = "{'descr': '<i2', 'fortran_order': False, 'shape': (%d, 3), }" % rows
+    header = header.ljust(NPY_HEADER_SIZE - 11) + '\n'
+    return np.lib.format.magic(1, 0) + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+class NpySink:
+    """One growing int16 (n, 3) .npy file per gesture label.
+
+    Rows are appended as raw bytes after a fixed-size header. The header's
+    row count is rewritten at every sync, so each file is a valid .npy that
+    np.load(..., mmap_mode='r') can open between checkpoints. File names are
+    the labels with unsafe characters replaced by '_'; labels that end up
+    with the same name get a numeric suffix ('a_b', 'a_b-2'). The original
+    labels are kept in NPY_LABELS_FILE, rewritten whenever a label is added.
+    """
+
+    def __init__(self, path, header):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.files = {}
+        self.rows = {}
+        self.labels = {}  # file name -> label
+
+    def _file_for(self, label):
+        if label not in self.files:
+            base = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label) or '_'
+            name, suffix = f"{base}.npy", 2
+            while name in self.labels:
+                name, suffix = f"{base}-{suffix}.npy", suffix + 1
+            f = open(self.path / name, 'wb', buffering=1 << 16)
+            f.write(_npy_header(0))
+            self.files[label] = f
+            self.rows[label] = 0
+            self.labels[name] = label
+            self._write_labels()
+        return self.files[label]
+
+    def _write_labels(self):
+        manifest = self.path / NPY_LABELS_FILE
+        tmp = manifest.with_name(manifest.name + '.tmp')
+        tmp.write_text(json.dumps(self.labels, indent=1, ensure_ascii=False) + '\n', encoding='utf-8')
+        os.replace(tmp, manifest)
+
+    def write(self, lines):
+        return self.write_samples(*split_rows(lines))
+
+    def write_samples(self, values, labels):
+        import numpy as np
+
+        if not len(values):
+            return 0
+        labels = np.asarray(labels)
+        for label in dict.fromkeys(labels.tolist()):
+            rows = values[labels == label]
+            self._file_for(label).write(rows.astype('<i2', copy=False).tobytes())
+            self.rows[label] += len(rows)
+        return len(values)
+
+    def flush(self):
+        for f in self.files.values():
+            f.flush()
+
+    def sync(self):
+        for label, f in self.files.items():
+            f.flush()
+            end = f.tell()
+            f.seek(0)
+            f.write(_npy_header(self.rows[label]))
+            f.seek(end)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        if any(not f.closed for f in self.files.values()):
+            self.sync()
+        for f in self.files.values():
+            f.close()
+
+
+class ParquetSink:
+    """Parquet output with int16 axis columns and a dictionary-encoded label column.
+
+    Each written batch becomes one row group.
+    """
+
+    def __init__(self, path, header):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: uv pip install pyarrow") from None
+
+        self.pa = pa
+        self.schema = pa.schema([(name, pa.int16()) for name in AXIS_COLUMNS]
+                                + [('label', pa.dictionary(pa.int8(), pa.string()))])
+        self.path = path
+        self.file = open(path, 'wb')
+        self.writer = pq.ParquetWriter(self.file, self.schema)
+
+    def write(self, lines):
+        return self.write_samples(*split_rows(lines))
+
+    def write_samples(self, values, labels):
+        pa = self.pa
+        if not len(values):
+            return 0
+        labels = [str(label) for label in labels]
+        columns = [pa.array(values[:, i]) for i in range(3)]
+        label_type = self.schema.field('label').type
+        columns.append(pa.array(labels, type=pa.string()).dictionary_encode().cast(label_type))
+        self.writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+        return len(values)
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        # Row groups are only readable once the footer is written at close
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if not self.file.closed:
+            self.writer.close()
+            self.file.close()
+
+
+SINKS = {'csv': CsvSink, 'npy': NpySink, 'parquet': ParquetSink}
+
+
+class CaptureWriter:
+    """Background writer for capture output.
+
+    Repetitions are passed to write_rows() as lists of 'x;y;z;label' lines and
+    go through a bounded queue, so a slow disk only stalls acquisition once
+    queue_size repetitions are waiting. Conversion to the binary formats
+    happens on the writer thread as well. Output is fsynced every fsync_every
+    repetitions (0 disables that), at every checkpoint() and on close().
+    """
+
+    def __init__(self, output_file, header, queue_size=64, fsync_every=0, fmt='csv', stats=None, metrics=None):
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown output format {fmt!r} (choose from {', '.join(OUTPUT_FORMATS)})")
+        self.output_file = str(output_path_for_format(output_file, fmt))
+        self.fsync_every = fsync_every
+        self.stats = stats
+        self.metrics = metrics
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.rows_written = 0
+
+        # Open in the caller's thread so a bad path fails before capture starts
+        self.sink = SINKS[fmt](self.output_file, header)
+
+        self.thread = threading.Thread(target=self._run, name=f"writer {self.output_file}", daemon=True)
+        self.thread.start()
+
+    def write_rows(self, rows):
+        """Queue one repetition's lines for writing."""
+        self._raise_if_failed()
+        self.queue.put(rows)
+
+    def write_samples(self, values, labels):
+        """Queue one repetition already decoded to an (n, 3) array and per-row labels."""
+        self._raise_if_failed()
+        self.queue.put((values, labels))
+
+    def checkpoint(self):
+        """Ask the writer to flush and fsync everything queued so far."""
+        self._raise_if_failed()
+        self.queue.put(_CHECKPOINT)
+
+    def close(self):
+        """Write out everything still queued, fsync and close the output."""
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
+        if self.error is None:
+            self.sink.close()
+        self._raise_if_failed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _raise_if_failed(self):
+        if self.error is None:
+            return
+        if isinstance(self.error, (OSError, ValueError)):
+            raise OSError(f"Writing {self.output_file} failed: {self.error}") from self.error
+        # Anything else is a bug in a sink; surface it as it was raised on the writer thread
+        raise self.error
+
+    def _run(self):
+        reps_since_sync = 0
+        done = False
+        try:
+            while True:
+                # Drain everything that piled up while we were busy into one batch
+                batch = [self.queue.get()]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                started = time.perf_counter()
+                rows_before = self.rows_written
+                lines = []
+                sync = False
+                for item in batch:
+                    if item is _CHECKPOINT:
+                        sync = True
+                    elif item is _CLOSE:
+                        done = True
+                    elif isinstance(item, tuple):
+                        # Decoded samples: write any text lines batched so far first to keep order
+                        if lines:
+                            self.rows_written += self.sink.write(lines)
+                            lines = []
+                        self.rows_written += self.sink.write_samples(*item)
+                        reps_since_sync += 1
+                    else:
+                        lines.extend(item)
+                        reps_since_sync += 1
+
+                if lines:
+                    self.rows_written += self.sink.write(lines)
+                if self.fsync_every and reps_since_sync >= self.fsync_every:
+                    sync = True
+
+                if sync or done:
+                    self.sink.sync()
+                    reps_since_sync = 0
+                else:
+                    self.sink.flush()
+
+                if self.stats is not None:
+                    self.stats.record('write', self.rows_written - rows_before, time.perf_counter() - started)
+                if self.metrics is not None:
+                    self.metrics.write_latency.observe(time.perf_counter() - started)
+
+                if done:
+                    self.sink.close()
+                    return
+        except Exception as e:
+            # Any failure must reach the producer, or it would block forever on a full queue
+            self.error = e
+            # Keep draining so producers blocked on a full queue are released
+            while not done:
+                done = self.queue.get() is _CLOSE
+
+
+def load_npy_capture(path, mmap=True):
+    """Open a capture written with --format npy.
+
+    Returns {label: int16 (n, 3) array}, with the labels taken from the
+    capture's NPY_LABELS_FILE; a directory without one raises
+    FileNotFoundError. With mmap=True the arrays are read-only memory maps,
+    so opening even a very large capture costs nothing until the samples are
+    touched.
+    """
+    import numpy as np
+
+    path = Path(path)
+    manifest = path / NPY_LABELS_FILE
+    if not manifest.exists():
+        raise FileNotFoundError(f"{path} has no {NPY_LABELS_FILE}, so its gesture labels are unknown")
+    labels = json.loads(manifest.read_text(encoding='utf-8'))
+    return {label: np.load(path / name, mmap_mode='r' if mmap else None) for name, label in labels.items()}
+
+
+def load_parquet_capture(path):
+    """Open a capture written with --format parquet as a memory-mapped pyarrow Table."""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, memory_map=True)
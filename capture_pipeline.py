@@ -0,0 +1,165 @@
+"""
+Pipelined Capture Stages for Gesture Recognition Lab
+
+With --pipeline the serial thread only frames a repetition, checks its
+counts and sends the ACK; parsing and validating the sample lines happens
+on a worker thread that feeds the output writer. Repetition n is then
+parsed and written while repetition n+1 is already arriving.
+
+PipelineStats measures every stage and the time the serial link sits idle
+waiting on the host, so both modes can be compared with --stats:
+    receive  DATA marker to COUNT marker
+    ack      end of the repetition until the ACK is sent (link idle)
+    handoff  ACK sent until the serial thread reads again (link backs up)
+    parse    stripping and validating sample lines
+    write    output writer batches
+"""
+
+import queue
+import threading
+import time
+
+STAGES = ('receive', 'ack', 'handoff', 'parse', 'write')
+
+_CLOSE = object()
+
+
+class StageStats:
+    """Items, samples and busy time for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.samples = 0
+        self.busy = 0.0
+
+    def add(self, samples, seconds):
+        self.items += 1
+        self.samples += samples
+        self.busy += seconds
+
+    @property
+    def rate(self):
+        """Samples per busy second."""
+        return self.samples / self.busy if self.busy > 0 else 0.0
+
+
+class PipelineStats:
+    """Per-stage throughput and serial-link idle time for one capture session.
+
+    Each stage is only updated from one thread, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.stages = {name: StageStats(name) for name in STAGES}
+        self.link_idle = []
+        self.malformed = 0
+        self.block_end = None
+        self.ack_time = None
+        self.started = time.perf_counter()
+
+    def record(self, stage, samples, seconds):
+        self.stages[stage].add(samples, seconds)
+
+    def end_of_block(self):
+        """Mark the moment the last line of a repetition was read."""
+        self.block_end = time.perf_counter()
+
+    def acked(self, samples):
+        """Record an ACK: the link was idle from end_of_block() until now."""
+        if self.block_end is None:
+            return
+        self.ack_time = time.perf_counter()
+        idle = self.ack_time - self.block_end
+        self.link_idle.append(idle)
+        self.record('ack', samples, idle)
+        self.block_end = None
+
+    def resumed(self, samples):
+        """Record that the serial thread is reading again after handing off a repetition."""
+        if self.ack_time is None:
+            return
+        self.record('handoff', samples, time.perf_counter() - self.ack_time)
+        self.ack_time = None
+
+    def report(self):
+        import statistics
+
+        wall = time.perf_counter() - self.started
+        print()
+        print("Pipeline statistics:")
+        print(f"  {'stage':8} {'reps':>6} {'samples':>9} {'busy s':>9} {'samples/s':>12}")
+        for stage in self.stages.values():
+            print(f"  {stage.name:8} {stage.items:6d} {stage.samples:9d} {stage.busy:9.4f} {stage.rate:12.0f}")
+        if self.link_idle:
+            idle = sorted(self.link_idle)
+            p99 = idle[min(len(idle) - 1, int(len(idle) * 0.99))]
+            print(f"  link idle before ACK: total {sum(idle) * 1e3:.2f} ms, "
+                  f"median {statistics.median(idle) * 1e6:.0f} us, p99 {p99 * 1e6:.0f} us "
+                  f"({100 * sum(idle) / wall:.3f}% of {wall:.2f} s)")
+        if self.malformed:
+            print(f"  malformed sample lines: {self.malformed}")
+
+
+def parse_repetition(raw_lines):
+    """Strip sequence fields and count lines that are not 'x;y;z;label' with integer axes.
+
+    Returns (lines, malformed). Malformed lines are kept, as the sequential
+    path does, so both modes write identical output.
+    """
+    lines = []
+    malformed = 0
+    for line in raw_lines:
+        parts = line.split(';')
+        if len(parts) == 5:
+            parts = parts[1:]
+            line = ';'.join(parts)
+        if len(parts) != 4 or not all(p.lstrip('-').isdigit() for p in parts[:3]):
+            malformed += 1
+        lines.append(line)
+    return lines, malformed
+
+
+class RepetitionParser:
+    """Worker stage between the serial reader and the output writer.
+
+    Raw repetitions are submitted through a bounded queue; the worker parses
+    them with parse_repetition() and hands the result to writer.write_rows().
+    """
+
+    def __init__(self, writer, stats, queue_size=16):
+        self.writer = writer
+        self.stats = stats
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="repetition parser", daemon=True)
+        self.thread.start()
+
+    def submit(self, raw_lines):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(raw_lines)
+
+    def close(self):
+        """Parse everything still queued and stop the worker."""
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _CLOSE:
+                return
+            if self.error is not None:
+                continue
+            try:
+                start = time.perf_counter()
+                lines, malformed = parse_repetition(item)
+                self.stats.malformed += malformed
+                self.stats.record('parse', len(lines), time.perf_counter() - start)
+                self.writer.write_rows(lines)
+            except OSError as e:
+                self.error = e
@@ -0,0 +1,151 @@
+"""
+Unattended Gesture Start for Gesture Recognition Lab
+
+By default the capture script asks the operator to press ENTER before each
+gesture, and the device sits idle until then. A start trigger replaces that
+prompt so recordings can run unattended:
+
+    --countdown SECONDS  start every gesture after a fixed countdown
+    --schedule FILE      per-gesture countdowns, one 'gesture seconds' per line
+    --trigger signal     start when the process receives SIGUSR1
+    --trigger fifo:PATH  start when a line is written to the named pipe PATH
+
+A schedule file may use '*' for gestures it does not name; '#' starts a
+comment. Gestures that are neither listed nor covered by '*' start at once:
+
+    # gesture  countdown (s)
+    idle       3
+    waving     10
+    *          5
+
+A signal or FIFO line starts every gesture that is waiting for it at that
+moment, on every board; triggers sent while no gesture is waiting are
+ignored.
+
+Usage:
+    uv run python capture_serial_data.py --auto --countdown 5
+    uv run python capture_serial_data.py --all-ports --trigger fifo:/tmp/capture-start
+    echo go > /tmp/capture-start
+"""
+
+import os
+import signal
+import threading
+import time
+
+
+class PromptTrigger:
+    """The interactive default: wait for the operator to press ENTER."""
+
+    interactive = True
+
+    def wait(self, gesture, prefix=''):
+        input(f"{prefix}Press ENTER when ready...")
+
+
+class CountdownTrigger:
+    """Start each gesture after a countdown: `seconds`, or its entry in `per_gesture`."""
+
+    interactive = False
+
+    def __init__(self, seconds=0.0, per_gesture=None):
+        self.seconds = seconds
+        self.per_gesture = per_gesture or {}
+
+    def wait(self, gesture, prefix=''):
+        seconds = self.per_gesture.get(gesture, self.seconds)
+        if seconds > 0:
+            print(f"{prefix}Starting {gesture} in {seconds:g} s...")
+            time.sleep(seconds)
+
+
+def load_schedule(path):
+    """Read a schedule file into a CountdownTrigger. Raises ValueError naming bad lines."""
+    default = 0.0
+    per_gesture = {}
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                gesture, seconds = line.split()
+                seconds = float(seconds)
+            except ValueError:
+                raise ValueError(f"{path}:{number}: expected 'gesture seconds', got {line!r}") from None
+            if seconds < 0:
+                raise ValueError(f"{path}:{number}: negative countdown {seconds:g}")
+            if gesture == '*':
+                default = seconds
+            else:
+                per_gesture[gesture] = seconds
+    return CountdownTrigger(default, per_gesture)
+
+
+class ExternalTrigger:
+    """Base for triggers fired from outside: fire() releases every wait() in progress."""
+
+    interactive = False
+    description = 'trigger'
+
+    def __init__(self):
+        # Only ever incremented, so reading it needs no lock (and fire() may run in a signal handler)
+        self.fired = 0
+
+    def fire(self):
+        self.fired += 1
+
+    def wait(self, gesture, prefix=''):
+        print(f"{prefix}Waiting for {self.description} to start {gesture}...")
+        seen = self.fired
+        while self.fired == seen:
+            time.sleep(0.02)
+
+
+class SignalTrigger(ExternalTrigger):
+    """Fires on a signal (SIGUSR1 by default). Must be created in the main thread."""
+
+    def __init__(self, signum=None):
+        super().__init__()
+        signum = signal.SIGUSR1 if signum is None else signum
+        self.description = signal.Signals(signum).name
+        signal.signal(signum, lambda *args: self.fire())
+
+
+class FifoTrigger(ExternalTrigger):
+    """Fires once per line written to a named pipe, which is created if it does not exist."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.description = f"a line on {path}"
+        if not os.path.exists(path):
+            os.mkfifo(path)
+        self.thread = threading.Thread(target=self._run, name="start trigger", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            # Blocks until a writer opens the pipe; reopen after each writer closes it
+            with open(self.path) as f:
+                for _ in f:
+                    self.fire()
+
+
+def make_trigger(countdown=None, schedule=None, trigger=None):
+    """Build the start trigger for the command-line options (PromptTrigger if none is given).
+
+    trigger is 'signal' or 'fifo:PATH'. Raises ValueError for a bad spec or
+    schedule file and OSError if either cannot be read or created.
+    """
+    if trigger:
+        if trigger == 'signal':
+            return SignalTrigger()
+        if trigger.startswith('fifo:') and len(trigger) > len('fifo:'):
+            return FifoTrigger(trigger[len('fifo:'):])
+        raise ValueError(f"Unknown trigger {trigger!r} (use 'signal' or 'fifo:PATH')")
+    if schedule:
+        return load_schedule(schedule)
+    if countdown is not None:
+        return CountdownTrigger(countdown)
+    return PromptTrigger()
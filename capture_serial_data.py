@@ -6,21 +6,45 @@ Captures accelerometer data from firmware using the serial protocol.
 Python handles all user interaction while the device provides clean data.
 
 Usage:
-    uv run python capture_serial_data.py [--port PORT] [--output FILE] [--list-ports]
+    uv run python capture_serial_data.py [--port PORT [PORT ...]] [--output FILE] [--list-ports]
+    uv run python capture_serial_data.py --port PORT [--countdown S | --schedule FILE | --trigger SPEC]
+    uv run python capture_serial_data.py --port PORT --infer MODEL [--scaler FILE] [--infer-every K]
 """
 
 import argparse
+import select
 import sys
 import time
+from collections import deque
 from pathlib import Path
 
 import serial
-import serial.tools.list_ports
+
+from binary_protocol import (
+    BIN_MARKER,
+    FRAME_SIZE,
+    decode_frames,
+    frame_checksum,
+    frames_to_samples,
+    parse_bin_marker,
+    parse_crc_marker,
+)
+from capture_output import OUTPUT_FORMATS, CaptureWriter
+from capture_pipeline import PipelineStats, RepetitionParser, parse_repetition
+
+BIN_MARKER_BYTES = BIN_MARKER.encode()
+
+
+def _comports():
+    # Port enumeration is only needed for --list-ports/--auto, so keep it off the startup path
+    import serial.tools.list_ports
+
+    return serial.tools.list_ports.comports()
 
 
 def list_available_ports():
     """List all available serial ports."""
-    ports = serial.tools.list_ports.comports()
+    ports = _comports()
     if not ports:
         print("No serial ports found.")
         return []
@@ -35,56 +59,264 @@ def list_available_ports():
     return [port.device for port in ports]
 
 
+DEVICE_PORT_PATTERNS = ['usb', 'serial', 'acm', 'gd32', 'cdc']
+
+
+def find_device_ports():
+    """Return every port whose description looks like a capture device."""
+    ports = _comports()
+    return [port.device for port in ports
+            if any(pattern in port.description.lower() for pattern in DEVICE_PORT_PATTERNS)]
+
+
 def find_device_port():
     """Attempt to auto-detect the device port."""
-    ports = serial.tools.list_ports.comports()
-
-    for port in ports:
-        desc = port.description.lower()
-        if any(pattern in desc for pattern in ['usb', 'serial', 'acm', 'gd32', 'cdc']):
-            return port.device
+    matches = find_device_ports()
+    if matches:
+        return matches[0]
 
+    ports = _comports()
     if ports:
         return ports[0].device
 
     return None
 
 
+def output_for_port(output_file, port):
+    """Derive a per-device output file: data/TDATA.csv + /dev/ttyACM0 -> data/TDATA_ttyACM0.csv"""
+    path = Path(output_file)
+    name = ''.join(c if c.isalnum() else '_' for c in Path(port).name).strip('_')
+    return str(path.with_name(f"{path.stem}_{name}{path.suffix}"))
+
+
+def _port_fileno(ser):
+    """Return the OS file descriptor behind a serial port, or None if it has none."""
+    try:
+        return ser.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
 class LineReader:
-    """Buffered line reader for responsive serial reading."""
+    """Buffered line reader for responsive serial reading.
+
+    Incoming bytes are appended to a preallocated bytearray. Newlines are
+    located with bytearray.rfind from a moving scan offset, so every complete
+    line in the buffer is split off and decoded in a single pass instead of
+    re-copying the remainder of the buffer for each line.
 
-    def __init__(self, ser):
+    With blocking=True (the default) the reader sleeps in select() on the
+    port's file descriptor, or in a pyserial read with a timeout where the
+    port has no descriptor, and wakes as soon as bytes arrive. blocking=False
+    keeps the old 1 ms sleep-poll loop.
+
+    metrics, an optional capture_metrics.CaptureMetrics, records bytes and
+    lines per read and the receive buffer fill.
+    """
+
+    def __init__(self, ser, buffer_size=65536, blocking=True, metrics=None):
         self.ser = ser
-        self.buffer = ""
+        self.blocking = blocking
+        self.fileno = _port_fileno(ser) if blocking else None
+        self.buffer = bytearray(buffer_size)
+        self.start = 0  # First unconsumed byte
+        self.end = 0    # One past the last received byte
+        self.scan = 0   # Bytes before this offset are known to hold no newline
+        self.pending = deque()
+        self.received = 0.0  # perf_counter() when the latest lines were taken off the port
+        self.metrics = metrics
+
+    def _append(self, data):
+        """Copy received bytes into the buffer, compacting or growing it as needed."""
+        size = len(data)
+        if self.metrics is not None:
+            self.metrics.bytes_read.inc(size)
+        if self.end + size > len(self.buffer):
+            unread = self.end - self.start
+            if unread + size > len(self.buffer):
+                grown = bytearray(max(2 * len(self.buffer), unread + size))
+                grown[:unread] = self.buffer[self.start:self.end]
+                self.buffer = grown
+            else:
+                self.buffer[:unread] = self.buffer[self.start:self.end]
+            self.scan -= self.start
+            self.start, self.end = 0, unread
+        self.buffer[self.end:self.end + size] = data
+        self.end += size
 
-    def read_line(self, timeout=None):
-        """Read a line, returning immediately if data available."""
+    def _extract_lines(self):
+        """Split every complete line off the buffer, decoding them as one batch.
+
+        Stops after a binary-frame marker line: the bytes that follow it are
+        frame data for read_exact(), not text.
+        """
+        last = self.buffer.rfind(b'\n', self.scan, self.end)
+        if last < 0:
+            self.scan = self.end
+            return []
+
+        marker = self.buffer.find(BIN_MARKER_BYTES, self.start, last)
+        if marker >= 0:
+            last = self.buffer.find(b'\n', marker, self.end)
+
+        with memoryview(self.buffer) as view:
+            text = str(view[self.start:last], 'utf-8', 'replace')
+        lines = [line.rstrip('\r') for line in text.split('\n')]
+
+        self.start = self.scan = last + 1
+        if self.start == self.end:
+            self.start = self.end = self.scan = 0
+        return lines
+
+    def _poll(self):
+        """Move whatever the port has buffered into our buffer. Returns bytes read."""
+        available = self.ser.in_waiting
+        if available > 0:
+            self._append(self.ser.read(available))
+        return available
+
+    def _wait_for_data(self, timeout):
+        """Block until the port has bytes to read or timeout (seconds) elapses."""
+        if self.fileno is not None:
+            select.select([self.fileno], [], [], timeout)
+            return
+        # No descriptor to select on (e.g. Windows): let pyserial block on one byte
+        self.ser.timeout = timeout
+        data = self.ser.read(1)
+        if data:
+            self._append(data)
+            self.ser.timeout = 0
+            self._poll()
+        else:
+            self.ser.timeout = 0
+
+    def read_available(self):
+        """Return the complete lines received so far without waiting."""
+        lines = list(self.pending)
+        self.pending.clear()
+        if self._poll() or self.end > self.scan:
+            extracted = self._extract_lines()
+            if extracted:
+                self.received = time.perf_counter()
+                lines.extend(extracted)
+            if self.metrics is not None:
+                self.metrics.read(len(extracted), self.end - self.start, self.received)
+        return lines
+
+    def read_lines(self, timeout=None):
+        """Return every complete line received so far, waiting for at least one.
+
+        Returns an empty list if no complete line arrives within timeout.
+        """
         start = time.time()
         while True:
-            # Check if we have a complete line in buffer
-            if '\n' in self.buffer:
-                line, self.buffer = self.buffer.split('\n', 1)
-                return line.rstrip('\r')
-
-            # Read any available bytes
-            available = self.ser.in_waiting
-            if available > 0:
-                data = self.ser.read(available)
-                self.buffer += data.decode('utf-8', errors='replace')
+            lines = self.read_available()
+            if lines:
+                return lines
+
+            # Check timeout
+            remaining = None
+            if timeout:
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    return lines
+
+            if self.blocking:
+                self._wait_for_data(remaining)
             else:
                 # Small sleep to avoid busy loop
                 time.sleep(0.001)
 
+    def take_bytes(self, size):
+        """Return exactly size raw bytes if that many have been received, else None.
+
+        Does not wait. Used for binary frame data; already-decoded lines are discarded.
+        """
+        self.pending.clear()
+        if self.end - self.start < size:
+            self._poll()
+            if self.end - self.start < size:
+                return None
+
+        data = bytes(self.buffer[self.start:self.start + size])
+        self.start += size
+        self.scan = max(self.scan, self.start)
+        if self.start == self.end:
+            self.start = self.end = self.scan = 0
+        return data
+
+    def read_exact(self, size, timeout=None):
+        """Read exactly size raw bytes, or return None if they do not arrive within timeout."""
+        start = time.time()
+        while True:
+            data = self.take_bytes(size)
+            if data is not None:
+                return data
+
             # Check timeout
-            if timeout and (time.time() - start) > timeout:
+            remaining = None
+            if timeout:
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    return None
+
+            if self.blocking:
+                self._wait_for_data(remaining)
+            else:
+                # Small sleep to avoid busy loop
+                time.sleep(0.001)
+
+    def read_line(self, timeout=None):
+        """Read a line, returning immediately if data available."""
+        if not self.pending:
+            lines = self.read_lines(timeout=timeout)
+            if not lines:
                 return None
+            self.pending.extend(lines)
+        return self.pending.popleft()
 
 
-def parse_config(reader):
-    """Parse the configuration block from device."""
+# The device protocol is written once, as generators that yield I/O requests
+# and are sent back the results:
+#     ('line', timeout)         -> the next line, or None on timeout
+#     ('bytes', size, timeout)  -> exactly size raw bytes, or None on timeout
+#     ('send', data)            -> None, once data has gone out
+# run_steps() drives them with a LineReader; capture_async drives the same
+# steps from its asyncio reader, so both engines follow the protocol alike.
+
+
+class ProtocolContext:
+    """Where the protocol steps of one session report: debug switch, log function, stats and metrics."""
+
+    def __init__(self, debug=False, log=None, stats=None, metrics=None):
+        self.debug = debug
+        self.log = log if log is not None else (lambda message: print(f"    {message}"))
+        self.stats = stats
+        self.metrics = metrics
+
+
+def run_steps(steps, reader, ser):
+    """Drive protocol steps with a LineReader and the serial port. Returns the steps' result."""
+    result = None
+    while True:
+        try:
+            request = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        if request[0] == 'line':
+            result = reader.read_line(timeout=request[1])
+        elif request[0] == 'bytes':
+            result = reader.read_exact(request[1], timeout=request[2])
+        else:
+            send_reply(reader, ser, request[1])
+            result = None
+
+
+def config_steps():
+    """Read the configuration block that follows <<<CONFIG>>>."""
     config = {}
     while True:
-        line = reader.read_line(timeout=5)
+        line = yield ('line', 5)
         if line is None:
             break
         if line == "<<<CONFIG_END>>>":
@@ -93,16 +325,36 @@ def parse_config(reader):
             key, value = line.split(':', 1)
             config[key] = value
 
-    # Parse values
+    return finish_config(config)
+
+
+def parse_config(reader):
+    """Parse the configuration block from device."""
+    return run_steps(config_steps(), reader, None)
+
+
+def finish_config(config):
+    """Convert the raw key/value pairs of a CONFIG block into typed values."""
     config['gestures'] = config.get('gestures', '').split(',')
     config['repetitions'] = int(config.get('repetitions', 5))
     config['samples'] = int(config.get('samples', 100))
     config['header'] = config.get('header', 'X-acc;Y-acc;Z-acc;label')
+    config['encoding'] = config.get('encoding', 'ascii')
 
     return config
 
 
-def wait_for_marker(reader, marker, timeout=30, debug=False):
+def parse_count_marker(line):
+    """Return N from a '<<<COUNT:N>>>' line, or -1 if the line is missing or malformed."""
+    if line and line.startswith("<<<COUNT:") and line.endswith(">>>"):
+        try:
+            return int(line[9:-3])
+        except ValueError:
+            pass
+    return -1
+
+
+def marker_steps(ctx, marker, timeout=30):
     """Wait for a specific marker from the device."""
     start = time.time()
     while True:
@@ -110,14 +362,29 @@ def wait_for_marker(reader, marker, timeout=30, debug=False):
         if remaining <= 0:
             raise TimeoutError(f"Timeout waiting for {marker}")
 
-        line = reader.read_line(timeout=remaining)
+        line = yield ('line', remaining)
         if line is not None:
-            if debug:
-                print(f"  [DEBUG] Received: {repr(line)}")
+            if ctx.debug:
+                ctx.log(f"[DEBUG] Received: {repr(line)}")
             if line == marker:
+                if ctx.metrics is not None:
+                    ctx.metrics.marker_wait.observe(time.time() - start)
                 return True
 
 
+def wait_for_marker(reader, marker, timeout=30, debug=False):
+    """Wait for a specific marker from the device."""
+    return run_steps(marker_steps(ProtocolContext(debug, metrics=reader.metrics), marker, timeout), reader, None)
+
+
+def send_reply(reader, ser, reply):
+    """Send an ACK/NACK/RESEND line to the device right away."""
+    ser.write(reply)
+    ser.flush()
+    if reader.metrics is not None:
+        reader.metrics.replied(reply)
+
+
 def strip_sequence_field(line):
     """Remove sequence field from line: 'seq;x;y;z;label' -> 'x;y;z;label'"""
     parts = line.split(';')
@@ -127,75 +394,356 @@ def strip_sequence_field(line):
     return line  # Return as-is if format unexpected
 
 
-def collect_repetition_data(reader, ser, rep_num, expected_samples, debug=False, max_retries=3):
-    """Collect data for one repetition with ACK/NACK retry."""
-    for attempt in range(max_retries):
-        if attempt > 0 and debug:
-            print(f"    [DEBUG] Retransmission attempt {attempt + 1}/{max_retries} for rep {rep_num}")
+def parse_sample_line(line, labels=None):
+    """Check a 'seq;x;y;z;label' (or 'x;y;z;label') data line field by field.
 
-        # Wait for DATA marker
-        wait_for_marker(reader, "<<<DATA>>>", debug=debug)
+    Returns (seq, 'x;y;z;label'), seq being None if the line has no sequence
+    field, or None if the line is damaged: x, y and z must be int16 values
+    and, if labels is given, the label one of them.
+    """
+    parts = line.split(';')
+    seq = None
+    if len(parts) == 5:
+        if not (parts[0].isascii() and parts[0].isdigit()):
+            return None
+        seq = int(parts[0])
+        parts = parts[1:]
+    elif len(parts) != 4:
+        return None
+    try:
+        if not all(-32768 <= int(value) <= 32767 for value in parts[:3]):
+            return None
+    except ValueError:
+        return None
+    if labels is not None and parts[3] not in labels:
+        return None
+    return seq, ';'.join(parts)
 
-        # Collect data lines
-        raw_lines = []
-        while True:
-            line = reader.read_line(timeout=10)
-            if line is None:
-                if debug:
-                    print(f"    [DEBUG] Timeout while reading data at line {len(raw_lines)}")
-                break
-            if line == "<<<DATA_END>>>":
-                break
-            if line:
-                raw_lines.append(line)
 
-        # Wait for COUNT marker
-        count_line = reader.read_line(timeout=5)
-        if count_line and count_line.startswith("<<<COUNT:"):
-            reported_count = int(count_line[9:-3])  # Extract number from <<<COUNT:N>>>
+GAP_POLICIES = ('nack', 'resend', 'interpolate')
+
+
+def data_block_steps(ctx):
+    """Read one <<<DATA>>> ... <<<DATA_END>>> block and its COUNT marker.
+
+    Returns (raw_lines, reported_count); reported_count is -1 if the COUNT
+    marker is missing or malformed.
+    """
+    # Wait for DATA marker
+    yield from marker_steps(ctx, "<<<DATA>>>")
+    started = time.perf_counter()
+
+    # Collect data lines
+    raw_lines = []
+    while True:
+        line = yield ('line', 10)
+        if line is None:
+            if ctx.debug:
+                ctx.log(f"[DEBUG] Timeout while reading data at line {len(raw_lines)}")
+            break
+        if line == "<<<DATA_END>>>":
+            break
+        if line:
+            raw_lines.append(line)
+
+    # Wait for COUNT marker
+    count_line = yield ('line', 5)
+    reported_count = parse_count_marker(count_line)
+    if ctx.stats is not None:
+        ctx.stats.record('receive', len(raw_lines), time.perf_counter() - started)
+        ctx.stats.end_of_block()
+    if reported_count < 0:
+        if ctx.debug:
+            ctx.log(f"[DEBUG] Missing or invalid COUNT marker: {repr(count_line)}")
+
+    return raw_lines, reported_count
+
+
+def read_data_block(reader, debug=False, stats=None):
+    """Blocking data_block_steps(); see there."""
+    return run_steps(data_block_steps(ProtocolContext(debug, stats=stats, metrics=reader.metrics)), reader, None)
+
+
+def index_by_sequence(raw_lines, expected_samples, samples=None, labels=None):
+    """Add 'seq;x;y;z;label' lines to a {seq: 'x;y;z;label'} dict.
+
+    Lines that fail parse_sample_line(line, labels) or carry no usable
+    sequence number are left out, so their samples count as missing. The
+    first valid copy of a sequence number wins. Returns (samples, duplicates,
+    invalid).
+    """
+    samples = {} if samples is None else samples
+    duplicates = invalid = 0
+    for line in raw_lines:
+        parsed = parse_sample_line(line, labels)
+        if parsed is None or parsed[0] is None or parsed[0] >= expected_samples:
+            invalid += 1
+            continue
+        seq, rest = parsed
+        if seq in samples:
+            duplicates += 1
+        else:
+            samples[seq] = rest
+    return samples, duplicates, invalid
+
+
+def missing_ranges(samples, expected_samples):
+    """Return the inclusive (first, last) sequence ranges absent from samples."""
+    ranges = []
+    start = None
+    for seq in range(expected_samples):
+        if seq not in samples:
+            if start is None:
+                start = seq
+        elif start is not None:
+            ranges.append((start, seq - 1))
+            start = None
+    if start is not None:
+        ranges.append((start, expected_samples - 1))
+    return ranges
+
+
+def format_ranges(ranges):
+    """[(3, 5), (9, 9)] -> '3-5,9-9'"""
+    return ','.join(f"{first}-{last}" for first, last in ranges)
+
+
+def interpolate_missing(samples, expected_samples):
+    """Fill sequence gaps by linear interpolation between the nearest received neighbours.
+
+    Samples past either end copy the nearest received one. Returns the number
+    of samples filled in; samples is updated in place.
+    """
+    present = sorted(samples)
+    if not present:
+        return 0
+
+    parsed = {}
+    for seq in present:
+        parts = samples[seq].split(';')
+        try:
+            parsed[seq] = ([int(v) for v in parts[:3]], parts[3])
+        except (ValueError, IndexError):
+            continue
+    present = sorted(parsed)
+    if not present:
+        return 0
+
+    filled = 0
+    right = 0
+    for seq in range(expected_samples):
+        if seq in samples:
+            continue
+        while right < len(present) and present[right] < seq:
+            right += 1
+        before = present[right - 1] if right > 0 else None
+        after = present[right] if right < len(present) else None
+        if before is None or after is None:
+            values, label = parsed[after if before is None else before]
         else:
-            reported_count = -1
-            if debug:
-                print(f"    [DEBUG] Missing or invalid COUNT marker: {repr(count_line)}")
+            (v0, label), (v1, _) = parsed[before], parsed[after]
+            t = (seq - before) / (after - before)
+            values = [round(a + (b - a) * t) for a, b in zip(v0, v1)]
+        samples[seq] = f"{values[0]};{values[1]};{values[2]};{label}"
+        filled += 1
+    return filled
+
+
+def sequenced_steps(ctx, rep_num, expected_samples, max_retries=3, gap_policy='resend', labels=None):
+    """Collect one repetition, repairing it by sequence number instead of resending it whole.
+
+    Duplicated sequence numbers are dropped and damaged lines (see
+    parse_sample_line; labels is the CONFIG gesture list) count as missing.
+    With gap_policy='resend' the missing ranges are requested with
+    'RESEND:first-last,...' (the firmware answers with a DATA block holding
+    only those samples); with 'interpolate' they are filled in locally and
+    reported. Returns the repetition's 'x;y;z;label' lines in sequence order.
+    """
+    raw_lines, reported_count = yield from data_block_steps(ctx)
+    samples, duplicates, invalid = index_by_sequence(raw_lines, expected_samples, labels=labels)
+    missing = missing_ranges(samples, expected_samples)
+
+    if ctx.debug:
+        ctx.log(f"[DEBUG] Rep {rep_num}: received={len(raw_lines)}, reported={reported_count}, "
+                f"unique={len(samples)}, duplicates={duplicates}, invalid={invalid}, "
+                f"missing={format_ranges(missing) or 'none'}")
+
+    if gap_policy == 'resend':
+        for attempt in range(max_retries - 1):
+            if not missing:
+                break
+            request = format_ranges(missing)
+            ctx.log(f"Resend {attempt + 1}: missing {expected_samples - len(samples)} samples ({request})")
+            yield ('send', f"RESEND:{request}\n".encode())
+            raw_lines, _ = yield from data_block_steps(ctx)
+            samples, extra, damaged = index_by_sequence(raw_lines, expected_samples, samples, labels)
+            duplicates += extra
+            invalid += damaged
+            missing = missing_ranges(samples, expected_samples)
+
+    if missing:
+        if gap_policy == 'interpolate':
+            filled = interpolate_missing(samples, expected_samples)
+            ctx.log(f"Warning: interpolated {filled} missing samples ({format_ranges(missing)}) in rep {rep_num}")
+        else:
+            ctx.log(f"Warning: still missing {format_ranges(missing)} after {max_retries} attempts, "
+                    f"using partial data ({len(samples)} samples)")
+    if duplicates and ctx.debug:
+        ctx.log(f"[DEBUG] Dropped {duplicates} duplicate samples")
+    if invalid and ctx.debug:
+        ctx.log(f"[DEBUG] Rejected {invalid} damaged lines")
+    # The first block's COUNT is what the device sent; it must be the configured repetition size
+    if reported_count != expected_samples:
+        reported = reported_count if reported_count >= 0 else "no valid COUNT"
+        ctx.log(f"Warning: rep {rep_num}: device reported {reported}, expected {expected_samples} samples")
+
+    yield ('send', b'ACK\n')
+    if ctx.stats is not None:
+        ctx.stats.acked(len(samples))
+    return [samples[seq] for seq in sorted(samples)]
+
+
+def repetition_steps(ctx, rep_num, expected_samples, max_retries=3, gap_policy='nack', strip=True, labels=None):
+    """Collect data for one repetition with ACK/NACK retry.
+
+    A repetition is complete when it has expected_samples lines, the COUNT
+    marker agrees and every line passes parse_sample_line(line, labels);
+    damaged lines are dropped from a repetition accepted after max_retries.
+    gap_policy 'resend' or 'interpolate' repairs the repetition by sequence
+    number instead (see sequenced_steps). With strip=False the raw
+    'seq;x;y;z;label' lines are returned for a later parse stage.
+    """
+    if gap_policy != 'nack':
+        return (yield from sequenced_steps(ctx, rep_num, expected_samples, max_retries, gap_policy, labels))
+    for attempt in range(max_retries):
+        if attempt > 0 and ctx.debug:
+            ctx.log(f"[DEBUG] Retransmission attempt {attempt + 1}/{max_retries} for rep {rep_num}")
+
+        raw_lines, reported_count = yield from data_block_steps(ctx)
 
         # Verify data
+        parsed = [parse_sample_line(line, labels) for line in raw_lines]
+        damaged = parsed.count(None)
         actual_count = len(raw_lines)
-        valid = (actual_count == expected_samples and actual_count == reported_count)
+        valid = (actual_count == expected_samples and actual_count == reported_count and not damaged)
 
-        if debug:
+        if ctx.debug:
             status = "OK" if valid else "MISMATCH"
-            print(f"    [DEBUG] Rep {rep_num} attempt {attempt + 1}: received={actual_count}, reported={reported_count}, expected={expected_samples} [{status}]")
-            if raw_lines and len(raw_lines) > 0:
-                print(f"    [DEBUG] First line: {raw_lines[0]}")
-                print(f"    [DEBUG] Last line:  {raw_lines[-1] if raw_lines else 'N/A'}")
-
-        if valid:
-            # Send ACK
-            ser.write(b'ACK\n')
-            ser.flush()
-            if debug:
-                print(f"    [DEBUG] Sent ACK")
+            ctx.log(f"[DEBUG] Rep {rep_num} attempt {attempt + 1}: received={actual_count}, "
+                    f"reported={reported_count}, expected={expected_samples}, damaged={damaged} [{status}]")
+            if raw_lines:
+                ctx.log(f"[DEBUG] First line: {raw_lines[0]}")
+                ctx.log(f"[DEBUG] Last line:  {raw_lines[-1]}")
+
+        if valid or attempt == max_retries - 1:
+            if damaged:
+                raw_lines = [line for line, fields in zip(raw_lines, parsed) if fields is not None]
+                parsed = [fields for fields in parsed if fields is not None]
+            if not valid:
+                ctx.log(f"Warning: Failed after {max_retries} attempts, using partial data ({len(raw_lines)} samples"
+                        f"{f', {damaged} damaged lines dropped' if damaged else ''})")
+            # Send ACK (a repetition that never came through intact is accepted anyway to continue)
+            yield ('send', b'ACK\n')
+            if ctx.stats is not None:
+                ctx.stats.acked(len(raw_lines))
+            if not strip:
+                return raw_lines
             # Strip sequence numbers before returning
-            return [strip_sequence_field(line) for line in raw_lines]
-        else:
-            if attempt < max_retries - 1:
-                print(f"    Retry {attempt + 1}: got {actual_count}/{expected_samples} samples, requesting resend...")
-                ser.write(b'NACK\n')
-                ser.flush()
-                if debug:
-                    print(f"    [DEBUG] Sent NACK, waiting for retransmission...")
-            else:
-                print(f"    Warning: Failed after {max_retries} attempts, using partial data ({actual_count} samples)")
-                ser.write(b'ACK\n')  # Accept anyway to continue
-                ser.flush()
-                # Strip sequence numbers before returning
-                return [strip_sequence_field(line) for line in raw_lines]
+            return [rest for _, rest in parsed]
+
+        problem = f"{damaged} damaged lines" if damaged else f"got {actual_count}/{expected_samples} samples"
+        ctx.log(f"Retry {attempt + 1}: {problem}, requesting resend...")
+        yield ('send', b'NACK\n')
 
     return []
 
 
-def collect_gesture_data(reader, ser, gesture_name, gesture_index, total_gestures, config, output_file, debug=False):
-    """Collect data for one gesture with per-repetition ACK, writing to file after each rep."""
+def collect_repetition_data(reader, ser, rep_num, expected_samples, debug=False, max_retries=3, gap_policy='nack',
+                            strip=True, stats=None, labels=None):
+    """Blocking repetition_steps(); see there."""
+    ctx = ProtocolContext(debug, stats=stats, metrics=reader.metrics)
+    steps = repetition_steps(ctx, rep_num, expected_samples, max_retries, gap_policy, strip, labels)
+    return run_steps(steps, reader, ser)
+
+
+def binary_block_steps(ctx, expected_samples):
+    """Read one binary-framed repetition following its <<<DATA>>> marker.
+
+    Returns (frames, problem): frames is the decoded structured array, or None
+    if the payload is unusable; problem describes why the repetition should be
+    resent, or is None if it is complete and intact.
+    """
+    count = parse_bin_marker((yield ('line', 5)))
+    if count < 0:
+        return None, "missing BIN marker"
+
+    payload = yield ('bytes', count * FRAME_SIZE, 10)
+    if payload is None:
+        return None, f"timeout reading {count} frames"
+
+    crc = parse_crc_marker((yield ('line', 5)))
+    if crc is None:
+        return None, "missing CRC marker"
+    if crc != frame_checksum(payload):
+        return None, "CRC mismatch"
+
+    frames = decode_frames(payload)
+    if count != expected_samples:
+        return frames, f"got {count}/{expected_samples} samples"
+    return frames, None
+
+
+def read_binary_repetition(reader, expected_samples):
+    """Blocking binary_block_steps(); see there."""
+    return run_steps(binary_block_steps(ProtocolContext(metrics=reader.metrics), expected_samples), reader, None)
+
+
+def binary_repetition_steps(ctx, rep_num, expected_samples, max_retries=3):
+    """Collect one binary-framed repetition with CRC check and ACK/NACK retry.
+
+    Returns the decoded frames. A repetition that still fails its CRC after
+    max_retries is acknowledged and discarded rather than written corrupted.
+    """
+    for attempt in range(max_retries):
+        yield from marker_steps(ctx, "<<<DATA>>>")
+        frames, problem = yield from binary_block_steps(ctx, expected_samples)
+
+        if ctx.debug:
+            ctx.log(f"[DEBUG] Rep {rep_num} attempt {attempt + 1}: {problem or 'OK'}")
+
+        if problem is None:
+            yield ('send', b'ACK\n')
+            return frames
+
+        if attempt < max_retries - 1:
+            ctx.log(f"Retry {attempt + 1}: {problem}, requesting resend...")
+            yield ('send', b'NACK\n')
+        else:
+            yield ('send', b'ACK\n')  # Accept anyway to continue
+            if frames is None:
+                ctx.log(f"Warning: Failed after {max_retries} attempts ({problem}), discarding repetition")
+                return decode_frames(b'')
+            ctx.log(f"Warning: Failed after {max_retries} attempts, using partial data ({len(frames)} samples)")
+            return frames
+
+    return decode_frames(b'')
+
+
+def collect_binary_repetition(reader, ser, rep_num, expected_samples, debug=False, max_retries=3):
+    """Blocking binary_repetition_steps(); see there."""
+    ctx = ProtocolContext(debug, metrics=reader.metrics)
+    return run_steps(binary_repetition_steps(ctx, rep_num, expected_samples, max_retries), reader, ser)
+
+
+def collect_gesture_data(reader, ser, gesture_name, gesture_index, total_gestures, config, writer, debug=False,
+                         gap_policy='nack', parser=None, stats=None, trigger=None):
+    """Collect data for one gesture with per-repetition ACK, handing each rep to the writer.
+
+    With a RepetitionParser the text repetitions are parsed on its worker
+    thread instead of here, between the ACK and the next read. trigger, a
+    capture_schedule trigger, decides when to start the gesture instead of
+    the ENTER prompt.
+    """
     repetitions = config['repetitions']
     samples_per_rep = config['samples']
 
@@ -207,7 +755,10 @@ def collect_gesture_data(reader, ser, gesture_name, gesture_index, total_gesture
     print(f"=== Prepare for gesture: {gesture_name} ({gesture_index + 1}/{total_gestures}) ===")
     print(f"    {repetitions} repetitions, {samples_per_rep} samples each")
     print()
-    input("Press ENTER when ready...")
+    if trigger is None:
+        input("Press ENTER when ready...")
+    else:
+        trigger.wait(gesture_name)
 
     # Send START command
     ser.write(b'\n')
@@ -221,27 +772,48 @@ def collect_gesture_data(reader, ser, gesture_name, gesture_index, total_gesture
         rep_marker = f"<<<REP:{rep}>>>"
         wait_for_marker(reader, rep_marker, debug=debug)
 
-        # Collect this repetition's data
-        rep_data = collect_repetition_data(reader, ser, rep, samples_per_rep, debug=debug)
-
-        # Write immediately to file (append mode)
-        with open(output_file, 'a', encoding='utf-8') as f:
-            for line in rep_data:
-                f.write(line + '\n')
+        # Collect this repetition's data and queue it for the writer thread,
+        # so the disk never delays the next ACK
+        if config['encoding'] == 'binary':
+            frames = collect_binary_repetition(reader, ser, rep, samples_per_rep, debug=debug)
+            rep_data = frames
+            writer.write_samples(*frames_to_samples(frames, config['gestures']))
+        else:
+            rep_data = collect_repetition_data(reader, ser, rep, samples_per_rep, debug=debug,
+                                               gap_policy=gap_policy, strip=False, stats=stats,
+                                               labels=config['gestures'])
+            if parser is not None:
+                parser.submit(rep_data)
+            else:
+                started = time.perf_counter()
+                lines, malformed = parse_repetition(rep_data)
+                if stats is not None:
+                    stats.malformed += malformed
+                    stats.record('parse', len(lines), time.perf_counter() - started)
+                writer.write_rows(lines)
 
         total_samples += len(rep_data)
-        print(f"  Repetition {rep}/{repetitions} complete ({len(rep_data)} samples, written to file)")
+        print(f"  Repetition {rep}/{repetitions} complete ({len(rep_data)} samples, queued for writing)")
+        if stats is not None:
+            stats.resumed(len(rep_data))
 
     # Wait for GESTURE_DONE
     wait_for_marker(reader, "<<<GESTURE_DONE>>>", debug=debug)
+    writer.checkpoint()
 
     print(f"Completed gesture: {gesture_name} ({total_samples} samples)")
 
     return total_samples
 
 
-def run_capture(port, output_file, debug=False):
-    """Run the data capture session."""
+def run_capture(port, output_file, debug=False, poll=False, fsync_every=0, fmt='csv', gap_policy='nack',
+                pipeline=False, show_stats=False, stats=None, metrics=None, trigger=None):
+    """Run the data capture session.
+
+    stats may be a PipelineStats to collect the session's stage timings into,
+    metrics a capture_metrics.CaptureMetrics for the reader and writer.
+    trigger starts each gesture instead of the ENTER prompt (see capture_schedule).
+    """
     print(f"Connecting to {port}...")
     print(f"Output file: {output_file}")
     print()
@@ -260,7 +832,10 @@ def run_capture(port, output_file, debug=False):
         return False
 
     # Create buffered reader
-    reader = LineReader(ser)
+    reader = LineReader(ser, blocking=not poll, metrics=metrics)
+    writer = None
+    parser = None
+    stats = stats if stats is not None else PipelineStats()
 
     try:
         print("Waiting for device...")
@@ -277,6 +852,8 @@ def run_capture(port, output_file, debug=False):
         print(f"  Gestures: {', '.join(config['gestures'])}")
         print(f"  Repetitions per gesture: {config['repetitions']}")
         print(f"  Samples per repetition: {config['samples']}")
+        if config['encoding'] != 'ascii':
+            print(f"  Encoding: {config['encoding']}")
         total_samples = len(config['gestures']) * config['repetitions'] * config['samples']
         print(f"  Total samples: {total_samples}")
         print("=" * 60)
@@ -288,21 +865,28 @@ def run_capture(port, output_file, debug=False):
         # Strip seq from header if present
         header = strip_sequence_field(config['header'])
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(header + '\n')
+        writer = CaptureWriter(output_file, header, fsync_every=fsync_every, fmt=fmt, stats=stats,
+                               metrics=metrics)
+        output_file = writer.output_file
+        if pipeline:
+            parser = RepetitionParser(writer, stats)
 
         print(f"\nWriting data to: {output_file}")
 
-        # Collect data for each gesture (writes to file after each repetition)
+        # Collect data for each gesture (the writer thread persists each repetition)
         total_samples = 0
         gestures = config['gestures']
 
         for i, gesture in enumerate(gestures):
-            samples = collect_gesture_data(reader, ser, gesture, i, len(gestures), config, output_file, debug=debug)
+            samples = collect_gesture_data(reader, ser, gesture, i, len(gestures), config, writer, debug=debug,
+                                           gap_policy=gap_policy, parser=parser, stats=stats, trigger=trigger)
             total_samples += samples
 
         # Wait for DONE
         wait_for_marker(reader, "<<<DONE>>>")
+        if parser is not None:
+            parser.close()
+        writer.close()
 
         print()
         print("=" * 60)
@@ -318,6 +902,9 @@ def run_capture(port, output_file, debug=False):
         for gesture in gestures:
             print(f"  {gesture}: {samples_per_gesture} samples")
 
+        if show_stats:
+            stats.report()
+
         return True
 
     except TimeoutError as e:
@@ -325,12 +912,137 @@ def run_capture(port, output_file, debug=False):
         print("Make sure the device is connected and reset it to start fresh.")
         return False
 
+    except (OSError, ImportError) as e:
+        print(f"\nError: {e}")
+        return False
+
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
         return False
 
     finally:
         ser.close()
+        # Keep whatever was captured before an error or Ctrl+C
+        for stage in (parser, writer):
+            if stage is not None:
+                try:
+                    stage.close()
+                except OSError:
+                    pass
+
+
+def stream_repetition(reader, ser, live, config, debug=False):
+    """Classify one repetition sample by sample as its lines arrive, then ACK it.
+
+    Live mode keeps going rather than asking for resends, so incomplete
+    repetitions are simply acknowledged.
+    """
+    wait_for_marker(reader, "<<<DATA>>>", debug=debug)
+
+    if config['encoding'] == 'binary':
+        frames, problem = read_binary_repetition(reader, config['samples'])
+        received = time.perf_counter()
+        if frames is not None:
+            names = config['gestures']
+            for x, y, z, label in zip(frames['x'].tolist(), frames['y'].tolist(), frames['z'].tolist(),
+                                      frames['label'].tolist()):
+                live.push(x, y, z, received, names[label] if label < len(names) else None)
+        elif debug:
+            print(f"    [DEBUG] Skipping repetition: {problem}")
+    else:
+        while True:
+            line = reader.read_line(timeout=10)
+            if line is None or line == "<<<DATA_END>>>":
+                break
+            parts = line.split(';')
+            if len(parts) < 4:
+                continue
+            try:
+                live.push(int(parts[-4]), int(parts[-3]), int(parts[-2]), reader.received, parts[-1])
+            except ValueError:
+                continue
+        reader.read_line(timeout=5)  # COUNT marker
+
+    send_reply(reader, ser, b'ACK\n')
+
+
+def run_inference(port, model_path, scaler_path=None, every=10, classes=None, debug=False, poll=False,
+                  metrics=None):
+    """Classify gestures live from the device instead of recording them.
+
+    Each gesture session is started automatically; every sample goes into a
+    100-sample window and the model runs every `every` samples. A model_path
+    of 'unix:PATH' sends the windows to an inference_server.py instance
+    instead, which normalizes them itself.
+    """
+    # NumPy and the model framework are only needed here, not for recording
+    from gesture_inference import LiveClassifier, SlidingWindow, default_scaler_path, load_classifier
+    from gesture_scaler import AxisScaler
+
+    scaler = None
+    try:
+        if model_path.startswith('unix:'):
+            from inference_server import RemoteClassifier
+            classifier = RemoteClassifier(model_path[len('unix:'):])
+        else:
+            classifier = load_classifier(model_path)
+            scaler_path = Path(scaler_path) if scaler_path else default_scaler_path(model_path)
+            if scaler_path.exists():
+                scaler = AxisScaler.load(scaler_path)
+            else:
+                print(f"Warning: no normalization file {scaler_path}; feeding raw samples to the model")
+    except (OSError, ValueError) as e:
+        print(f"Error loading model: {e}")
+        return False
+
+    print(f"Connecting to {port}...")
+    try:
+        ser = serial.Serial(port=port, baudrate=115200, bytesize=serial.EIGHTBITS,
+                            parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE, timeout=0)
+    except serial.SerialException as e:
+        print(f"Error opening port: {e}")
+        return False
+
+    reader = LineReader(ser, blocking=not poll, metrics=metrics)
+    live = None
+    try:
+        print("Waiting for device...")
+        wait_for_marker(reader, "<<<CONFIG>>>", timeout=60, debug=debug)
+        config = parse_config(reader)
+        # Models trained in the notebook use LabelEncoder order: sorted class names
+        classes = classes or sorted(config['gestures'])
+        live = LiveClassifier(classifier, SlidingWindow(size=config['samples'], scaler=scaler), classes,
+                              every=every)
+        print(f"Classes: {', '.join(classes)}; classifying every {every} samples")
+
+        for gesture in config['gestures']:
+            wait_for_marker(reader, "<<<READY>>>", debug=debug)
+            print(f"\n=== Device session: {gesture} ===")
+            ser.write(b'\n')
+            ser.flush()
+            for rep in range(1, config['repetitions'] + 1):
+                wait_for_marker(reader, f"<<<REP:{rep}>>>", debug=debug)
+                stream_repetition(reader, ser, live, config, debug=debug)
+            wait_for_marker(reader, "<<<GESTURE_DONE>>>", debug=debug)
+
+        wait_for_marker(reader, "<<<DONE>>>")
+        return True
+
+    except TimeoutError as e:
+        print(f"\nError: {e}")
+        print("Make sure the device is connected and reset it to start fresh.")
+        return False
+
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+        return False
+
+    finally:
+        ser.close()
+        if live is not None and live.inference.samples:
+            print()
+            print(f"Inference latency:            {live.inference.summary()}")
+            print(f"Sample-to-prediction latency: {live.end_to_end.summary()}")
 
 
 def main():
@@ -342,15 +1054,62 @@ Examples:
   uv run python capture_serial_data.py --list-ports
   uv run python capture_serial_data.py --port /dev/cu.usbmodem1401
   uv run python capture_serial_data.py --auto --output data/my_gestures.csv
+  uv run python capture_serial_data.py --port /dev/ttyACM0 /dev/ttyACM1
+  uv run python capture_serial_data.py --all-ports --output data/station.csv
+  uv run python capture_serial_data.py --auto --format npy --output data/my_gestures
+  uv run python capture_serial_data.py --auto --infer models/gestures.keras --infer-every 10
+  uv run python capture_serial_data.py --all-ports --countdown 5 --output data/station.csv
         """
     )
 
-    parser.add_argument('--port', '-p', type=str, help='Serial port')
+    parser.add_argument('--port', '-p', type=str, nargs='+',
+                        help='Serial port (several ports are captured concurrently)')
     parser.add_argument('--output', '-o', type=str, default='data/TDATA_serial.csv',
                         help='Output CSV file (default: data/TDATA_serial.csv)')
     parser.add_argument('--list-ports', '-l', action='store_true', help='List available ports')
     parser.add_argument('--auto', '-a', action='store_true', help='Auto-detect port')
+    parser.add_argument('--all-ports', action='store_true',
+                        help='Capture concurrently from every port that looks like a device')
     parser.add_argument('--debug', '-d', action='store_true', help='Show debug output')
+    parser.add_argument('--poll', action='store_true',
+                        help='Use the 1 ms sleep-poll reader instead of waiting on the port')
+    parser.add_argument('--format', '-f', choices=OUTPUT_FORMATS, default='csv',
+                        help='Output format: csv, npy (one int16 .npy per gesture in a directory) '
+                             'or parquet (default: csv)')
+    parser.add_argument('--gap-policy', choices=GAP_POLICIES, default='nack',
+                        help='On missing, damaged or duplicate samples: nack (resend the whole repetition), '
+                             'resend (request only the missing sequence ranges; needs firmware support) '
+                             'or interpolate (fill gaps locally) (default: nack)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Parse and validate repetitions on a worker thread while the next one is received')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print per-stage throughput and serial link idle time at the end')
+    parser.add_argument('--fsync-every', type=int, default=0, metavar='REPS',
+                        help='Force output to disk every REPS repetitions (default: after each gesture)')
+    parser.add_argument('--infer', metavar='MODEL',
+                        help='Classify gestures live with a saved model (or unix:SOCKET for a running '
+                             'inference_server.py) instead of recording')
+    parser.add_argument('--scaler', metavar='FILE',
+                        help='Normalization saved with gesture_scaler (default: MODEL with .scaler.npz)')
+    parser.add_argument('--infer-every', type=int, default=10, metavar='K',
+                        help='Run the classifier every K samples (default: 10)')
+    parser.add_argument('--classes', type=lambda value: value.split(','),
+                        help='Comma-separated class names in model output order (default: sorted device gestures)')
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument('--countdown', type=float, metavar='SECONDS',
+                       help='Start each gesture after a countdown instead of waiting for ENTER')
+    start.add_argument('--schedule', metavar='FILE',
+                       help="Per-gesture countdowns, one 'gesture seconds' line each ('*' for the rest)")
+    start.add_argument('--trigger', metavar='SPEC',
+                       help="Start each gesture on an external trigger: 'signal' (SIGUSR1) or 'fifo:PATH' "
+                            "(a line written to the named pipe PATH)")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Append a JSON line of capture metrics (reads, marker waits, ACK round trip, '
+                             'retries, write latency) to FILE every --metrics-interval seconds')
+    parser.add_argument('--metrics-interval', type=float, default=1.0, metavar='SECONDS',
+                        help='Seconds between --metrics snapshots (default: 1)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve the capture metrics for Prometheus at http://127.0.0.1:PORT/metrics')
 
     args = parser.parse_args()
 
@@ -358,21 +1117,82 @@ Examples:
         list_available_ports()
         sys.exit(0)
 
-    if args.auto:
+    if args.all_ports:
+        ports = find_device_ports()
+        if not ports:
+            print("Error: No devices found")
+            print("Use --list-ports to see available ports")
+            sys.exit(1)
+    elif args.auto:
         port = find_device_port()
         if not port:
             print("Error: Could not auto-detect device")
             print("Use --list-ports to see available ports")
             sys.exit(1)
         print(f"Auto-detected port: {port}")
+        ports = [port]
     else:
-        port = args.port
+        ports = args.port or []
 
-    if not port:
-        print("Error: No port specified. Use --port or --auto")
+    if not ports:
+        print("Error: No port specified. Use --port, --auto or --all-ports")
         sys.exit(1)
 
-    success = run_capture(port, args.output, debug=args.debug)
+    if len(ports) > 1 and args.infer:
+        parser.error("--infer classifies a single port; for several boards run inference_server.py "
+                     "and one --infer unix:SOCKET capture per port")
+    if len(ports) > 1:
+        single_only = [flag for flag, used in (('--pipeline', args.pipeline), ('--stats', args.stats),
+                                               ('--poll', args.poll)) if used]
+        if single_only:
+            parser.error(f"{', '.join(single_only)} only apply to single-port capture")
+
+    trigger = None
+    if args.countdown is not None or args.schedule or args.trigger:
+        from capture_schedule import make_trigger
+
+        try:
+            trigger = make_trigger(args.countdown, args.schedule, args.trigger)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    metrics = None
+    exporters = []
+    if args.metrics or args.metrics_port:
+        if len(ports) > 1:
+            print("Error: --metrics and --metrics-port support single-port capture only")
+            sys.exit(1)
+        from capture_metrics import CaptureMetrics, JsonLinesExporter, PrometheusExporter
+
+        metrics = CaptureMetrics()
+        try:
+            if args.metrics:
+                exporters.append(JsonLinesExporter(metrics, args.metrics, interval=args.metrics_interval))
+            if args.metrics_port:
+                exporters.append(PrometheusExporter(metrics, args.metrics_port))
+                print(f"Serving metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+        except OSError as e:
+            print(f"Error starting metrics export: {e}")
+            sys.exit(1)
+
+    try:
+        if args.infer:
+            success = run_inference(ports[0], args.infer, scaler_path=args.scaler, every=args.infer_every,
+                                    classes=args.classes, debug=args.debug, poll=args.poll, metrics=metrics)
+        elif len(ports) > 1:
+            # Each device gets its own output file, e.g. data/TDATA_serial_ttyACM0.csv
+            from capture_async import run_capture_many
+            success = run_capture_many(ports, args.output, debug=args.debug, fsync_every=args.fsync_every,
+                                       fmt=args.format, gap_policy=args.gap_policy, trigger=trigger)
+        else:
+            success = run_capture(ports[0], args.output, debug=args.debug, poll=args.poll,
+                                  fsync_every=args.fsync_every, fmt=args.format, gap_policy=args.gap_policy,
+                                  pipeline=args.pipeline, show_stats=args.stats, metrics=metrics, trigger=trigger)
+    finally:
+        # The last snapshot covers the whole session
+        for exporter in exporters:
+            exporter.close()
     sys.exit(0 if success else 1)
 
 
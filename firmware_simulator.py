@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Simulated Capture Firmware for Gesture Recognition Lab
+
+Speaks the same serial protocol as the data collection firmware on a
+pseudo-terminal, so capture_serial_data.py can be run and measured without a
+GD32 board attached. Each simulated device exposes a pty path that is opened
+exactly like a real serial port.
+
+The link can be made less ideal: --baud paces the output to what a UART at
+that rate could carry (10 bits per byte), --burst sets how many lines go out
+per write, and --drop-rate / --corrupt-rate lose or garble data lines (or,
+in binary encoding, frame bytes). --replay sends recorded repetitions from a
+capture such as data/TDATA.csv instead of synthetic ones.
+
+Usage:
+    uv run python firmware_simulator.py [--devices N] [--gestures idle,waving] [--repetitions N]
+    uv run python firmware_simulator.py --replay data/TDATA.csv --baud 115200 --burst 1 --corrupt-rate 0.01
+"""
+
+import argparse
+import csv
+import math
+import os
+import random
+import select
+import sys
+import threading
+import time
+import tty
+
+from binary_protocol import FRAME_SIZE, encode_frames, format_crc_marker
+
+DEFAULT_GESTURES = ('idle', 'waving', 'sliding')
+
+
+def synthetic_sample(gesture, index, rng):
+    """Return an (x, y, z) reading for a gesture, shaped loosely like the real sensor data."""
+    if gesture == 'idle':
+        return (-57 + rng.randint(-4, 4), 7 + rng.randint(-10, 10), 4154 + rng.randint(-8, 8))
+    phase = 2 * math.pi * index / 50
+    offset = sum(map(ord, gesture)) % 7
+    return (
+        int(900 * math.sin(phase + offset)) + rng.randint(-30, 30),
+        int(600 * math.cos(2 * phase + offset)) + rng.randint(-30, 30),
+        4100 + int(300 * math.sin(phase / 2)) + rng.randint(-30, 30),
+    )
+
+
+def corrupt_line(line, rng):
+    """Garble one character of a line, as a bit error on the wire would."""
+    i = rng.randrange(len(line))
+    return line[:i] + rng.choice('#?~@%') + line[i + 1:]
+
+
+def load_recording(path, samples=100):
+    """Read a capture ('x;y;z;label' rows, optional seq column) into {gesture: [repetition, ...]}.
+
+    Each repetition is a list of `samples` (x, y, z) tuples cut from a run of
+    consecutive rows with the same label; rows left over at the end of a run
+    are ignored, as are lines that do not parse.
+    """
+    recording = {}
+    run_label, run = None, []
+    with open(path, newline='') as f:
+        for row in csv.reader(f, delimiter=';'):
+            try:
+                *values, label = row[-4:]
+                sample = tuple(int(float(v)) for v in values)
+            except ValueError:
+                continue
+            if len(sample) != 3:
+                continue
+            if label != run_label:
+                run_label, run = label, []
+            run.append(sample)
+            if len(run) == samples:
+                recording.setdefault(label, []).append(run)
+                run = []
+    if not recording:
+        raise ValueError(f"{path} holds no complete {samples}-sample repetitions")
+    return recording
+
+
+class SimulatedFirmware:
+    """One simulated capture device behind a pseudo-terminal pair.
+
+    The host opens `port` (the pty slave); the simulator reads and writes the
+    master side from a background thread, walking CONFIG -> READY -> REP ->
+    DATA -> COUNT -> ACK/NACK -> GESTURE_DONE -> DONE.
+
+    baud > 0 paces every write to that line rate; burst > 0 splits line
+    blocks into writes of that many lines (0 writes a whole block at once).
+    recording, from load_recording(), replaces the synthetic samples; its
+    repetitions are cycled if more are requested than it holds.
+    """
+
+    def __init__(self, gestures=DEFAULT_GESTURES, repetitions=5, samples=100, seed=None, encoding='ascii',
+                 drop_rate=0.0, corrupt_rate=0.0, baud=0, burst=0, recording=None):
+        self.gestures = list(gestures)
+        self.repetitions = repetitions
+        self.samples = samples
+        self.encoding = encoding
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        # 8N1 framing: a start bit, eight data bits and a stop bit per byte
+        self.byte_time = 10 / baud if baud else 0.0
+        self.burst = burst
+        self.recording = recording
+        if recording is not None:
+            unknown = [g for g in self.gestures if g not in recording]
+            if unknown:
+                raise ValueError(f"Gestures not in the recording: {', '.join(unknown)}")
+        self.rng = random.Random(seed)
+        # Separate stream for transmission faults so they never change the sample values
+        self.link_rng = random.Random(None if seed is None else seed + 1)
+
+        self.master_fd, slave_fd = os.openpty()
+        # Raw mode so nothing we write is echoed back to us, then let go of the
+        # slave so the master reports a hang-up until the host opens the port
+        tty.setraw(slave_fd)
+        self.port = os.ttyname(slave_fd)
+        os.close(slave_fd)
+
+        self.inbox = bytearray()
+        self.thread = None
+        self.error = None
+        self.acks = 0
+        self.nacks = 0
+        self.resends = 0
+        self.samples_sent = 0
+        self.dropped = 0
+        self.corrupted = 0
+        self.cpu_time = 0.0
+        self.link_free = 0.0
+
+    def start(self):
+        """Run the protocol session in a background thread."""
+        self.thread = threading.Thread(target=self._run_safely, name=f"firmware {self.port}", daemon=True)
+        self.thread.start()
+        return self
+
+    def join(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def close(self):
+        try:
+            os.close(self.master_fd)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.join(timeout=1)
+        self.close()
+
+    def send(self, data):
+        """Write bytes to the host, retrying short writes, then wait out their time on the wire if paced."""
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master_fd, view)
+            view = view[written:]
+        if self.byte_time:
+            now = time.perf_counter()
+            self.link_free = max(self.link_free, now) + len(data) * self.byte_time
+            if self.link_free > now:
+                time.sleep(self.link_free - now)
+
+    def send_lines(self, lines):
+        lines = [line + '\r\n' for line in lines]
+        step = self.burst or max(len(lines), 1)
+        for i in range(0, len(lines), step):
+            self.send(''.join(lines[i:i + step]).encode())
+
+    def receive_line(self):
+        """Block until the host sends a full line and return it without the newline."""
+        while b'\n' not in self.inbox:
+            self.inbox += os.read(self.master_fd, 256)
+        line, _, rest = self.inbox.partition(b'\n')
+        self.inbox = bytearray(rest)
+        return line.decode('utf-8', errors='replace').strip()
+
+    def config_lines(self):
+        lines = [
+            "<<<CONFIG>>>",
+            f"gestures:{','.join(self.gestures)}",
+            f"repetitions:{self.repetitions}",
+            f"samples:{self.samples}",
+            "header:seq;X-acc;Y-acc;Z-acc;label",
+        ]
+        if self.encoding != 'ascii':
+            lines.append(f"encoding:{self.encoding}")
+        lines.append("<<<CONFIG_END>>>")
+        return lines
+
+    def repetition_samples(self, gesture, rep):
+        """Return the (seq, x, y, z) samples for one repetition."""
+        if self.recording is not None:
+            recorded = self.recording[gesture]
+            return [(seq, *sample) for seq, sample in enumerate(recorded[(rep - 1) % len(recorded)])]
+        return [(seq, *synthetic_sample(gesture, seq, self.rng)) for seq in range(self.samples)]
+
+    def send_repetition(self, gesture, rep, samples):
+        """Transmit one repetition and return the host's reply (ACK or NACK)."""
+        self.samples_sent += len(samples)
+        if self.encoding == 'binary':
+            payload = encode_frames(samples, self.gestures.index(gesture))
+            crc = format_crc_marker(payload)
+            if self.corrupt_rate:
+                # The CRC was computed before the damage, so the host will catch it
+                payload = bytearray(payload)
+                for start in range(0, len(payload), FRAME_SIZE):
+                    if self.link_rng.random() < self.corrupt_rate:
+                        payload[start + self.link_rng.randrange(FRAME_SIZE)] ^= 1 << self.link_rng.randrange(8)
+                        self.corrupted += 1
+            self.send(f"<<<DATA>>>\r\n<<<BIN:{len(samples)}>>>\r\n".encode() + payload + (crc + "\r\n").encode())
+        else:
+            lines = [f"{seq};{x};{y};{z};{gesture}" for seq, x, y, z in samples]
+            count = len(lines)
+            if self.drop_rate:
+                # Lost on the way to the host: the device still reports the full count
+                lines = [line for line in lines if self.link_rng.random() >= self.drop_rate]
+                self.dropped += count - len(lines)
+            if self.corrupt_rate:
+                for i, line in enumerate(lines):
+                    if self.link_rng.random() < self.corrupt_rate:
+                        lines[i] = corrupt_line(line, self.link_rng)
+                        self.corrupted += 1
+            self.send_lines(["<<<DATA>>>", *lines, "<<<DATA_END>>>", f"<<<COUNT:{count}>>>"])
+        return self.receive_line()
+
+    def send_until_acked(self, gesture, rep, samples):
+        """Send a repetition, answering NACK with a full resend and RESEND:a-b,... with just those samples."""
+        reply = self.send_repetition(gesture, rep, samples)
+        while reply != 'ACK':
+            if reply.startswith('RESEND:'):
+                self.resends += 1
+                wanted = set()
+                for part in reply[len('RESEND:'):].split(','):
+                    first, _, last = part.partition('-')
+                    wanted.update(range(int(first), int(last or first) + 1))
+                reply = self.send_repetition(gesture, rep, [s for s in samples if s[0] in wanted])
+            else:
+                self.nacks += 1
+                reply = self.send_repetition(gesture, rep, samples)
+
+    def wait_for_host(self, settle=0.1):
+        """Block until the host has opened the port.
+
+        pyserial flushes the input queue while opening a port, so anything sent
+        before that is lost; the settle delay covers the gap between the open
+        and the flush.
+        """
+        poller = select.poll()
+        poller.register(self.master_fd, select.POLLHUP)
+        while any(event & select.POLLHUP for _, event in poller.poll(0)):
+            time.sleep(0.01)
+        time.sleep(settle)
+
+    def run_session(self):
+        self.wait_for_host()
+        self.send_lines(self.config_lines())
+        for gesture in self.gestures:
+            self.send_lines(["<<<READY>>>"])
+            self.receive_line()  # START
+            for rep in range(1, self.repetitions + 1):
+                self.send_lines([f"<<<REP:{rep}>>>"])
+                self.send_until_acked(gesture, rep, self.repetition_samples(gesture, rep))
+                self.acks += 1
+            self.send_lines(["<<<GESTURE_DONE>>>"])
+        self.send_lines(["<<<DONE>>>"])
+
+    def _run_safely(self):
+        started = time.thread_time()
+        try:
+            self.run_session()
+        except OSError as e:
+            # The host closed the port or the pty was torn down
+            self.error = e
+        finally:
+            # Lets a benchmark in the same process separate the host's CPU time from ours
+            self.cpu_time = time.thread_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate capture firmware on pseudo-terminals")
+    parser.add_argument('--devices', '-n', type=int, default=1, help='Number of simulated devices (default: 1)')
+    parser.add_argument('--gestures', '-g', type=str,
+                        help='Comma-separated gesture names (default: idle,waving,sliding or those in --replay)')
+    parser.add_argument('--repetitions', '-r', type=int, default=5, help='Repetitions per gesture (default: 5)')
+    parser.add_argument('--samples', '-s', type=int, default=100, help='Samples per repetition (default: 100)')
+    parser.add_argument('--encoding', '-e', choices=['ascii', 'binary'], default='ascii',
+                        help='Data encoding: ASCII lines or binary frames with CRC (default: ascii)')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Probability that a data line is lost in transit (default: 0)')
+    parser.add_argument('--corrupt-rate', type=float, default=0.0,
+                        help='Probability that a data line (binary: frame) is garbled in transit (default: 0)')
+    parser.add_argument('--baud', type=int, default=0,
+                        help='Pace output to this line rate, 8N1 (default: 0, as fast as the pty allows)')
+    parser.add_argument('--burst', type=int, default=0,
+                        help='Lines per write; 1 mimics firmware printing line by line (default: 0, whole blocks)')
+    parser.add_argument('--replay', metavar='CAPTURE',
+                        help='Send the repetitions recorded in this capture (e.g. data/TDATA.csv)')
+    args = parser.parse_args()
+
+    recording = None
+    if args.replay:
+        try:
+            recording = load_recording(args.replay, args.samples)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {args.replay}: {e}")
+            sys.exit(1)
+    gestures = args.gestures.split(',') if args.gestures else list(recording or DEFAULT_GESTURES)
+
+    try:
+        devices = [SimulatedFirmware(gestures, args.repetitions, args.samples, encoding=args.encoding,
+                                     drop_rate=args.drop_rate, corrupt_rate=args.corrupt_rate, baud=args.baud,
+                                     burst=args.burst, recording=recording).start()
+                   for _ in range(args.devices)]
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print("Simulated devices (pass these to capture_serial_data.py --port):")
+    for device in devices:
+        print(f"  {device.port}")
+    print("\nPress Ctrl+C to stop.")
+
+    try:
+        while any(device.thread.is_alive() for device in devices):
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for device in devices:
+            device.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+On-the-fly Gesture Augmentation for Gesture Recognition Lab
+
+Step 8 of the notebook builds the time-reversed copy of every gesture up
+front and stacks it onto the originals, which doubles memory before training
+starts. AugmentedGestures does the same augmentation per batch instead: each
+batch is gathered straight from the one training array and transformed in
+place, so memory stays at 1x the dataset whatever is enabled.
+
+Augmentations:
+    time reversal    'both' yields every gesture forward and reversed once per
+                     epoch (the notebook's X_combined); 'random' reverses each
+                     sample with probability 0.5
+    jitter           additive Gaussian noise with standard deviation jitter
+    scaling          per-gesture factor drawn uniformly from scale=(low, high)
+    axis permutation a random order of the X/Y/Z axes per gesture
+
+Example:
+    train = AugmentedGestures(X_train, y_train, batch_size=32, time_reversal='both', jitter=0.05)
+    model.fit(train, epochs=50, validation_data=(X_val, y_val))
+
+Augment only the training split; validation and test data stay unaugmented.
+"""
+
+import numpy as np
+
+TIME_REVERSAL_MODES = ('none', 'random', 'both')
+
+
+def augment_batch(X, indices, reverse, rng, jitter=0.0, scale=None, permute_axes=False):
+    """Return the augmented float32 batch X[indices], time-reversed where reverse is True.
+
+    Only batch-sized arrays are allocated; X itself is never copied or modified.
+    """
+    steps, axes = X.shape[1], X.shape[2]
+    forward = np.arange(steps)
+    time = np.where(reverse[:, None], forward[::-1], forward)
+
+    # Reversal and axis permutation are just different gather orders, so the
+    # whole batch comes out of X in one indexing operation
+    if permute_axes:
+        order = rng.permuted(np.broadcast_to(np.arange(axes), (len(indices), axes)), axis=1)
+        batch = X[indices[:, None, None], time[:, :, None], order[:, None, :]]
+    else:
+        batch = X[indices[:, None], time]
+    batch = batch.astype(np.float32, copy=False)
+
+    if scale is not None:
+        low, high = scale
+        batch *= rng.uniform(low, high, size=(len(indices), 1, 1)).astype(np.float32)
+    if jitter:
+        noise = rng.standard_normal(batch.shape, dtype=np.float32)
+        noise *= jitter
+        batch += noise
+    return batch
+
+
+def _define_augmented_gestures():
+    from tensorflow import keras
+
+    class AugmentedGestures(keras.utils.PyDataset):
+        """Keras dataset that augments training gestures batch by batch.
+
+        X is an (n, steps, axes) array and is used as is, never copied; y holds the
+        n integer labels. With time_reversal='both' an epoch has 2n samples.
+        Batches are reshuffled every epoch when shuffle is True.
+        """
+
+        def __init__(self, X, y, batch_size=32, time_reversal='both', jitter=0.0, scale=None,
+                     permute_axes=False, shuffle=True, seed=None, **kwargs):
+            super().__init__(**kwargs)
+            if time_reversal not in TIME_REVERSAL_MODES:
+                raise ValueError(f"Unknown time_reversal {time_reversal!r} "
+                                 f"(choose from {', '.join(TIME_REVERSAL_MODES)})")
+            if len(X) != len(y):
+                raise ValueError(f"X has {len(X)} gestures but y has {len(y)} labels")
+            self.X = X
+            self.y = np.asarray(y)
+            self.batch_size = batch_size
+            self.time_reversal = time_reversal
+            self.shuffle = shuffle
+            self.jitter = jitter
+            self.scale = scale
+            self.permute_axes = permute_axes
+            self.rng = np.random.default_rng(seed)
+            # Sample i >= n of an epoch is the reversed copy of gesture i - n
+            copies = 2 if time_reversal == 'both' else 1
+            self.order = np.arange(copies * len(X))
+            self.on_epoch_end()
+
+        def __len__(self):
+            return -(-len(self.order) // self.batch_size)
+
+        def __getitem__(self, index):
+            samples = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+            indices = samples % len(self.X)
+            if self.time_reversal == 'both':
+                reverse = samples >= len(self.X)
+            elif self.time_reversal == 'random':
+                reverse = self.rng.random(len(samples)) < 0.5
+            else:
+                reverse = np.zeros(len(samples), dtype=bool)
+            batch = augment_batch(self.X, indices, reverse, self.rng, jitter=self.jitter, scale=self.scale,
+                                  permute_axes=self.permute_axes)
+            return batch, self.y[indices]
+
+        def on_epoch_end(self):
+            if self.shuffle:
+                self.rng.shuffle(self.order)
+
+    return AugmentedGestures
+
+
+def __getattr__(name):
+    # AugmentedGestures subclasses a Keras class, so TensorFlow is only
+    # imported the first time it is used; augment_batch() stays NumPy-only
+    if name == 'AugmentedGestures':
+        cls = globals()['AugmentedGestures'] = _define_augmented_gestures()
+        return cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,322 @@
+"""
+Gesture Dataset Builder for Gesture Recognition Lab
+
+Turns capture files into the fixed-window arrays the notebook trains on:
+X with shape (num_gestures, 100, 3) and one integer label per gesture. This
+is the same dropna -> truncate -> reshape -> every-100th-label path as
+Step 4 of the notebook, done in one vectorized pass over any number of
+files. It also checks the rule from data/sample_data_format.md that all 100
+rows of a gesture carry the same label.
+
+Accepted inputs are CSV files (data/sample_data_format.md), and --format npy
+directories or .parquet files written by capture_serial_data.py.
+
+CSV files are parsed with explicit int16/categorical dtypes (with the pyarrow
+engine when it is installed) and the result is cached in a binary sidecar
+next to the CSV, e.g. data/TDATA.csv.cache.npz, so reloading an unchanged
+file skips parsing entirely.
+
+Example:
+    from gesture_data import load_gesture_windows
+    X, y, classes = load_gesture_windows('data/TDATA.csv')
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+SAMPLES_PER_GESTURE = 100
+AXIS_COLUMNS = ['X-acc', 'Y-acc', 'Z-acc']
+LABEL_COLUMN = 'label'
+
+CSV_DTYPES = {**{name: 'int16' for name in AXIS_COLUMNS}, LABEL_COLUMN: 'category'}
+CACHE_SUFFIX = '.cache.npz'
+# Bump when the cache layout changes so old sidecars are re-parsed
+CACHE_VERSION = 1
+
+
+def _as_paths(paths):
+    if isinstance(paths, (str, Path)):
+        return [Path(paths)]
+    return [Path(p) for p in paths]
+
+
+def default_csv_engine():
+    """The fastest pandas CSV engine available: 'pyarrow' if installed, else 'c'."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'c'
+    return 'pyarrow'
+
+
+def _parse_csv(path, engine):
+    import pandas as pd
+
+    try:
+        data = pd.read_csv(path, sep=';', usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, engine=engine)
+    except ValueError:
+        # int16 cannot hold NaN: parse the axes as float32, drop the gaps, then narrow
+        dtypes = {**CSV_DTYPES, **{name: 'float32' for name in AXIS_COLUMNS}}
+        data = pd.read_csv(path, sep=';', usecols=list(CSV_DTYPES), dtype=dtypes, engine=engine)
+        data = data.dropna().astype({name: 'int16' for name in AXIS_COLUMNS})
+    return data.dropna().reset_index(drop=True)
+
+
+def _file_digest(path):
+    # hashlib.file_digest() would need Python 3.11
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(path, digest=None):
+    stat = path.stat()
+    return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'digest': digest if digest is not None else _file_digest(path)}
+
+
+def cache_path_for(path):
+    """Sidecar cache file of a CSV capture: data/x.csv -> data/x.csv.cache.npz."""
+    path = Path(path)
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _load_cache(path):
+    """Return the cached (values, codes, categories) if the sidecar matches the CSV, else None.
+
+    Size and mtime match: the cache is used as is. Same size but a new mtime
+    (a fresh checkout, a copy): the content hash decides, and on a match the
+    sidecar is rewritten with the new mtime so later loads skip the hash.
+    """
+    cache = cache_path_for(path)
+    try:
+        with np.load(cache, allow_pickle=False) as data:
+            key = json.loads(str(data['key']))
+            stat = path.stat()
+            if key.get('version') != CACHE_VERSION or key.get('size') != stat.st_size:
+                return None
+            digest = None
+            if key.get('mtime_ns') != stat.st_mtime_ns:
+                digest = _file_digest(path)
+                if key.get('digest') != digest:
+                    return None
+            values, codes, categories = data['values'], data['codes'], data['categories']
+    except (OSError, KeyError, ValueError):
+        return None
+    if digest is not None:
+        _save_cache(path, values, codes, categories, digest)
+    return values, codes, categories
+
+
+def _save_cache(path, values, codes, categories, digest):
+    cache = cache_path_for(path)
+    tmp = cache.with_name(cache.name + '.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez(f, values=values, codes=codes, categories=categories,
+                     key=np.array(json.dumps(_cache_key(path, digest))))
+        os.replace(tmp, cache)
+    except OSError:
+        # A read-only data directory just means no cache
+        tmp.unlink(missing_ok=True)
+
+
+def read_csv_capture(path, engine=None, cache=True):
+    """Read a CSV capture as a DataFrame with int16 axes and a categorical label.
+
+    Rows with missing values are dropped. engine is passed to pandas.read_csv
+    (default: default_csv_engine()). With cache=True the parsed columns are
+    stored in a sidecar file and reused while the CSV is unchanged.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    cached = _load_cache(path) if cache else None
+    if cached is None:
+        digest = _file_digest(path) if cache else None
+        data = _parse_csv(path, engine or default_csv_engine())
+        labels = data[LABEL_COLUMN].cat
+        if cache:
+            categories = np.asarray(labels.categories, dtype=str)
+            _save_cache(path, data[AXIS_COLUMNS].to_numpy(), labels.codes.to_numpy(), categories, digest)
+        return data
+
+    values, codes, categories = cached
+    data = pd.DataFrame(values, columns=AXIS_COLUMNS)
+    data[LABEL_COLUMN] = pd.Categorical.from_codes(codes, categories=categories)
+    return data
+
+
+def read_capture(path, engine=None, cache=True):
+    """Read one capture into an (n, 3) int16 axis array and an (n,) label array.
+
+    Rows with missing values are dropped, as in the notebook's Step 4. For
+    CSV files engine and cache are passed on to read_csv_capture(). npy
+    directories are labelled from their labels.json manifest, never from the
+    sanitized file names; a directory without one raises FileNotFoundError.
+    """
+    path = Path(path)
+    if path.is_dir():
+        from capture_output import load_npy_capture
+
+        # {original label: rows}; load_npy_capture refuses a directory without a manifest
+        parts = load_npy_capture(path)
+        if not parts:
+            return np.empty((0, 3), dtype=np.int16), np.empty(0, dtype=object)
+        values = np.concatenate(list(parts.values()))
+        labels = np.repeat(np.array(list(parts), dtype=object), [len(v) for v in parts.values()])
+        return values, labels
+
+    if path.suffix == '.parquet':
+        from capture_output import load_parquet_capture
+
+        table = load_parquet_capture(path).drop_null()
+        values = np.stack([table.column(name).to_numpy() for name in AXIS_COLUMNS], axis=1)
+        return values, table.column(LABEL_COLUMN).to_numpy()
+
+    data = read_csv_capture(path, engine=engine, cache=cache)
+    return data[AXIS_COLUMNS].to_numpy(), data[LABEL_COLUMN].array
+
+
+def _block_labels(labels, num_gestures, samples_per_gesture, strict, source):
+    """Return one label per block, checking that every block has a single label.
+
+    Inconsistent blocks raise ValueError when strict, otherwise they are
+    reported through the returned keep mask.
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(labels[:num_gestures * samples_per_gesture])
+    blocks = codes.reshape(num_gestures, samples_per_gesture)
+    keep = (blocks == blocks[:, :1]).all(axis=1)
+    if strict and not keep.all():
+        bad = np.flatnonzero(~keep)
+        raise ValueError(
+            f"{source}: {len(bad)} gesture block(s) mix labels, first at rows "
+            f"{bad[0] * samples_per_gesture}-{(bad[0] + 1) * samples_per_gesture - 1}. "
+            f"Every {samples_per_gesture} consecutive rows must share one label "
+            f"(see data/sample_data_format.md); pass strict=False to drop such blocks.")
+    return np.asarray(uniques, dtype=object)[blocks[:, 0]], keep
+
+
+def encode_labels(block_labels, classes=None):
+    """Map label strings to integers the way LabelEncoder does (sorted class names).
+
+    Returns (y, classes). With an explicit classes list, unknown labels raise ValueError.
+    """
+    if classes is None:
+        classes = np.unique(block_labels.astype(str))
+    classes = np.asarray(classes, dtype=str)
+    y = np.searchsorted(classes, block_labels.astype(str))
+    y = np.minimum(y, len(classes) - 1) if len(classes) else y
+    if len(classes) and not (classes[y] == block_labels.astype(str)).all():
+        unknown = sorted(set(block_labels.astype(str)) - set(classes))
+        raise ValueError(f"Labels not in classes: {', '.join(unknown)}")
+    return y.astype(np.int64), classes
+
+
+def load_gesture_windows(paths, samples_per_gesture=SAMPLES_PER_GESTURE, classes=None, strict=True):
+    """Load one or more captures as fixed-size gesture windows.
+
+    Returns (X, y, classes): X is a C-contiguous float32 array of shape
+    (num_gestures, samples_per_gesture, 3), y the int64 class index of each
+    gesture and classes the sorted class names (as LabelEncoder.classes_).
+    Trailing rows that do not fill a whole gesture are dropped from each file.
+    """
+    parts = []
+    for path in _as_paths(paths):
+        values, labels = read_capture(path)
+        num_gestures = len(values) // samples_per_gesture
+        if num_gestures == 0:
+            continue
+        block_labels, keep = _block_labels(labels, num_gestures, samples_per_gesture, strict, path)
+        parts.append((values, num_gestures, block_labels, keep))
+
+    total = sum(int(keep.sum()) for _, _, _, keep in parts)
+    X = np.empty((total, samples_per_gesture, 3), dtype=np.float32)
+    all_labels = np.empty(total, dtype=object)
+
+    # Fill one preallocated array instead of concatenating per-file copies
+    offset = 0
+    for values, num_gestures, block_labels, keep in parts:
+        windows = values[:num_gestures * samples_per_gesture].reshape(num_gestures, samples_per_gesture, 3)
+        count = int(keep.sum())
+        X[offset:offset + count] = windows if keep.all() else windows[keep]
+        all_labels[offset:offset + count] = block_labels[keep]
+        offset += count
+
+    y, classes = encode_labels(all_labels, classes)
+    return X, y, classes
+
+
+def _scan_classes(paths):
+    """Collect the sorted class names of every capture without keeping the samples."""
+    import pandas as pd
+
+    names = set()
+    for path in paths:
+        if path.is_dir() or path.suffix == '.parquet':
+            names.update(str(label) for label in np.unique(read_capture(path)[1].astype(str)))
+        else:
+            labels = pd.read_csv(path, sep=';', usecols=[LABEL_COLUMN], dtype={LABEL_COLUMN: 'category'})
+            names.update(labels[LABEL_COLUMN].cat.categories)
+    return np.array(sorted(names), dtype=str)
+
+
+def _read_chunks(path, rows_per_chunk):
+    """Yield (values, labels) pieces of one capture of at most rows_per_chunk rows."""
+    if path.is_dir() or path.suffix == '.parquet':
+        # Binary captures load without parsing; only the windows are chunked
+        values, labels = read_capture(path)
+        for start in range(0, len(values), rows_per_chunk):
+            yield values[start:start + rows_per_chunk], labels[start:start + rows_per_chunk]
+        return
+
+    import pandas as pd
+
+    # The pyarrow engine cannot read in chunks; float32 axes tolerate missing values
+    dtypes = {**CSV_DTYPES, **{name: 'float32' for name in AXIS_COLUMNS}}
+    reader = pd.read_csv(path, sep=';', usecols=list(CSV_DTYPES), dtype=dtypes, chunksize=rows_per_chunk)
+    for chunk in reader:
+        chunk = chunk.dropna()
+        yield chunk[AXIS_COLUMNS].to_numpy(), chunk[LABEL_COLUMN].to_numpy()
+
+
+def iter_gesture_windows(paths, gestures_per_chunk=4096, samples_per_gesture=SAMPLES_PER_GESTURE,
+                         classes=None, strict=True):
+    """Stream gesture windows chunk by chunk for datasets larger than memory.
+
+    Yields (X, y) pairs shaped like load_gesture_windows() output, with at
+    most gestures_per_chunk gestures each. CSV files are read incrementally;
+    windows never span two files. Without classes, a first pass reads only
+    the label column to fix the label encoding.
+    """
+    paths = _as_paths(paths)
+    if classes is None:
+        classes = _scan_classes(paths)
+    rows_per_chunk = gestures_per_chunk * samples_per_gesture
+
+    for path in paths:
+        # dropna can leave a chunk short of a whole gesture; carry the remainder over
+        carry_values = np.empty((0, 3))
+        carry_labels = np.empty(0, dtype=object)
+        for values, labels in _read_chunks(path, rows_per_chunk):
+            if len(carry_values):
+                values = np.concatenate([carry_values, values])
+                labels = np.concatenate([carry_labels, labels])
+            num_gestures = len(values) // samples_per_gesture
+            used = num_gestures * samples_per_gesture
+            carry_values, carry_labels = values[used:], labels[used:]
+            if num_gestures == 0:
+                continue
+
+            block_labels, keep = _block_labels(labels, num_gestures, samples_per_gesture, strict, path)
+            X = values[:used].reshape(num_gestures, samples_per_gesture, 3)[keep].astype(np.float32)
+            y, _ = encode_labels(block_labels[keep], classes)
+            yield X, y
@@ -0,0 +1,101 @@
+"""
+tf.data Input Pipeline for Gesture Recognition Lab
+
+Builds training and validation tf.data.Datasets from the gesture arrays so
+that input preparation overlaps with training instead of running between
+steps:
+
+    normalize (parallel map) -> cache -> [reversed copies] -> shuffle
+    -> batch -> augment (parallel map) -> prefetch(AUTOTUNE)
+
+Normalization runs once thanks to cache(); the augmentations (the same ones
+as gesture_augment.AugmentedGestures, as TF ops) run per batch on the fly.
+stratified_split() gives the same split as the notebook's Step 10
+train_test_split(..., stratify=y).
+
+Example:
+    train_idx, val_idx = stratified_split(y, test_size=0.2, random_state=42)
+    train = make_dataset(X[train_idx], y[train_idx], scaler=scaler, training=True, jitter=0.05)
+    val = make_dataset(X[val_idx], y[val_idx], scaler=scaler)
+    model.fit(train, validation_data=val, epochs=50)
+"""
+
+import numpy as np
+
+from gesture_augment import TIME_REVERSAL_MODES
+
+
+def stratified_split(y, test_size=0.2, random_state=None):
+    """Return (train_indices, test_indices) with class proportions kept in both parts.
+
+    The indices are exactly those that train_test_split(..., test_size=test_size,
+    random_state=random_state, stratify=y) would select, in the same order, so
+    results stay comparable with the notebook. Indexing instead of splitting
+    the arrays lets callers decide when to copy.
+    """
+    from sklearn.model_selection import train_test_split
+
+    indices = np.arange(len(y))
+    train_idx, test_idx = train_test_split(indices, test_size=test_size, random_state=random_state, stratify=y)
+    return train_idx, test_idx
+
+
+def _augment_batch(x, time_reversal, jitter, scale, permute_axes):
+    """Augment one (batch, steps, axes) batch with TF ops."""
+    import tensorflow as tf
+
+    batch = tf.shape(x)[0]
+    if time_reversal == 'random':
+        flip = tf.random.uniform([batch, 1, 1]) < 0.5
+        x = tf.where(flip, tf.reverse(x, axis=[1]), x)
+    if permute_axes:
+        order = tf.argsort(tf.random.uniform([batch, x.shape[-1]]), axis=1)
+        x = tf.gather(x, order, axis=2, batch_dims=1)
+    if scale is not None:
+        low, high = scale
+        x = x * tf.random.uniform([batch, 1, 1], low, high)
+    if jitter:
+        x = x + tf.random.normal(tf.shape(x), stddev=jitter)
+    return x
+
+
+def make_dataset(X, y, batch_size=32, training=False, scaler=None, time_reversal='none', jitter=0.0,
+                 scale=None, permute_axes=False, cache=True, seed=None):
+    """Build a batched, prefetched tf.data.Dataset of (gesture, label) pairs.
+
+    scaler is an optional fitted gesture_scaler.AxisScaler applied to every
+    gesture. With training=True the samples are reshuffled every epoch and the
+    augmentations are applied; time_reversal='both' adds a reversed copy of
+    each gesture to the epoch, like the notebook's X_combined, without
+    storing it. cache may be True (memory) or a file path for tf.data's
+    on-disk cache.
+    """
+    if time_reversal not in TIME_REVERSAL_MODES:
+        raise ValueError(f"Unknown time_reversal {time_reversal!r} (choose from {', '.join(TIME_REVERSAL_MODES)})")
+
+    # TensorFlow is only loaded here, so stratified_split() stays cheap to import
+    import tensorflow as tf
+
+    autotune = tf.data.AUTOTUNE
+
+    ds = tf.data.Dataset.from_tensor_slices((np.asarray(X, dtype=np.float32), np.asarray(y)))
+    if scaler is not None:
+        mean = tf.constant(scaler.mean, dtype=tf.float32)
+        std = tf.constant(scaler.scale, dtype=tf.float32)
+        ds = ds.map(lambda x, label: ((x - mean) / std, label), num_parallel_calls=autotune)
+    if cache:
+        ds = ds.cache() if cache is True else ds.cache(str(cache))
+
+    if training:
+        if time_reversal == 'both':
+            ds = ds.concatenate(ds.map(lambda x, label: (tf.reverse(x, axis=[0]), label),
+                                       num_parallel_calls=autotune))
+        # A full-size buffer gives a uniform shuffle; the gestures are small
+        ds = ds.shuffle(ds.cardinality(), seed=seed, reshuffle_each_iteration=True)
+
+    ds = ds.batch(batch_size)
+
+    if training and (time_reversal == 'random' or jitter or scale is not None or permute_axes):
+        ds = ds.map(lambda x, label: (_augment_batch(x, time_reversal, jitter, scale, permute_axes), label),
+                    num_parallel_calls=autotune)
+    return ds.prefetch(autotune)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Model Export for Gesture Recognition Lab
+
+Exports a trained notebook model (Input -> Flatten -> Dense ... -> Dense
+softmax, with any Dropout in between) to a small .npz file of weights, which
+gesture_inference.NumpyClassifier evaluates with plain NumPy: no TensorFlow
+import, and a single window classifies in microseconds. Optionally also
+writes an int8-quantized TFLite model, which is the only export for the
+convolutional models of gesture_models.py.
+
+Usage:
+    uv run python gesture_export.py MODEL.keras [--output MODEL.npz] [--tflite] [--calibration DATA.csv]
+
+From the notebook:
+    from gesture_export import export_weights
+    export_weights(model, 'models/gestures.npz')
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SUPPORTED_ACTIVATIONS = ('linear', 'relu', 'sigmoid', 'tanh', 'softmax')
+
+
+def dense_layers(model):
+    """Return [(kernel, bias, activation)] for the model's Dense layers, checking the architecture.
+
+    Only Flatten, Dropout (a no-op at inference) and Dense layers are
+    supported; anything else raises ValueError.
+    """
+    layers = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in ('InputLayer', 'Flatten', 'Dropout'):
+            continue
+        if kind != 'Dense':
+            raise ValueError(f"Cannot export layer {layer.name!r} of type {kind}: "
+                             f"only Flatten, Dropout and Dense layers are supported")
+        activation = layer.activation.__name__
+        if activation not in SUPPORTED_ACTIVATIONS:
+            raise ValueError(f"Cannot export activation {activation!r} of layer {layer.name!r}")
+        kernel, bias = layer.get_weights()
+        layers.append((kernel, bias, activation))
+    if not layers:
+        raise ValueError("Model has no Dense layers to export")
+    return layers
+
+
+def export_weights(model, path):
+    """Write the model's Dense weights and activations to an .npz file for NumpyClassifier."""
+    arrays = {'input_shape': np.array(model.input_shape[1:], dtype=np.int64)}
+    for i, (kernel, bias, activation) in enumerate(dense_layers(model)):
+        arrays[f'kernel_{i}'] = kernel.astype(np.float32)
+        arrays[f'bias_{i}'] = bias.astype(np.float32)
+        arrays[f'activation_{i}'] = np.array(activation)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def export_tflite(model, path, calibration=None):
+    """Write an int8-quantized TFLite model.
+
+    calibration is a float32 array of normalized windows used to pick the
+    quantization ranges; the model then takes and returns int8 tensors. Without
+    it, only the weights are quantized (dynamic range) and inputs stay float32.
+    A quantization-aware model (gesture_models) is converted from its
+    strip_fake_quant() copy, whose weights already sit on the int8 grid.
+    """
+    import tensorflow as tf
+
+    from gesture_models import strip_fake_quant
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(strip_fake_quant(model))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if calibration is not None:
+        def representative_data():
+            for window in calibration[:500]:
+                yield [window[None].astype(np.float32)]
+
+        converter.representative_dataset = representative_data
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    Path(path).write_bytes(converter.convert())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained gesture model for fast CPU inference")
+    parser.add_argument('model', help='Saved Keras model (.keras or .h5)')
+    parser.add_argument('--output', '-o', help='Output .npz file (default: MODEL with .npz suffix)')
+    parser.add_argument('--tflite', action='store_true', help='Also write an int8-quantized .tflite model')
+    parser.add_argument('--calibration', metavar='DATA',
+                        help='Capture to calibrate full int8 quantization with (default: weights only)')
+    parser.add_argument('--scaler', metavar='FILE',
+                        help='Normalization applied to the calibration data (default: MODEL with .scaler.npz)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    from tensorflow import keras
+
+    from gesture_inference import default_scaler_path
+    from gesture_models import custom_objects
+
+    model = keras.models.load_model(args.model, custom_objects=custom_objects())
+    output = Path(args.output) if args.output else Path(args.model).with_suffix('.npz')
+    try:
+        export_weights(model, output)
+        print(f"Wrote {output} ({output.stat().st_size / 1024:.1f} KiB)")
+    except ValueError as e:
+        # The conv models only export to TFLite
+        if not args.tflite:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Skipping {output}: {e}")
+
+    if args.tflite:
+        calibration = None
+        if args.calibration:
+            from gesture_data import load_gesture_windows
+            from gesture_scaler import AxisScaler
+
+            calibration, _, _ = load_gesture_windows(args.calibration)
+            scaler_path = Path(args.scaler) if args.scaler else default_scaler_path(args.model)
+            if scaler_path.exists():
+                AxisScaler.load(scaler_path).transform(calibration)
+        tflite_path = output.with_suffix('.tflite')
+        export_tflite(model, tflite_path, calibration)
+        print(f"Wrote {tflite_path} ({tflite_path.stat().st_size / 1024:.1f} KiB, "
+              f"{'int8' if calibration is not None else 'int8 weights'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Streaming Gesture Inference for Gesture Recognition Lab
+
+Building blocks for classifying gestures live, as samples arrive from the
+device (capture_serial_data.py --infer):
+
+    SlidingWindow     the last 100 samples, normalized as they arrive
+    load_classifier   a trained model behind a predict(window) -> probabilities call:
+                      NumPy-only for .npz exports, TFLite, or Keras
+    LatencyRecorder   p50/p99 of inference and sample-to-prediction latency
+    LiveClassifier    ties them together: push samples, get periodic predictions
+
+The per-sample path allocates no arrays: samples are written into a
+preallocated buffer and normalized in place with the saved AxisScaler
+statistics, and the window handed to the model is a view.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCALER_SUFFIX = '.scaler.npz'
+
+
+def default_scaler_path(model_path):
+    """Where the normalization for a model is expected: models/m.keras -> models/m.scaler.npz."""
+    path = Path(model_path)
+    return path.with_name(path.stem + SCALER_SUFFIX)
+
+
+class SlidingWindow:
+    """Ring buffer of the most recent `size` samples, readable as one contiguous view.
+
+    Every sample is stored twice, at pos and pos + size, so the window from
+    the oldest to the newest sample is always buffer[pos:pos + size], with no
+    copy or roll.
+    """
+
+    def __init__(self, size=100, axes=3, scaler=None):
+        self.size = size
+        self.buffer = np.zeros((2 * size, axes), dtype=np.float32)
+        self.pos = 0
+        self.count = 0
+        self.mean = None if scaler is None else scaler.mean.astype(np.float32)
+        self.scale = None if scaler is None else scaler.scale.astype(np.float32)
+
+    @property
+    def full(self):
+        return self.count >= self.size
+
+    def push(self, x, y, z):
+        row = self.buffer[self.pos]
+        row[0] = x
+        row[1] = y
+        row[2] = z
+        if self.mean is not None:
+            np.subtract(row, self.mean, out=row)
+            np.divide(row, self.scale, out=row)
+        self.buffer[self.pos + self.size] = row
+        self.pos += 1
+        if self.pos == self.size:
+            self.pos = 0
+        self.count += 1
+
+    def window(self):
+        """The current (size, axes) window, oldest sample first. Overwritten by later pushes."""
+        return self.buffer[self.pos:self.pos + self.size]
+
+
+class KerasClassifier:
+    """A saved Keras model (.keras/.h5) called directly, without model.predict() overhead."""
+
+    def __init__(self, path):
+        os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+        from tensorflow import keras
+
+        from gesture_models import custom_objects
+
+        self.model = keras.models.load_model(path, custom_objects=custom_objects())
+        self.input_shape = tuple(self.model.input_shape[1:])
+        self.batch = np.zeros((1, *self.input_shape), dtype=np.float32)
+
+    def predict(self, window):
+        self.batch[0] = window
+        return np.asarray(self.model(self.batch, training=False))[0]
+
+    def predict_batch(self, batch):
+        return np.asarray(self.model(batch, training=False))
+
+
+class NumpyClassifier:
+    """Dense network exported by gesture_export.py, evaluated with NumPy only.
+
+    Each layer writes into a preallocated buffer, so a prediction allocates
+    no arrays and takes microseconds for the notebook's model.
+    """
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self.input_shape = tuple(int(n) for n in data['input_shape'])
+            self.layers = []
+            i = 0
+            while f'kernel_{i}' in data:
+                kernel = np.ascontiguousarray(data[f'kernel_{i}'], dtype=np.float32)
+                bias = data[f'bias_{i}'].astype(np.float32)
+                self.layers.append((kernel, bias, str(data[f'activation_{i}']), np.empty(len(bias), np.float32)))
+                i += 1
+        if not self.layers:
+            raise ValueError(f"{path} holds no exported layers")
+
+    def predict(self, window):
+        x = window.reshape(-1)
+        for kernel, bias, activation, out in self.layers:
+            np.matmul(x, kernel, out=out)
+            out += bias
+            _activate(out, activation)
+            x = out
+        return x
+
+    def predict_batch(self, batch):
+        """Classify a (n, steps, axes) batch at once; returns (n, classes) probabilities."""
+        x = batch.reshape(len(batch), -1)
+        for kernel, bias, activation, _ in self.layers:
+            x = x @ kernel
+            x += bias
+            _activate(x, activation)
+        return x
+
+
+def _activate(out, activation):
+    """Apply an activation in place to a 1-D output or a 2-D batch of outputs."""
+    if activation == 'relu':
+        np.maximum(out, 0, out=out)
+    elif activation == 'softmax':
+        if out.ndim == 1:
+            out -= out.max()
+            np.exp(out, out=out)
+            out /= out.sum()
+        else:
+            out -= out.max(axis=1, keepdims=True)
+            np.exp(out, out=out)
+            out /= out.sum(axis=1, keepdims=True)
+    elif activation == 'sigmoid':
+        np.negative(out, out=out)
+        np.exp(out, out=out)
+        out += 1
+        np.reciprocal(out, out=out)
+    elif activation == 'tanh':
+        np.tanh(out, out=out)
+
+
+class TFLiteClassifier:
+    """A .tflite model from gesture_export.py --tflite, int8 or float input.
+
+    predict_batch() resizes the interpreter's input to the batch, so a batch
+    runs in a single invoke(). Uses the standalone LiteRT (ai-edge-litert) or tflite_runtime interpreter
+    when installed, otherwise the one bundled with TensorFlow.
+    """
+
+    def __init__(self, path):
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+                import tensorflow as tf
+                Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=str(path))
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(n) for n in self.input['shape'][1:])
+        self.batch = np.zeros(self.input['shape'], dtype=self.input['dtype'])
+
+    def _set_batch_size(self, size):
+        """Resize the input to `size` windows; the exported batch dimension is dynamic."""
+        if len(self.batch) == size:
+            return
+        self.interpreter.resize_tensor_input(self.input['index'], [size, *self.input_shape])
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch = np.zeros(self.input['shape'], dtype=self.input['dtype'])
+
+    def _invoke(self, windows):
+        """Run the windows, already of the current batch size, and return float outputs."""
+        scale, zero_point = self.input['quantization']
+        if self.input['dtype'] == np.int8:
+            np.copyto(self.batch, np.clip(np.round(windows / scale + zero_point), -128, 127), casting='unsafe')
+        else:
+            self.batch[...] = windows
+        self.interpreter.set_tensor(self.input['index'], self.batch)
+        self.interpreter.invoke()
+        result = self.interpreter.get_tensor(self.output['index'])
+        scale, zero_point = self.output['quantization']
+        if self.output['dtype'] == np.int8:
+            return (result.astype(np.float32) - zero_point) * scale
+        return result
+
+    def predict(self, window):
+        self._set_batch_size(1)
+        return self._invoke(window)[0]
+
+    def predict_batch(self, batch):
+        """Classify a (n, steps, axes) batch in one interpreter call; returns (n, classes) probabilities."""
+        self._set_batch_size(len(batch))
+        return self._invoke(batch)
+
+
+CLASSIFIERS = {'.npz': NumpyClassifier, '.tflite': TFLiteClassifier}
+
+
+def load_classifier(path):
+    """Load a trained model for single-window prediction.
+
+    .npz weights from gesture_export.py run on NumPy alone; .tflite files use
+    a TFLite interpreter; anything else is loaded as a Keras model.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Model not found: {path}")
+    return CLASSIFIERS.get(path.suffix, KerasClassifier)(path)
+
+
+class LatencyRecorder:
+    """Collects latencies in seconds and reports percentiles in milliseconds."""
+
+    def __init__(self):
+        self.samples = []
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentiles(self, *points):
+        if not self.samples:
+            return [float('nan')] * len(points)
+        return [float(v) * 1e3 for v in np.percentile(self.samples, points)]
+
+    def summary(self):
+        p50, p99 = self.percentiles(50, 99)
+        return f"p50 {p50:.2f} ms, p99 {p99:.2f} ms over {len(self.samples)} predictions"
+
+
+class LiveClassifier:
+    """Feeds streamed samples through a SlidingWindow and classifies every `every` samples."""
+
+    def __init__(self, classifier, window, classes, every=10):
+        self.classifier = classifier
+        self.window = window
+        self.classes = classes
+        self.every = every
+        self.since_last = 0
+        self.inference = LatencyRecorder()
+        self.end_to_end = LatencyRecorder()
+
+    def push(self, x, y, z, received, label=None):
+        """Add one sample; received is the perf_counter() time it came off the port."""
+        self.window.push(x, y, z)
+        self.since_last += 1
+        if self.since_last < self.every or not self.window.full:
+            return
+        self.since_last = 0
+
+        started = time.perf_counter()
+        probabilities = self.classifier.predict(self.window.window())
+        finished = time.perf_counter()
+        self.inference.add(finished - started)
+        self.end_to_end.add(finished - received)
+
+        best = int(probabilities.argmax())
+        device = f"  (device: {label})" if label is not None else ""
+        print(f"  {self.classes[best]:12} {100 * probabilities[best]:5.1f}%  "
+              f"inference {1e3 * (finished - started):6.2f} ms{device}")
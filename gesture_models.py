@@ -0,0 +1,230 @@
+"""
+Model Families for Gesture Recognition Lab
+
+The notebook flattens each (100, 3) window into 600 features that feed a
+Dense(128) layer, which holds nearly all of the network's ~47k parameters
+and ignores the order of the samples. Two architectures can be built here:
+
+    dense  the notebook's Flatten -> Dense -> Dropout ... -> Dense softmax
+    conv   a Conv1D stem followed by depthwise-separable blocks (a depthwise
+           Conv1D over time, then a 1x1 Conv1D across channels), each
+           halving the time axis, then global average pooling and a softmax
+           layer: a couple of thousand parameters, and its cost does not
+           depend on the number of classes or on a large weight matrix
+
+With quantize=True the conv model trains quantization-aware: kernels are
+rounded to symmetric per-channel int8 and activations to 8 bits over a
+running min/max range in every forward pass. Gradients pass the rounding
+straight through, so the weights learn to tolerate int8 precision.
+strip_fake_quant() turns such a model into a plain float model with the
+int8-rounded weights, which gesture_export.export_tflite() converts to an
+int8 TFLite model with little loss of accuracy.
+
+Example:
+    model = build_model('conv', num_classes=len(classes), quantize=True)
+    model.fit(X_train, y_train, epochs=50, batch_size=32)
+    export_tflite(model, 'models/gestures.tflite', calibration=X_train)
+"""
+
+import os
+
+import numpy as np
+
+MODEL_FAMILIES = ('dense', 'conv')
+# Build options each family accepts; anything else passed to build_model() is ignored
+FAMILY_OPTIONS = {
+    'dense': ('units', 'dropout'),
+    'conv': ('filters', 'kernel_size', 'dropout', 'quantize'),
+}
+
+_layers = {}
+
+
+def custom_objects():
+    """The quantization-aware layer classes by name, for keras.models.load_model(custom_objects=...)."""
+    if not _layers:
+        _define_layers()
+    return dict(_layers)
+
+
+def _define_layers():
+    # Defined on first use so that importing this module does not import TensorFlow
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    from tensorflow import keras
+    from tensorflow.keras import ops
+
+    def fake_quant_kernel(kernel, channel_axes):
+        """Round a kernel to symmetric int8 per output channel; the gradient passes straight through."""
+        reduce_axes = tuple(range(len(kernel.shape) - channel_axes))
+        scale = ops.maximum(ops.max(ops.abs(kernel), axis=reduce_axes, keepdims=True) / 127, 1e-8)
+        quantized = ops.clip(ops.round(kernel / scale), -127, 127) * scale
+        return kernel + ops.stop_gradient(quantized - kernel)
+
+    register = keras.utils.register_keras_serializable(package='gesture_models')
+
+    @register
+    class FakeQuant(keras.layers.Layer):
+        """Rounds activations to 8 bits over a running min/max range (always including zero)."""
+
+        def __init__(self, momentum=0.99, **kwargs):
+            super().__init__(**kwargs)
+            self.momentum = momentum
+
+        def build(self, input_shape):
+            self.minimum = self.add_weight(name='minimum', shape=(), initializer='zeros', trainable=False)
+            self.maximum = self.add_weight(name='maximum', shape=(), initializer='zeros', trainable=False)
+            self.seen = self.add_weight(name='seen', shape=(), initializer='zeros', trainable=False)
+
+        def call(self, inputs, training=False):
+            if training:
+                low = ops.minimum(ops.min(inputs), 0.0)
+                high = ops.maximum(ops.max(inputs), 0.0)
+                # The first batch sets the range; later batches move it by a moving average
+                keep = self.momentum * self.seen
+                self.minimum.assign(keep * self.minimum + (1 - keep) * low)
+                self.maximum.assign(keep * self.maximum + (1 - keep) * high)
+                self.seen.assign(1.0)
+            scale = ops.maximum((self.maximum - self.minimum) / 255, 1e-8)
+            zero_point = ops.round(-self.minimum / scale)
+            quantized = (ops.clip(ops.round(inputs / scale) + zero_point, 0, 255) - zero_point) * scale
+            return inputs + ops.stop_gradient(quantized - inputs)
+
+        def get_config(self):
+            return {**super().get_config(), 'momentum': self.momentum}
+
+    @register
+    class QuantDense(keras.layers.Dense):
+        @property
+        def kernel(self):
+            return fake_quant_kernel(super().kernel, 1)
+
+        def quantized_kernel(self):
+            return self.kernel
+
+    @register
+    class QuantConv1D(keras.layers.Conv1D):
+        @property
+        def kernel(self):
+            return fake_quant_kernel(super().kernel, 1)
+
+        def quantized_kernel(self):
+            return self.kernel
+
+    @register
+    class QuantDepthwiseConv1D(keras.layers.DepthwiseConv1D):
+        def quantized_kernel(self):
+            # The kernel is (size, channels, multiplier) and every channel has its own filter
+            return fake_quant_kernel(self.kernel, 2)
+
+        def call(self, inputs):
+            outputs = ops.depthwise_conv(inputs, self.quantized_kernel(),
+                                         strides=self.strides, padding=self.padding,
+                                         dilation_rate=self.dilation_rate, data_format=self.data_format)
+            if self.use_bias:
+                outputs = outputs + self.bias
+            return self.activation(outputs) if self.activation is not None else outputs
+
+    _layers.update({cls.__name__: cls for cls in (FakeQuant, QuantDense, QuantConv1D, QuantDepthwiseConv1D)})
+
+
+def dense_model(num_classes, input_shape=(100, 3), units=(128, 64), dropout=0.3):
+    """The notebook's architecture (not compiled)."""
+    from tensorflow import keras
+
+    layers = [keras.layers.Input(shape=input_shape), keras.layers.Flatten()]
+    for size in units:
+        layers.append(keras.layers.Dense(size, activation='relu'))
+        if dropout:
+            layers.append(keras.layers.Dropout(dropout))
+    layers.append(keras.layers.Dense(num_classes, activation='softmax'))
+    return keras.Sequential(layers)
+
+
+def conv_model(num_classes, input_shape=(100, 3), filters=(16, 32, 32), kernel_size=5, dropout=0.2,
+               quantize=False):
+    """Conv1D stem, a depthwise-separable block per further entry of filters, global pooling (not compiled)."""
+    if not filters:
+        raise ValueError("conv_model needs at least one filter count")
+    from tensorflow import keras
+
+    if quantize:
+        quant = custom_objects()
+        Dense, Conv1D, DepthwiseConv1D = quant['QuantDense'], quant['QuantConv1D'], quant['QuantDepthwiseConv1D']
+    else:
+        Dense, Conv1D, DepthwiseConv1D = keras.layers.Dense, keras.layers.Conv1D, keras.layers.DepthwiseConv1D
+    layers = [keras.layers.Input(shape=input_shape)]
+
+    def add(layer):
+        layers.append(layer)
+        if quantize:
+            layers.append(quant['FakeQuant']())
+
+    if quantize:
+        layers.append(quant['FakeQuant']())
+    # Depthwise filters over three raw axes would see too little; the stem mixes them first
+    add(Conv1D(filters[0], kernel_size, strides=2, padding='same', activation='relu'))
+    for count in filters[1:]:
+        add(DepthwiseConv1D(kernel_size, strides=2, padding='same', activation='relu'))
+        add(Conv1D(count, 1, activation='relu'))
+    add(keras.layers.GlobalAveragePooling1D())
+    if dropout:
+        layers.append(keras.layers.Dropout(dropout))
+    layers.append(Dense(num_classes, activation='softmax'))
+    return keras.Sequential(layers)
+
+
+def build_model(family='dense', num_classes=3, input_shape=(100, 3), learning_rate=0.001, **options):
+    """Build and compile a model of the given family for integer labels.
+
+    options are the family's keyword arguments (see FAMILY_OPTIONS); others
+    are ignored, so one configuration dictionary can describe either family.
+    """
+    if family not in MODEL_FAMILIES:
+        raise ValueError(f"Unknown model family {family!r} (choose from {', '.join(MODEL_FAMILIES)})")
+    from tensorflow import keras
+
+    options = {name: value for name, value in options.items() if name in FAMILY_OPTIONS[family]}
+    builder = dense_model if family == 'dense' else conv_model
+    model = builder(num_classes, input_shape, **options)
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate), loss='sparse_categorical_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+
+def is_quantization_aware(model):
+    return any(type(layer).__name__ in custom_objects() for layer in model.layers)
+
+
+def strip_fake_quant(model):
+    """Return a float copy of a quantization-aware model with its kernels rounded to int8 values.
+
+    The copy computes what the trained model did, minus the activation
+    rounding, and uses only standard layers, so it saves, loads and converts
+    without custom objects. Other models are returned unchanged.
+    """
+    if not is_quantization_aware(model):
+        return model
+    from tensorflow import keras
+
+    layers = [keras.layers.Input(shape=model.input_shape[1:])]
+    weights = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'FakeQuant':
+            continue
+        if kind.startswith('Quant'):
+            base = getattr(keras.layers, kind[len('Quant'):])
+            layers.append(base.from_config(layer.get_config()))
+            weights.append([np.asarray(layer.quantized_kernel()), *layer.get_weights()[1:]])
+        else:
+            layers.append(layer.__class__.from_config(layer.get_config()))
+            weights.append(layer.get_weights())
+    copy = keras.Sequential(layers)
+    for layer, values in zip(copy.layers, weights):
+        layer.set_weights(values)
+    return copy
+
+
+def parameter_count(model):
+    """Trainable parameters (the quantization ranges are not counted)."""
+    return sum(int(weight.numpy().size) for weight in model.trainable_weights)
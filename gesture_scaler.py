@@ -0,0 +1,120 @@
+"""
+Incremental Per-Axis Normalization for Gesture Recognition Lab
+
+Step 7 of the notebook standardizes with StandardScaler on the whole dataset
+reshaped to (num_gestures * 100, 3). AxisScaler computes the same per-axis
+mean and standard deviation, but chunk by chunk: partial_fit() merges each
+chunk's statistics into running totals (Welford/Chan), so a dataset streamed
+with gesture_data.iter_gesture_windows() never has to be in memory at once.
+transform() works in place on float32 arrays.
+
+The fitted statistics are saved to a small .npz file, so live inference
+applies exactly the same normalization without refitting.
+
+Example:
+    scaler = fit_scaler(['data/TDATA.csv'])
+    scaler.save('models/scaler.npz')
+    ...
+    scaler = AxisScaler.load('models/scaler.npz')
+    X = scaler.transform(X)
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+
+class AxisScaler:
+    """Per-axis standardization z = (x - mean) / std over (..., axes) arrays.
+
+    Matches sklearn's StandardScaler fitted on X.reshape(-1, axes): population
+    variance, and a scale of 1 for axes with zero variance.
+    """
+
+    def __init__(self, axes=3):
+        self.axes = axes
+        self.count = 0
+        self.mean = np.zeros(axes)
+        self.m2 = np.zeros(axes)
+
+    @property
+    def var(self):
+        return self.m2 / self.count if self.count else np.full(self.axes, np.nan)
+
+    @property
+    def scale(self):
+        std = np.sqrt(self.var)
+        return np.where(std > 0, std, 1.0)
+
+    def partial_fit(self, X):
+        """Merge the statistics of one chunk of samples, shaped (..., axes)."""
+        samples = np.asarray(X).reshape(-1, self.axes)
+        count = len(samples)
+        if count == 0:
+            return self
+        # Chunk statistics in float64: the deviations are one float64 temporary the size of the chunk,
+        # so memory-bound callers should pass moderate chunks rather than a whole capture
+        mean = samples.mean(axis=0, dtype=np.float64)
+        m2 = ((samples - mean) ** 2).sum(axis=0)
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        return self
+
+    def fit(self, chunks):
+        """Fit from scratch on an array or an iterable of arrays (e.g. streamed chunks)."""
+        self.__init__(self.axes)
+        if isinstance(chunks, np.ndarray):
+            chunks = [chunks]
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def transform(self, X, copy=False):
+        """Standardize X, in place when it is a writable float32 array and copy is False."""
+        if self.count == 0:
+            raise ValueError("AxisScaler is not fitted yet")
+        X = np.asarray(X)
+        if copy or X.dtype != np.float32 or not X.flags.writeable:
+            X = X.astype(np.float32)
+        X -= self.mean.astype(np.float32)
+        X /= self.scale.astype(np.float32)
+        return X
+
+    def inverse_transform(self, X):
+        return np.asarray(X, dtype=np.float32) * self.scale.astype(np.float32) + self.mean.astype(np.float32)
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, count=self.count, mean=self.mean, m2=self.m2)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            scaler = cls(axes=len(data['mean']))
+            scaler.count = int(data['count'])
+            scaler.mean = data['mean'].astype(np.float64)
+            scaler.m2 = data['m2'].astype(np.float64)
+        return scaler
+
+    @classmethod
+    def from_standard_scaler(cls, scaler):
+        """Take over the statistics of a fitted sklearn StandardScaler, e.g. the notebook's."""
+        axes = len(scaler.mean_)
+        result = cls(axes=axes)
+        result.count = int(np.max(scaler.n_samples_seen_))
+        result.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        result.m2 = np.asarray(scaler.var_, dtype=np.float64) * result.count
+        return result
+
+
+def fit_scaler(paths, gestures_per_chunk=4096, **kwargs):
+    """Fit an AxisScaler on captures streamed with gesture_data.iter_gesture_windows()."""
+    from gesture_data import iter_gesture_windows
+
+    return AxisScaler().fit(X for X, _ in iter_gesture_windows(paths, gestures_per_chunk=gestures_per_chunk,
+                                                                  **kwargs))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Continuous Recording Segmentation for Gesture Recognition Lab
+
+The notebook cuts captures into back-to-back 100-row blocks, which only
+works for recordings made one gesture per block. For a continuous stream,
+sliding_windows() gives every `stride`-th 100-row window as a view into the
+recording (nothing is copied), and an activity detector marks the windows in
+which the board is actually moving, so idle stretches can be skipped before
+labeling or classification.
+
+Activity is measured per window from running sums, in one pass over the
+recording however many windows overlap:
+    variance  sum over the axes of each axis' variance in the window
+    energy    mean squared sample-to-sample change, summed over the axes
+Both ignore the constant gravity offset. Without an explicit threshold,
+windows count as active above 10x the recording's noise floor (the 10th
+percentile of the activity), which assumes at least a tenth of it is idle.
+
+Usage:
+    uv run python gesture_segment.py RECORDING.csv [--stride 10] [--threshold T] [--method energy]
+                                     [--csv segments.csv]
+
+Example:
+    windows, starts = sliding_windows(values, size=100, stride=10), window_starts(len(values), 100, 10)
+    active = window_activity(values, size=100, stride=10) > threshold
+    probabilities = classifier.predict_batch(windows[active])
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from gesture_data import AXIS_COLUMNS, SAMPLES_PER_GESTURE
+
+ACTIVITY_METHODS = ('variance', 'energy')
+
+
+def window_starts(num_rows, size=SAMPLES_PER_GESTURE, stride=1):
+    """First row of every window sliding_windows() returns for a recording of num_rows rows."""
+    return np.arange(0, max(num_rows - size + 1, 0), stride)
+
+
+def sliding_windows(values, size=SAMPLES_PER_GESTURE, stride=1):
+    """Return a read-only (num_windows, size, axes) view of every stride-th window of an (n, axes) recording.
+
+    The windows overlap in memory, so the view costs nothing however many
+    there are; copy (or index with a mask) only the ones that are needed.
+    Returns no windows if the recording is shorter than size.
+    """
+    if size < 1 or stride < 1:
+        raise ValueError(f"size and stride must be positive, got {size} and {stride}")
+    values = np.asarray(values)
+    if values.ndim != 2:
+        raise ValueError(f"Expected an (n, axes) recording, got shape {values.shape}")
+    if len(values) < size:
+        return np.empty((0, size, values.shape[1]), dtype=values.dtype)
+    return sliding_window_view(values, (size, values.shape[1]))[::stride, 0]
+
+
+def _window_sums(values, size, stride):
+    """Sums over every stride-th size-row window of an (n, axes) float64 array, from a running sum."""
+    totals = np.zeros((len(values) + 1, values.shape[1]))
+    np.cumsum(values, axis=0, out=totals[1:])
+    starts = window_starts(len(values), size, stride)
+    return totals[starts + size] - totals[starts]
+
+
+def window_activity(values, size=SAMPLES_PER_GESTURE, stride=1, method='variance'):
+    """Return one activity value per window of sliding_windows(values, size, stride)."""
+    if method not in ACTIVITY_METHODS:
+        raise ValueError(f"Unknown activity method {method!r} (choose from {', '.join(ACTIVITY_METHODS)})")
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < size:
+        return np.empty(0)
+    if method == 'variance':
+        # Centering on the overall mean keeps the running sums of squares small and precise
+        centered = values - values.mean(axis=0)
+        mean = _window_sums(centered, size, stride) / size
+        square = _window_sums(centered * centered, size, stride) / size
+        return np.maximum(square - mean * mean, 0).sum(axis=1)
+    steps = np.diff(values, axis=0)
+    return _window_sums(steps * steps, size - 1, stride).sum(axis=1) / max(size - 1, 1)
+
+
+def default_threshold(activity, quantile=0.1, factor=10.0):
+    """factor times the activity's `quantile` quantile (the idle noise floor)."""
+    if len(activity) == 0:
+        return 0.0
+    return factor * float(np.quantile(activity, quantile))
+
+
+def active_segments(active, starts, size=SAMPLES_PER_GESTURE):
+    """Merge overlapping active windows into [(first_row, end_row)] ranges (end exclusive)."""
+    segments = []
+    for start in starts[active].tolist():
+        if segments and start <= segments[-1][1]:
+            segments[-1][1] = start + size
+        else:
+            segments.append([start, start + size])
+    return [tuple(segment) for segment in segments]
+
+
+def read_axes(path):
+    """Read the (n, 3) axis columns of a recording; CSVs need no label column."""
+    path = Path(path)
+    if path.suffix == '.csv':
+        import pandas as pd
+
+        data = pd.read_csv(path, sep=';', usecols=AXIS_COLUMNS, dtype='float32').dropna()
+        return data.to_numpy()
+    from gesture_data import read_capture
+
+    values, _ = read_capture(path)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the active stretches of a continuous recording")
+    parser.add_argument('recording', help='Capture file (CSV without labels is fine, or npy directory/parquet)')
+    parser.add_argument('--size', type=int, default=SAMPLES_PER_GESTURE,
+                        help='Window length in samples (default: 100)')
+    parser.add_argument('--stride', type=int, default=10, help='Samples between window starts (default: 10)')
+    parser.add_argument('--method', choices=ACTIVITY_METHODS, default='variance',
+                        help='Activity measure (default: variance)')
+    parser.add_argument('--threshold', type=float,
+                        help='Activity above which a window is active (default: 10x the noise floor)')
+    parser.add_argument('--csv', metavar='FILE', help='Write the active segments (first_row;end_row) to FILE')
+    args = parser.parse_args()
+
+    try:
+        values = read_axes(args.recording)
+        activity = window_activity(values, args.size, args.stride, args.method)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    threshold = args.threshold if args.threshold is not None else default_threshold(activity)
+    active = activity > threshold
+    starts = window_starts(len(values), args.size, args.stride)
+    segments = active_segments(active, starts, args.size)
+
+    print(f"{len(values)} rows, {len(activity)} windows of {args.size} every {args.stride} samples")
+    print(f"{args.method} threshold {threshold:.6g}: {int(active.sum())} active windows "
+          f"({100 * active.mean() if len(active) else 0:.1f}%), {len(segments)} segments")
+    for first, end in segments[:20]:
+        print(f"  rows {first:8d} - {end:8d}  ({end - first} samples)")
+    if len(segments) > 20:
+        print(f"  ... {len(segments) - 20} more")
+
+    if args.csv:
+        with open(args.csv, 'w') as f:
+            f.write('first_row;end_row\n')
+            f.writelines(f"{first};{end}\n" for first, end in segments)
+        print(f"Wrote {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter Sweep for Gesture Recognition Lab
+
+Trains the notebook's Flatten -> Dense -> Dropout model for every
+configuration of a grid (or a random sample of it) under stratified k-fold
+cross-validation, in a pool of worker processes:
+
+    units          hidden layer sizes, e.g. [128, 64]
+    dropout        dropout rate after each hidden layer
+    learning_rate  Adam learning rate
+    batch_size     training batch size
+    augment        time reversal ('both') plus jitter and scaling, via
+                   gesture_augment.AugmentedGestures
+
+A space that sets 'family' to ["conv"] (or both families) sweeps the
+gesture_models convolutional network instead, with its own 'filters',
+'kernel_size' and 'quantize' lists; options a family does not use are
+ignored, so keep those lists to a single value.
+
+The (N, 100, 3) gesture array is placed in shared memory once and every
+worker maps it, instead of receiving a pickled copy with each task. Each
+worker limits TensorFlow to --threads threads and, where the OS allows,
+pins itself to that many CPUs, so workers do not compete for cores.
+
+Every finished (configuration, fold) is appended to the results file as a
+JSON line right away; re-running the same command skips what is already
+there, so an interrupted sweep resumes where it stopped. A run that fails is
+reported and skipped, and is tried again on the next run.
+
+Usage:
+    uv run python gesture_sweep.py data/TDATA.csv [--random 20] [--folds 5] [--epochs 30] [--results sweep.jsonl]
+    uv run python gesture_sweep.py data/TDATA.csv --space space.json --workers 4 --threads 2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Lists of values to combine; --space FILE replaces any of them with a JSON object of the same shape
+DEFAULT_SPACE = {
+    'units': [[128, 64], [64, 32], [256, 128]],
+    'dropout': [0.0, 0.3, 0.5],
+    'learning_rate': [0.001, 0.003],
+    'batch_size': [32, 64],
+    'augment': [False, True],
+}
+
+
+def configurations(space, samples=None, seed=0):
+    """Every combination of the space's values, or `samples` of them drawn without replacement."""
+    names = sorted(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    if samples is not None and samples < len(grid):
+        grid = random.Random(seed).sample(grid, samples)
+    return grid
+
+
+def task_key(config, fold, folds, epochs, seed):
+    """A hashable identity for one training run, used to skip finished runs on resume."""
+    return json.dumps([config, fold, folds, epochs, seed], sort_keys=True)
+
+
+def load_results(path):
+    """Return the records already in a results file (none if it does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # A line cut short by an interrupted run
+    return records
+
+
+# Worker state, set up once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(shared, counter, threads):
+    """Map the shared dataset and limit (and if possible pin) this worker's threads."""
+    from multiprocessing import shared_memory
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if hasattr(os, 'sched_setaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+        if len(cpus) >= threads:
+            first = (index * threads) % len(cpus)
+            os.sched_setaffinity(0, {cpus[(first + i) % len(cpus)] for i in range(threads)})
+
+    # The thread pools are sized when TensorFlow starts, so this has to come before the import
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    arrays = {}
+    for name, (shm_name, shape, dtype) in shared.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        arrays[name].flags.writeable = False
+        # Keep the mapping alive for the life of the worker
+        _worker.setdefault('segments', []).append(shm)
+    _worker['X'], _worker['y'] = arrays['X'], arrays['y']
+
+
+def build_model(config, num_classes, input_shape=(100, 3)):
+    """The configuration's model family (the notebook's dense model unless it sets 'family')."""
+    from gesture_models import build_model as build
+
+    options = {name: value for name, value in config.items() if name not in ('family', 'learning_rate')}
+    return build(config.get('family', 'dense'), num_classes, input_shape, config['learning_rate'], **options)
+
+
+def fold_indices(y, folds, fold, seed):
+    """Train and validation indices of one stratified fold."""
+    from sklearn.model_selection import StratifiedKFold
+
+    splits = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(np.zeros(len(y)), y)
+    return next(itertools.islice(splits, fold, None))
+
+
+def train_fold(config, fold, folds, epochs, seed):
+    """Train one configuration on one fold in a worker. Returns the result record."""
+    from tensorflow import keras
+
+    from gesture_scaler import AxisScaler
+
+    X, y = _worker['X'], _worker['y']
+    train_idx, val_idx = fold_indices(y, folds, fold, seed)
+    keras.utils.set_random_seed(seed + fold)
+
+    scaler = AxisScaler()
+    scaler.partial_fit(X[train_idx])
+    # Fancy indexing copies, so normalizing in place leaves the shared array alone
+    X_train = scaler.transform(X[train_idx])
+    X_val = scaler.transform(X[val_idx])
+    y_train, y_val = y[train_idx], y[val_idx]
+
+    model = build_model(config, int(y.max()) + 1, X.shape[1:])
+    started = time.perf_counter()
+    if config['augment']:
+        from gesture_augment import AugmentedGestures
+
+        train = AugmentedGestures(X_train, y_train, batch_size=config['batch_size'], time_reversal='both',
+                                  jitter=0.05, scale=(0.9, 1.1), seed=seed + fold)
+        model.fit(train, epochs=epochs, verbose=0)
+    else:
+        model.fit(X_train, y_train, batch_size=config['batch_size'], epochs=epochs, shuffle=True, verbose=0)
+    seconds = time.perf_counter() - started
+    loss, accuracy = model.evaluate(X_val, y_val, batch_size=256, verbose=0)
+    return {'config': config, 'fold': fold, 'folds': folds, 'epochs': epochs, 'seed': seed,
+            'val_accuracy': float(accuracy), 'val_loss': float(loss), 'train_seconds': seconds,
+            'pid': os.getpid()}
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def _share(array, segments):
+    """Copy an array into a new shared memory block. Returns what a worker needs to map it."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    segments.append(shm)
+    return shm.name, array.shape, array.dtype.str
+
+
+def run_sweep(X, y, configs, folds=5, epochs=30, seed=0, workers=None, threads=1, results='sweep.jsonl'):
+    """Train every configuration on every fold, appending each result to `results`.
+
+    Runs already in the results file are skipped. A run that raises is
+    reported and the sweep goes on without it. Returns (all records for the
+    requested configurations, old and new; failed runs as dicts of config,
+    fold and error).
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    records = load_results(results)
+    done = {task_key(r['config'], r['fold'], r['folds'], r['epochs'], r['seed']) for r in records}
+    wanted = {task_key(config, fold, folds, epochs, seed) for config in configs for fold in range(folds)}
+    tasks = [(config, fold) for config in configs for fold in range(folds)
+             if task_key(config, fold, folds, epochs, seed) not in done]
+    print(f"{len(configs)} configurations x {folds} folds: {len(wanted) - len(tasks)} runs already in "
+          f"{results}, {len(tasks)} to train")
+    failures = []
+
+    if tasks:
+        workers = workers or max(1, (os.cpu_count() or 1) // threads)
+        segments = []
+        try:
+            shared = {'X': _share(np.ascontiguousarray(X, dtype=np.float32), segments),
+                      'y': _share(np.ascontiguousarray(y, dtype=np.int64), segments)}
+            # spawn: TensorFlow does not survive fork, and workers only import it after start-up
+            context = multiprocessing.get_context('spawn')
+            counter = context.Value('i', 0)
+            with open(results, 'a') as out, ProcessPoolExecutor(
+                    max_workers=min(workers, len(tasks)), mp_context=context, initializer=_init_worker,
+                    initargs=(shared, counter, threads)) as pool:
+                if out.tell() and not _ends_with_newline(results):
+                    out.write('\n')  # Finish a line cut short by an interrupted run
+                futures = {pool.submit(train_fold, config, fold, folds, epochs, seed): (config, fold)
+                           for config, fold in tasks}
+                for finished, future in enumerate(as_completed(futures), 1):
+                    config, fold = futures[future]
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        # Left out of the results file, so the next run retries it
+                        failures.append({'config': config, 'fold': fold, 'error': f"{type(e).__name__}: {e}"})
+                        print(f"  [{finished}/{len(tasks)}] fold {fold} {describe(config)}: "
+                              f"FAILED ({failures[-1]['error']})")
+                        continue
+                    out.write(json.dumps(record) + '\n')
+                    out.flush()
+                    records.append(record)
+                    print(f"  [{finished}/{len(tasks)}] fold {record['fold']} {describe(record['config'])}: "
+                          f"accuracy {record['val_accuracy']:.3f} ({record['train_seconds']:.1f} s)")
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    records = [r for r in records if task_key(r['config'], r['fold'], r['folds'], r['epochs'], r['seed']) in wanted]
+    return records, failures
+
+
+def describe(config):
+    return ' '.join(f"{name}={config[name]}" for name in sorted(config))
+
+
+def summarize(records):
+    """Return [(config, mean accuracy, std, folds)] best first."""
+    by_config = {}
+    for record in records:
+        by_config.setdefault(json.dumps(record['config'], sort_keys=True), []).append(record['val_accuracy'])
+    rows = [(json.loads(key), statistics.mean(scores), statistics.pstdev(scores), len(scores))
+            for key, scores in by_config.items()]
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter sweep over the notebook model")
+    parser.add_argument('data', nargs='+', help='Capture files for gesture_data.load_gesture_windows')
+    parser.add_argument('--space', metavar='FILE', help='JSON object of value lists overriding the default grid')
+    parser.add_argument('--random', type=int, metavar='N', help='Try N random configurations instead of all')
+    parser.add_argument('--folds', type=int, default=5, help='Stratified folds (default: 5)')
+    parser.add_argument('--epochs', type=int, default=30, help='Epochs per run (default: 30)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for folds, sampling and training (default: 0)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPUs / --threads)')
+    parser.add_argument('--threads', type=int, default=1, help='TensorFlow threads per worker (default: 1)')
+    parser.add_argument('--results', default='sweep.jsonl', help='Results file, resumed if it exists '
+                        '(default: sweep.jsonl)')
+    parser.add_argument('--top', type=int, default=10, help='Configurations to list at the end (default: 10)')
+    args = parser.parse_args()
+
+    space = dict(DEFAULT_SPACE)
+    if args.space:
+        try:
+            with open(args.space) as f:
+                space.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error reading {args.space}: {e}")
+            sys.exit(1)
+
+    from gesture_data import load_gesture_windows
+
+    try:
+        X, y, classes = load_gesture_windows(args.data)
+    except (OSError, ValueError) as e:
+        print(f"Error loading data: {e}")
+        sys.exit(1)
+    print(f"{len(X)} gestures, classes: {', '.join(map(str, classes))}")
+
+    configs = configurations(space, args.random, args.seed)
+    records, failures = run_sweep(X, y, configs, folds=args.folds, epochs=args.epochs, seed=args.seed,
+                                  workers=args.workers, threads=args.threads, results=args.results)
+
+    print()
+    print(f"  {'accuracy':>8} {'std':>6} {'folds':>5}  configuration")
+    for config, mean, std, count in summarize(records)[:args.top]:
+        print(f"  {mean:8.3f} {std:6.3f} {count:5d}  {describe(config)}")
+
+    if failures:
+        print(f"\n{len(failures)} runs failed (re-run the same command to retry them):")
+        for failure in failures:
+            print(f"  fold {failure['fold']} {describe(failure['config'])}: {failure['error']}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
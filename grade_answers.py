@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Cohort Grader for Gesture Recognition Lab
+
+Grades many students' answers.py files at once with the same rules as
+answers.check_answers(): an answer is lower-cased, stripped and compared by
+SHA-256 against the reference hashes. The submissions are never imported or
+run; their top-level `answer_*` / `conceptual_*` assignments are read with
+ast and only literal values (strings, numbers, ...) are accepted. The
+reference hashes are read the same way from check_answers() in the
+instructor's copy of answers.py.
+
+Submissions may be given as files or directories, which are searched
+recursively for files named answers.py (--pattern changes the glob). A file
+named answers.py is reported under its folder's name, anything else under
+its file name. The files are graded in a process pool; the report
+has one row per student and per-question statistics: the share of students
+answering correctly, how well the question separates strong from weak
+students (correlation with the rest of the score) and the most common wrong
+answers.
+
+Usage:
+    uv run python grade_answers.py submissions/ [--key answers.py] [--csv cohort.csv] [--json cohort.json]
+    uv run python grade_answers.py submissions/ --pattern '*_answers.py'
+"""
+
+import argparse
+import ast
+import csv
+import hashlib
+import json
+import math
+import os
+import sys
+from collections import Counter
+from functools import partial
+from pathlib import Path
+
+UNANSWERED = "YOUR_ANSWER_HERE"
+PREFIXES = ('answer_', 'conceptual_')
+STATUSES = ('correct', 'incorrect', 'unanswered', 'missing', 'invalid')
+
+
+def normalize_answer(answer):
+    """The normalization check_answers() applies before hashing."""
+    return str(answer).lower().strip()
+
+
+def hash_answer(answer):
+    return hashlib.sha256(normalize_answer(answer).encode()).hexdigest()
+
+
+def load_key(path):
+    """Return {question: sha256} from the correct_hashes literal in answers.py's check_answers()."""
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'), filename=str(path))
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id == 'correct_hashes'):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"{path} has no correct_hashes table")
+
+
+def extract_answers(source, filename='<answers>'):
+    """Return ({question: value}, {question: problem}) for the top-level answer assignments in source.
+
+    Later assignments win, as they would when the file runs. Values that are
+    not literals are reported as problems instead of being evaluated. Raises
+    SyntaxError if the file does not parse.
+    """
+    answers = {}
+    problems = {}
+    for node in ast.parse(source, filename=filename).body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        names = [t.id for t in targets if isinstance(t, ast.Name) and t.id.startswith(PREFIXES)]
+        if not names:
+            continue
+        try:
+            result = ast.literal_eval(value)
+            problem = None
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            result, problem = None, f"line {node.lineno}: not a literal value"
+        for name in names:
+            if problem:
+                answers.pop(name, None)
+                problems[name] = problem
+            else:
+                answers[name] = result
+                problems.pop(name, None)
+    return answers, problems
+
+
+def student_name(path):
+    path = Path(path)
+    return path.parent.name if path.name == 'answers.py' else path.stem
+
+
+def grade_file(path, key):
+    """Grade one submission against {question: sha256}. Returns a plain dict, so it pickles cheaply."""
+    record = {'student': student_name(path), 'path': str(path), 'score': 0, 'total': len(key),
+              'status': {}, 'wrong': {}, 'error': None}
+    try:
+        answers, problems = extract_answers(Path(path).read_text(encoding='utf-8', errors='replace'), str(path))
+    except (SyntaxError, ValueError, RecursionError, OSError) as e:
+        # ValueError: null bytes in the source; RecursionError: absurdly nested expressions
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['status'] = dict.fromkeys(key, 'invalid')
+        return record
+
+    for question, expected in key.items():
+        if question in problems:
+            status = 'invalid'
+        elif question not in answers:
+            status = 'missing'
+        elif answers[question] == UNANSWERED:
+            status = 'unanswered'
+        elif hash_answer(answers[question]) == expected:
+            status = 'correct'
+            record['score'] += 1
+        else:
+            status = 'incorrect'
+            record['wrong'][question] = normalize_answer(answers[question])
+        record['status'][question] = status
+    if problems:
+        record['error'] = '; '.join(f"{q} {problem}" for q, problem in sorted(problems.items()))
+    return record
+
+
+def find_submissions(paths, pattern='answers.py'):
+    """Files given directly, plus those matching pattern anywhere under the given directories."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob(pattern)) if path.is_dir() else [path])
+    return files
+
+
+def grade_cohort(paths, key, workers=None, pattern='answers.py'):
+    """Grade every submission in parallel. Returns the records in submission order."""
+    files = find_submissions(paths, pattern)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return [grade_file(path, key) for path in files]
+    from concurrent.futures import ProcessPoolExecutor
+
+    grade = partial(grade_file, key=key)
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        # Each file takes well under a millisecond, so hand them out in large chunks
+        return list(pool.map(grade, files, chunksize=max(1, len(files) // (4 * workers))))
+
+
+def _correlation(xs, ys):
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    return sxy / math.sqrt(sxx * syy) if sxx and syy else None
+
+
+def question_stats(records, key, common=3):
+    """Per-question counts, share correct, discrimination and most common wrong answers.
+
+    discrimination is the correlation between answering the question
+    correctly and the score on the other questions (None if everyone or
+    no one got it right).
+    """
+    stats = {}
+    for question in key:
+        counts = Counter(record['status'][question] for record in records)
+        right = [1 if record['status'][question] == 'correct' else 0 for record in records]
+        rest = [record['score'] - r for record, r in zip(records, right)]
+        wrong = Counter(record['wrong'][question] for record in records if question in record['wrong'])
+        stats[question] = {
+            **{status: counts.get(status, 0) for status in STATUSES},
+            'p_correct': sum(right) / len(records) if records else 0.0,
+            'discrimination': _correlation(right, rest) if len(records) > 1 else None,
+            'common_wrong': wrong.most_common(common),
+        }
+    return stats
+
+
+def write_csv(path, records, key):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['student', 'path', 'score', 'total', 'percent', *key, 'error'])
+        for record in records:
+            writer.writerow([record['student'], record['path'], record['score'], record['total'],
+                             round(100 * record['score'] / record['total'], 1) if record['total'] else 0,
+                             *(record['status'][q] for q in key), record['error'] or ''])
+
+
+def write_json(path, records, stats):
+    report = {'students': [{k: v for k, v in record.items() if k != 'wrong'} for record in records],
+              'questions': stats}
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def print_summary(records, stats):
+    scores = sorted(record['score'] for record in records)
+    total = records[0]['total'] if records else 0
+    print(f"Graded {len(records)} submissions; median score {scores[len(scores) // 2] if scores else 0}/{total}")
+    failed = [record for record in records if record['error']]
+    if failed:
+        print(f"{len(failed)} with unreadable answers (see the error column)")
+    print()
+    print(f"  {'question':14} {'correct':>8} {'wrong':>6} {'blank':>6} {'% right':>8} {'discrim':>8}  "
+          f"most common wrong")
+    # Hardest first
+    for question, s in sorted(stats.items(), key=lambda item: item[1]['p_correct']):
+        discrimination = f"{s['discrimination']:8.2f}" if s['discrimination'] is not None else f"{'-':>8}"
+        wrong = ', '.join(f"{answer!r} x{n}" for answer, n in s['common_wrong'])
+        print(f"  {question:14} {s['correct']:8d} {s['incorrect']:6d} {s['unanswered'] + s['missing']:6d} "
+              f"{100 * s['p_correct']:8.1f} {discrimination}  {wrong}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade a cohort's answer sheets without running them")
+    parser.add_argument('submissions', nargs='+', help='answers.py files or directories of them')
+    parser.add_argument('--key', default=str(Path(__file__).with_name('answers.py')),
+                        help="answers.py whose check_answers() holds the reference hashes (default: this repo's)")
+    parser.add_argument('--csv', metavar='FILE', help='Write one row per student to FILE')
+    parser.add_argument('--json', metavar='FILE', help='Write students and per-question statistics to FILE')
+    parser.add_argument('--workers', '-j', type=int, help='Grading processes (default: one per CPU)')
+    parser.add_argument('--pattern', default='answers.py',
+                        help='File name glob searched for in directories (default: answers.py)')
+    args = parser.parse_args()
+
+    try:
+        key = load_key(args.key)
+    except (OSError, SyntaxError, ValueError) as e:
+        print(f"Error reading the answer key: {e}")
+        sys.exit(1)
+
+    records = grade_cohort(args.submissions, key, workers=args.workers, pattern=args.pattern)
+    if not records:
+        print("Error: no submissions found")
+        sys.exit(1)
+    stats = question_stats(records, key)
+    print_summary(records, stats)
+    if args.csv:
+        write_csv(args.csv, records, key)
+        print(f"\nWrote {args.csv}")
+    if args.json:
+        write_json(args.json, records, stats)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Micro-batching Inference Server for Gesture Recognition Lab
+
+When several boards stream at once, classifying each window on its own
+spends most of every call on overhead. MicroBatcher collects windows from
+any number of sessions and runs them through the model together: a batch is
+closed once it holds max_batch windows or its oldest window has waited
+max_delay seconds, so no request waits longer than the deadline for company.
+
+The batcher can be used in-process (submit() returns a Future) or served on
+a Unix socket, e.g. for several capture_serial_data.py --infer sessions:
+
+    uv run python inference_server.py models/gestures.npz --socket /tmp/gestures.sock
+    uv run python capture_serial_data.py --port /dev/ttyACM0 --infer unix:/tmp/gestures.sock
+
+Socket protocol: on connect the server sends a hello of three little-endian
+uint16 (steps, axes, classes); the client then sends raw float32 windows of
+steps * axes values and receives `classes` float32 probabilities for each.
+Windows are sent unnormalized: the server applies the model's saved scaler.
+
+--synthetic-clients N runs a load test with N simulated sessions and prints
+the queue depth, batch size and latency histograms.
+
+Usage:
+    uv run python inference_server.py MODEL [--socket PATH] [--max-batch N] [--max-delay-ms MS]
+    uv run python inference_server.py MODEL --synthetic-clients 16 [--requests N] [--rate HZ]
+"""
+
+import argparse
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+from capture_metrics import Histogram
+from gesture_inference import default_scaler_path, load_classifier
+from gesture_scaler import AxisScaler
+
+HELLO = struct.Struct('<HHH')
+
+_CLOSE = object()
+
+
+def print_histogram(histogram, unit='', width=40):
+    """Print a capture_metrics.Histogram as a bar chart."""
+    print(f"  {histogram.help} (n={histogram.count}, mean {histogram.sum / max(histogram.count, 1):.2f}{unit})")
+    peak = max(histogram.counts) or 1
+    labels = [f"<= {b:g}{unit}" for b in histogram.bounds] + [f"> {histogram.bounds[-1]:g}{unit}"]
+    for label, count in zip(labels, histogram.counts):
+        if count:
+            print(f"    {label:>12} {count:8d} {'#' * max(1, round(width * count / peak))}")
+
+
+class MicroBatcher:
+    """Groups single-window requests into batches for one classifier.
+
+    The classifier needs a predict_batch(batch) method; scaler, if given, is
+    applied to every batch in place before prediction.
+    """
+
+    def __init__(self, classifier, scaler=None, max_batch=64, max_delay=0.005, window_shape=(100, 3)):
+        self.classifier = classifier
+        self.scaler = scaler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = queue.Queue()
+        self.batch = np.empty((max_batch, *window_shape), dtype=np.float32)
+        self.queue_depth = Histogram('inference_queue_depth', 'queue depth at batch start',
+                                     [0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.batch_size = Histogram('inference_batch_size', 'batch size', [1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.latency = Histogram('inference_request_latency_ms', 'request latency',
+                                 [0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100])
+        self.thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, window):
+        """Queue one (steps, axes) window; the Future resolves to its class probabilities."""
+        future = Future()
+        self.queue.put((np.asarray(window, dtype=np.float32), future, time.perf_counter()))
+        return future
+
+    def predict(self, window):
+        return self.submit(window).result()
+
+    def close(self):
+        self.queue.put(_CLOSE)
+        self.thread.join()
+
+    def report(self):
+        print("Inference server statistics:")
+        print_histogram(self.queue_depth)
+        print_histogram(self.batch_size)
+        print_histogram(self.latency, unit=' ms')
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or its deadline passes."""
+        first = self.queue.get()
+        if first is _CLOSE:
+            return None
+        self.queue_depth.observe(self.queue.qsize())
+        requests = [first]
+        deadline = first[2] + self.max_delay
+        while len(requests) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _CLOSE:
+                self.queue.put(_CLOSE)
+                break
+            requests.append(item)
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            if requests is None:
+                return
+            size = len(requests)
+            batch = self.batch[:size]
+            for i, (window, _, _) in enumerate(requests):
+                batch[i] = window
+            try:
+                if self.scaler is not None:
+                    self.scaler.transform(batch)
+                probabilities = self.classifier.predict_batch(batch)
+            except Exception as e:  # Hand the failure to every waiting client
+                for _, future, _ in requests:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            self.batch_size.observe(size)
+            for (_, future, submitted), result in zip(requests, probabilities):
+                self.latency.observe(1e3 * (finished - submitted))
+                future.set_result(np.array(result))
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+class _WindowHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batcher = self.server.batcher
+        steps, axes = batcher.batch.shape[1:]
+        self.request.sendall(HELLO.pack(steps, axes, self.server.num_classes))
+        window_bytes = steps * axes * 4
+        while True:
+            data = _recv_exact(self.request, window_bytes)
+            if data is None:
+                return
+            window = np.frombuffer(data, dtype='<f4').reshape(steps, axes)
+            probabilities = batcher.predict(window)
+            self.request.sendall(probabilities.astype('<f4').tobytes())
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(batcher, num_classes, path):
+    """Bind a server for the batcher to a Unix socket.
+
+    Returns the server without starting it; call its serve_forever(), for
+    example on a thread as main() does, and shutdown() to stop it.
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    server = _UnixServer(str(path), _WindowHandler)
+    server.batcher = batcher
+    server.num_classes = num_classes
+    return server
+
+
+class RemoteClassifier:
+    """Client side of the socket protocol, usable wherever a classifier is expected."""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(path))
+        hello = _recv_exact(self.sock, HELLO.size)
+        if hello is None:
+            raise ConnectionError(f"Inference server at {path} closed the connection")
+        steps, axes, self.num_classes = HELLO.unpack(hello)
+        self.input_shape = (steps, axes)
+        self.result_bytes = 4 * self.num_classes
+
+    def predict(self, window):
+        self.sock.sendall(np.ascontiguousarray(window, dtype='<f4').tobytes())
+        data = _recv_exact(self.sock, self.result_bytes)
+        if data is None:
+            raise ConnectionError("Inference server closed the connection")
+        return np.frombuffer(data, dtype='<f4')
+
+    def close(self):
+        self.sock.close()
+
+
+def load_batcher(model_path, scaler_path=None, max_batch=64, max_delay=0.005):
+    """Load a model and its saved scaler into a MicroBatcher. Returns (batcher, num_classes)."""
+    classifier = load_classifier(model_path)
+    scaler_path = Path(scaler_path) if scaler_path else default_scaler_path(model_path)
+    scaler = AxisScaler.load(scaler_path) if scaler_path.exists() else None
+    if scaler is None:
+        print(f"Warning: no normalization file {scaler_path}; windows are classified as sent")
+    window_shape = classifier.input_shape
+    probe = classifier.predict_batch(np.zeros((1, *window_shape), dtype=np.float32))
+    batcher = MicroBatcher(classifier, scaler, max_batch=max_batch, max_delay=max_delay, window_shape=window_shape)
+    return batcher, probe.shape[-1]
+
+
+def run_synthetic_clients(socket_path, clients, requests, rate, window_shape=(100, 3)):
+    """Drive the server with `clients` sessions, each sending `requests` windows at `rate` Hz."""
+    rng = np.random.default_rng(0)
+    windows = (rng.normal(0, 500, (64, *window_shape)) + [-57, 7, 4154]).astype(np.float32)
+    errors = []
+
+    def client(index):
+        try:
+            remote = RemoteClassifier(socket_path)
+            interval = 1.0 / rate if rate else 0.0
+            next_send = time.perf_counter()
+            for i in range(requests):
+                remote.predict(windows[(index + i) % len(windows)])
+                if interval:
+                    next_send += interval
+                    time.sleep(max(0.0, next_send - time.perf_counter()))
+            remote.close()
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    print(f"{clients} clients x {requests} windows in {elapsed:.2f} s "
+          f"({clients * requests / elapsed:.0f} windows/s)")
+    for e in errors:
+        print(f"  client error: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching gesture inference server")
+    parser.add_argument('model', help='Model for gesture_inference.load_classifier (.npz, .keras, .tflite)')
+    parser.add_argument('--scaler', metavar='FILE', help='Saved AxisScaler (default: MODEL with .scaler.npz)')
+    parser.add_argument('--socket', default='/tmp/gesture-inference.sock',
+                        help='Unix socket path (default: /tmp/gesture-inference.sock)')
+    parser.add_argument('--max-batch', type=int, default=64, help='Largest batch (default: 64)')
+    parser.add_argument('--max-delay-ms', type=float, default=5.0,
+                        help='Longest a window waits for a batch to fill (default: 5 ms)')
+    parser.add_argument('--synthetic-clients', type=int, default=0, metavar='N',
+                        help='Run a load test with N simulated sessions, then exit')
+    parser.add_argument('--requests', type=int, default=200, help='Windows per synthetic client (default: 200)')
+    parser.add_argument('--rate', type=float, default=0, metavar='HZ',
+                        help='Windows per second per synthetic client (default: as fast as possible)')
+    args = parser.parse_args()
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("Error: Unix sockets are not available on this platform")
+        sys.exit(1)
+    try:
+        batcher, num_classes = load_batcher(args.model, args.scaler, args.max_batch, args.max_delay_ms / 1e3)
+    except (OSError, ValueError) as e:
+        print(f"Error loading model: {e}")
+        sys.exit(1)
+
+    server = serve(batcher, num_classes, args.socket)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving {args.model} on {args.socket} (max batch {args.max_batch}, max delay {args.max_delay_ms} ms)")
+
+    try:
+        if args.synthetic_clients:
+            run_synthetic_clients(args.socket, args.synthetic_clients, args.requests, args.rate,
+                                  window_shape=batcher.batch.shape[1:])
+        else:
+            thread.join()
+    except KeyboardInterrupt:
+        print("\nStopping")
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.unlink(args.socket)
+        batcher.close()
+        batcher.report()
+
+
+if __name__ == '__main__':
+    main()
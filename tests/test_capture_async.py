@@ -0,0 +1,58 @@
+"""
+Concurrent capture engine tests: several simulated boards on pty pairs.
+"""
+
+import threading
+from pathlib import Path
+
+import capture_async
+from capture_output import CaptureWriter
+from capture_schedule import CountdownTrigger
+from capture_serial_data import output_for_port
+from firmware_simulator import SimulatedFirmware
+
+
+def data_rows(path):
+    return Path(path).read_text().splitlines()[1:]
+
+
+def test_two_boards_are_captured_into_their_own_files(tmp_path):
+    output = tmp_path / 'station.csv'
+    with SimulatedFirmware(repetitions=2, samples=20, seed=0) as first, \
+            SimulatedFirmware(gestures=('idle', 'waving'), repetitions=3, samples=20, seed=1) as second:
+        ok = capture_async.run_capture_many([first.port, second.port], str(output), trigger=CountdownTrigger(0))
+
+    assert ok
+    assert len(data_rows(output_for_port(output, first.port))) == 3 * 2 * 20
+    assert len(data_rows(output_for_port(output, second.port))) == 2 * 3 * 20
+    assert first.acks == 6 and second.acks == 6
+
+
+def test_stalled_writer_does_not_hold_up_the_other_board(tmp_path, monkeypatch):
+    output = tmp_path / 'station.csv'
+    first = SimulatedFirmware(repetitions=2, samples=20, seed=0)
+    second = SimulatedFirmware(repetitions=2, samples=20, seed=1)
+    stalled_file = output_for_port(output, first.port)
+    second_done = threading.Event()
+    waits = []
+
+    class StallingWriter(CaptureWriter):
+        """The first board's writer blocks until the second board has finished its whole session."""
+
+        def write_rows(self, rows):
+            if self.output_file == stalled_file and not waits:
+                waits.append(second_done.wait(timeout=10))
+            super().write_rows(rows)
+
+        def close(self):
+            super().close()
+            if self.output_file != stalled_file:
+                second_done.set()
+
+    monkeypatch.setattr(capture_async, 'CaptureWriter', StallingWriter)
+    with first, second:
+        ok = capture_async.run_capture_many([first.port, second.port], str(output), trigger=CountdownTrigger(0))
+
+    assert ok
+    assert waits == [True]
+    assert len(data_rows(stalled_file)) == 3 * 2 * 20
@@ -0,0 +1,51 @@
+"""
+Capture throughput benchmarks (pytest-benchmark) over the scenarios of
+benchmarks/bench_capture_protocol.py, at a smaller session size.
+
+Each round is a whole capture session. The median samples/s and host CPU per sample,
+the mean retry overhead and the NACK/RESEND totals go into extra_info:
+
+    uv run --group dev pytest tests/test_capture_benchmark.py --benchmark-json capture.json
+"""
+
+import statistics
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from bench_capture_protocol import SCENARIOS, run_scenario  # noqa: E402
+from firmware_simulator import load_recording  # noqa: E402
+
+REPETITIONS = 3
+SAMPLES = 100
+RECORDING = Path(__file__).resolve().parent.parent / 'data' / 'TDATA.csv'
+
+
+@pytest.mark.parametrize('name', list(SCENARIOS))
+def test_capture_throughput(benchmark, tmp_path, name):
+    device_options, capture_options = SCENARIOS[name]
+    if 'recording' in device_options:
+        if not RECORDING.exists():
+            pytest.skip(f"{RECORDING} not found")
+        device_options = {'recording': load_recording(RECORDING, SAMPLES)}
+    results = []
+
+    def session():
+        results.append(run_scenario(device_options, capture_options, tmp_path / f"{len(results)}.csv",
+                                    REPETITIONS, SAMPLES))
+
+    benchmark.pedantic(session, rounds=3)
+
+    benchmark.extra_info.update({
+        'samples': results[0]['samples'],
+        'samples_per_s': statistics.median(result['rate'] for result in results),
+        'host_us_per_sample': statistics.median(result['cpu_per_sample'] for result in results) * 1e6,
+        'retry_percent': statistics.mean(result['retry'] for result in results) * 100,
+        'nacks': sum(result['nacks'] for result in results),
+        'resends': sum(result['resends'] for result in results),
+    })
+    assert all(result['malformed'] == 0 for result in results)
+    if 'drop_rate' not in device_options and 'corrupt_rate' not in device_options:
+        assert all(result['retry'] == 0 for result in results)
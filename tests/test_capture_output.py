@@ -0,0 +1,44 @@
+"""
+Capture output format tests.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from capture_output import NPY_LABELS_FILE, CaptureWriter, NpySink, load_npy_capture
+
+
+def test_npy_capture_keeps_labels_that_do_not_make_file_names(tmp_path):
+    sink = NpySink(tmp_path / 'capture', header=None)
+    values = np.arange(15, dtype=np.int16).reshape(5, 3)
+    sink.write_samples(values, ['id e', 'swipe left', 'id e', 'id_e', 'id/e'])
+    sink.close()
+
+    parts = load_npy_capture(tmp_path / 'capture', mmap=False)
+
+    assert set(parts) == {'id e', 'swipe left', 'id_e', 'id/e'}
+    assert parts['id e'].tolist() == [[0, 1, 2], [6, 7, 8]]
+    assert parts['id_e'].tolist() == [[9, 10, 11]]
+    assert parts['id/e'].tolist() == [[12, 13, 14]]
+    manifest = json.loads((tmp_path / 'capture' / NPY_LABELS_FILE).read_text())
+    assert sorted(manifest) == ['id_e-2.npy', 'id_e-3.npy', 'id_e.npy', 'swipe_left.npy']
+
+
+def test_writer_npy_output_reloads_by_label(tmp_path):
+    with CaptureWriter(tmp_path / 'capture.csv', 'X-acc;Y-acc;Z-acc;label', fmt='npy') as writer:
+        writer.write_rows(['1;2;3;swipe left', '4;5;6;idle'])
+        writer.write_rows(['7;8;9;swipe left'])
+
+    parts = load_npy_capture(writer.output_file)
+
+    assert parts['swipe left'].tolist() == [[1, 2, 3], [7, 8, 9]]
+    assert parts['idle'].tolist() == [[4, 5, 6]]
+
+
+def test_npy_capture_without_manifest_is_refused(tmp_path):
+    np.save(tmp_path / 'idle.npy', np.zeros((2, 3), dtype=np.int16))
+
+    with pytest.raises(FileNotFoundError, match=NPY_LABELS_FILE):
+        load_npy_capture(tmp_path)
@@ -0,0 +1,153 @@
+"""
+Capture protocol tests on pseudo-terminals.
+
+LineReader is fed through a raw pty pair; run_capture talks to
+firmware_simulator.SimulatedFirmware exactly as it would to a board.
+"""
+
+import os
+import time
+import tty
+
+import pytest
+import serial
+
+from capture_schedule import CountdownTrigger
+from capture_serial_data import LineReader, index_by_sequence, missing_ranges, run_capture
+from firmware_simulator import SimulatedFirmware
+
+
+@pytest.fixture
+def pty_port():
+    """(master fd, serial port on the slave side) of a raw pseudo-terminal."""
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    ser = serial.Serial(os.ttyname(slave), timeout=0)
+    os.close(slave)
+    yield master, ser
+    ser.close()
+    os.close(master)
+
+
+@pytest.mark.parametrize('blocking', [True, False])
+def test_lines_arriving_together_come_back_as_one_batch(pty_port, blocking):
+    master, ser = pty_port
+    reader = LineReader(ser, blocking=blocking)
+    os.write(master, b"<<<DATA>>>\r\n0;1;2;3;idle\r\n1;4;5;6;idle\r\n")
+
+    assert reader.read_lines(timeout=1) == ["<<<DATA>>>", "0;1;2;3;idle", "1;4;5;6;idle"]
+
+
+def test_partial_line_is_held_until_its_newline(pty_port):
+    master, ser = pty_port
+    reader = LineReader(ser)
+    os.write(master, b"0;1;2;3;id")
+    assert reader.read_line(timeout=0.05) is None
+
+    os.write(master, b"le\r\n1;4;5")
+    assert reader.read_line(timeout=1) == "0;1;2;3;idle"
+    os.write(master, b";6;idle\n")
+    assert reader.read_line(timeout=1) == "1;4;5;6;idle"
+
+
+def test_small_buffer_grows_to_hold_a_long_line(pty_port):
+    master, ser = pty_port
+    reader = LineReader(ser, buffer_size=8)
+    line = ";".join(str(i) for i in range(100))
+    os.write(master, line.encode() + b"\n")
+
+    assert reader.read_line(timeout=1) == line
+
+
+@pytest.mark.parametrize('blocking', [True, False])
+def test_read_line_times_out_when_nothing_arrives(pty_port, blocking):
+    _, ser = pty_port
+    reader = LineReader(ser, blocking=blocking)
+    start = time.perf_counter()
+
+    assert reader.read_line(timeout=0.1) is None
+    assert 0.1 <= time.perf_counter() - start < 1
+
+
+class FaultyFirmware(SimulatedFirmware):
+    """Simulated device with scripted faults in its first attempts at each repetition.
+
+    The first short_sends attempts leave out one sample; the first
+    damaged_sends attempts carry an out-of-range first sample.
+    """
+
+    def __init__(self, short_sends=0, damaged_sends=0, **options):
+        super().__init__(**options)
+        self.short_sends = short_sends
+        self.damaged_sends = damaged_sends
+        self.attempts = {}
+
+    def send_repetition(self, gesture, rep, samples):
+        attempt = self.attempts.get((gesture, rep), 0)
+        self.attempts[(gesture, rep)] = attempt + 1
+        if attempt < self.short_sends:
+            samples = samples[1:]
+        if attempt < self.damaged_sends:
+            seq, _, y, z = samples[0]
+            samples = [(seq, 99999, y, z), *samples[1:]]
+        return super().send_repetition(gesture, rep, samples)
+
+
+def capture(tmp_path, gap_policy='nack', **faults):
+    """Run a full capture against a simulated device. Returns (success, data rows, device)."""
+    output = tmp_path / 'capture.csv'
+    with FaultyFirmware(gestures=('idle', 'waving'), repetitions=3, samples=20, seed=1, **faults) as device:
+        ok = run_capture(device.port, str(output), trigger=CountdownTrigger(0), gap_policy=gap_policy)
+    return ok, output.read_text().splitlines()[1:], device
+
+
+def test_clean_capture_is_written_completely(tmp_path):
+    ok, rows, device = capture(tmp_path)
+
+    assert ok
+    assert len(rows) == 2 * 3 * 20
+    assert device.acks == 6 and device.nacks == 0
+    assert {row.split(';')[-1] for row in rows} == {'idle', 'waving'}
+
+
+def test_short_repetition_is_nacked_and_resent(tmp_path):
+    ok, rows, device = capture(tmp_path, short_sends=1)
+
+    assert ok
+    assert device.nacks == 6
+    assert len(rows) == 2 * 3 * 20
+
+
+def test_repetition_is_accepted_partial_after_max_retries(tmp_path):
+    ok, rows, device = capture(tmp_path, short_sends=3)
+
+    assert ok
+    # Three attempts per repetition: two NACKs, then the short data is acknowledged
+    assert device.nacks == 2 * 6
+    assert len(rows) == 2 * 3 * 19
+
+
+def test_damaged_lines_count_as_missing():
+    lines = ['0;1;2;3;idle', '1;1;#;3;idle', '2;1;2;3;id#e', '3;1;2;99999;idle', '4;1;2;idle',
+             '5;1;2;3;idle', '1;4;5;6;idle', '0;7;8;9;idle']
+    samples, duplicates, invalid = index_by_sequence(lines, 6, labels=['idle'])
+
+    assert samples == {0: '1;2;3;idle', 1: '4;5;6;idle', 5: '1;2;3;idle'}
+    assert duplicates == 1
+    assert invalid == 4
+    assert missing_ranges(samples, 6) == [(2, 4)]
+
+
+def valid_row(row, labels=('idle', 'waving')):
+    x, y, z, label = row.split(';')
+    return all(-32768 <= int(v) <= 32767 for v in (x, y, z)) and label in labels
+
+
+@pytest.mark.parametrize('gap_policy', ['nack', 'resend'])
+def test_damaged_lines_are_requested_again_not_written(tmp_path, gap_policy):
+    ok, rows, device = capture(tmp_path, gap_policy=gap_policy, damaged_sends=1)
+
+    assert ok
+    assert device.nacks + device.resends == 6
+    assert len(rows) == 2 * 3 * 20
+    assert all(valid_row(row) for row in rows)
@@ -0,0 +1,71 @@
+"""
+Dataset loading tests.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import gesture_data
+from capture_output import NPY_LABELS_FILE, CaptureWriter
+from gesture_data import SAMPLES_PER_GESTURE, load_gesture_windows, read_capture
+
+
+def write_npy_capture(path, labels):
+    """One gesture of SAMPLES_PER_GESTURE rows per label, written as --format npy."""
+    with CaptureWriter(path, 'X-acc;Y-acc;Z-acc;label', fmt='npy') as writer:
+        for i, label in enumerate(labels):
+            writer.write_rows([f"{i};{n};{-n};{label}" for n in range(SAMPLES_PER_GESTURE)])
+    return writer.output_file
+
+
+def test_npy_capture_trains_on_the_original_labels(tmp_path):
+    capture = write_npy_capture(tmp_path / 'capture.csv', ['swipe left', 'id e', 'id_e'])
+
+    X, y, classes = load_gesture_windows(capture)
+
+    assert list(classes) == ['id e', 'id_e', 'swipe left']
+    assert X.shape == (3, SAMPLES_PER_GESTURE, 3)
+    assert [classes[i] for i in y] == ['swipe left', 'id e', 'id_e']
+    assert X[1, 0, 0] == 1
+
+
+def test_npy_capture_without_manifest_fails(tmp_path):
+    capture = write_npy_capture(tmp_path / 'capture.csv', ['idle'])
+    (tmp_path / 'capture' / NPY_LABELS_FILE).unlink()
+
+    with pytest.raises(FileNotFoundError, match=NPY_LABELS_FILE):
+        read_capture(capture)
+
+
+def test_csv_capture_round_trip(tmp_path):
+    path = tmp_path / 'capture.csv'
+    rows = [f"{n};{n};{n};idle" for n in range(SAMPLES_PER_GESTURE)]
+    path.write_text('X-acc;Y-acc;Z-acc;label\n' + '\n'.join(rows) + '\n')
+
+    values, labels = read_capture(path, cache=False)
+
+    assert values.dtype == np.int16
+    assert values.shape == (SAMPLES_PER_GESTURE, 3)
+    assert set(labels) == {'idle'}
+
+
+def test_cache_survives_a_new_mtime_and_is_refreshed(tmp_path, monkeypatch):
+    path = tmp_path / 'capture.csv'
+    path.write_text('X-acc;Y-acc;Z-acc;label\n1;2;3;idle\n4;5;6;idle\n')
+    read_capture(path)
+    assert gesture_data.cache_path_for(path).exists()
+
+    hashes = []
+    file_digest = gesture_data._file_digest
+    monkeypatch.setattr(gesture_data, '_file_digest', lambda p: hashes.append(p) or file_digest(p))
+    monkeypatch.setattr(gesture_data, '_parse_csv', lambda *args: pytest.fail("cache was not used"))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))  # as after a checkout or copy
+
+    values, _ = read_capture(path)
+    assert values.tolist() == [[1, 2, 3], [4, 5, 6]]
+    assert len(hashes) == 1
+    read_capture(path)
+    assert len(hashes) == 1
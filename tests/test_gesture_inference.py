@@ -0,0 +1,58 @@
+"""
+Classifier backend tests. The TFLite test needs TensorFlow and is skipped without it.
+"""
+
+import contextlib
+import io
+import warnings
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def tflite_path(tmp_path_factory):
+    pytest.importorskip('tensorflow')
+    from gesture_export import export_tflite
+    from gesture_models import build_model
+
+    path = tmp_path_factory.mktemp('models') / 'conv.tflite'
+    calibration = np.random.default_rng(0).normal(size=(32, 100, 3)).astype(np.float32)
+    # The converter prints the traced signature
+    with contextlib.redirect_stdout(io.StringIO()):
+        export_tflite(build_model('conv', 3), path, calibration=calibration)
+    return path
+
+
+def test_tflite_batch_runs_in_one_call_and_matches_single_windows(tflite_path):
+    from gesture_inference import load_classifier
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # tf.lite.Interpreter's deprecation notice
+        classifier = load_classifier(tflite_path)
+    windows = np.random.default_rng(1).normal(size=(16, 100, 3)).astype(np.float32)
+    calls = []
+    classifier.interpreter = _CountingInterpreter(classifier.interpreter, calls)
+
+    batched = classifier.predict_batch(windows)
+    assert len(calls) == 1
+    single = np.stack([classifier.predict(window) for window in windows])
+
+    assert classifier.input_shape == (100, 3)
+    assert batched.shape == (16, 3)
+    np.testing.assert_allclose(batched, single)
+
+
+class _CountingInterpreter:
+    """Wraps an interpreter and records its invoke() calls."""
+
+    def __init__(self, interpreter, calls):
+        self._interpreter = interpreter
+        self._calls = calls
+
+    def invoke(self):
+        self._calls.append(True)
+        return self._interpreter.invoke()
+
+    def __getattr__(self, name):
+        return getattr(self._interpreter, name)
@@ -0,0 +1,32 @@
+"""
+Sweep tests. They train tiny models in a worker process, so they need TensorFlow.
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from gesture_sweep import load_results, run_sweep
+
+
+def test_failed_run_is_reported_and_the_sweep_goes_on(tmp_path):
+    pytest.importorskip('tensorflow')
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(12, 100, 3)).astype(np.float32)
+    y = np.repeat([0, 1, 2], 4)
+    good = {'units': [8], 'dropout': 0.0, 'learning_rate': 0.01, 'batch_size': 4, 'augment': False}
+    bad = dict(good, family='bogus')
+    results = tmp_path / 'sweep.jsonl'
+
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        records, failures = run_sweep(X, y, [bad, good], folds=2, epochs=1, workers=1, results=results)
+
+    assert sorted(r['fold'] for r in records) == [0, 1]
+    assert all(r['config'] == good for r in records)
+    assert sorted(f['fold'] for f in failures) == [0, 1]
+    assert all(f['config'] == bad and 'Unknown model family' in f['error'] for f in failures)
+    assert 'FAILED' in output.getvalue()
+    # Only the completed runs are kept, so a re-run retries the failed ones
+    assert len(load_results(results)) == 2
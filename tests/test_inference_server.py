@@ -0,0 +1,83 @@
+"""
+Micro-batching tests with a stand-in classifier.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from inference_server import MicroBatcher
+
+
+class RecordingClassifier:
+    """Returns each window's first value as its 'probability' and records the batch sizes.
+
+    The first call blocks until `release` is set, so requests can pile up behind it.
+    """
+
+    input_shape = (4, 3)
+
+    def __init__(self):
+        self.sizes = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def predict_batch(self, batch):
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.sizes.append(len(batch))
+        return batch[:, :1, 0].copy()
+
+
+def window(value):
+    return np.full((4, 3), value, dtype=np.float32)
+
+
+def test_queued_windows_are_batched_up_to_max_batch():
+    classifier = RecordingClassifier()
+    batcher = MicroBatcher(classifier, max_batch=4, max_delay=0.05, window_shape=(4, 3))
+    try:
+        futures = [batcher.submit(window(0))]
+        assert classifier.started.wait(timeout=5)
+        futures += [batcher.submit(window(i)) for i in range(1, 10)]
+        classifier.release.set()
+
+        results = [float(future.result(timeout=5)[0]) for future in futures]
+    finally:
+        batcher.close()
+
+    assert results == list(range(10))
+    assert classifier.sizes == [1, 4, 4, 1]
+    assert batcher.batch_size.count == 4
+
+
+def test_lone_window_waits_no_longer_than_the_deadline():
+    classifier = RecordingClassifier()
+    classifier.release.set()
+    batcher = MicroBatcher(classifier, max_batch=64, max_delay=0.05, window_shape=(4, 3))
+    try:
+        started = time.perf_counter()
+        batcher.submit(window(7)).result(timeout=5)
+        waited = time.perf_counter() - started
+    finally:
+        batcher.close()
+
+    assert classifier.sizes == [1]
+    # Closed by the deadline rather than by a full batch, and not much later than it
+    assert 0.045 <= waited < 0.5
+
+
+def test_classifier_failure_reaches_every_waiting_request():
+    class Failing(RecordingClassifier):
+        def predict_batch(self, batch):
+            raise ValueError("bad model")
+
+    batcher = MicroBatcher(Failing(), max_batch=8, max_delay=0.01, window_shape=(4, 3))
+    try:
+        futures = [batcher.submit(window(i)) for i in range(3)]
+        errors = [future.exception(timeout=5) for future in futures]
+    finally:
+        batcher.close()
+
+    assert all(isinstance(error, ValueError) for error in errors)
@@ -0,0 +1,19 @@
+"""
+Import-time budgets: each module is imported in a fresh interpreter, as in
+benchmarks/check_startup.py. Set STARTUP_BUDGET_SCALE (e.g. 2) on a slow machine.
+"""
+
+import os
+
+import pytest
+
+from check_startup import BUDGETS, check
+
+SCALE = float(os.environ.get('STARTUP_BUDGET_SCALE', '1'))
+
+
+@pytest.mark.parametrize('module', list(BUDGETS))
+def test_module_imports_within_budget(module):
+    median, limit, problems = check(module, runs=3, scale=SCALE)
+
+    assert not problems, f"{module}: {'; '.join(problems)} ({median:.1f} ms, budget {limit:.0f} ms)"